@@ -0,0 +1,43 @@
+"""feedback_stats_with_media_fix
+
+Revision ID: b3e9d7a4c1f6
+Revises: f7c3b8e2a519
+Create Date: 2026-02-24 10:12:40.318204
+
+"""
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e9d7a4c1f6'
+down_revision = 'f7c3b8e2a519'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # feedbacks.video stores a missing video as JSON 'null', which the original backfill
+    # counted as media. Re-derive with_media for every existing rollup row.
+    op.execute(
+        """
+        UPDATE feedback_daily_stats s
+        SET with_media = m.with_media, updated_at = now()
+        FROM (
+            SELECT shop_id, (created_date AT TIME ZONE 'UTC')::date AS day_utc, COALESCE(nm_id, 0) AS nm_id,
+                   COALESCE(product_valuation, 0) AS rating,
+                   COUNT(*) FILTER (WHERE (jsonb_typeof(photo_links) = 'array' AND jsonb_array_length(photo_links) > 0)
+                                       OR jsonb_typeof(video) = 'object') AS with_media
+            FROM feedbacks
+            GROUP BY 1, 2, 3, 4
+        ) m
+        WHERE s.shop_id = m.shop_id AND s.day_utc = m.day_utc AND s.nm_id = m.nm_id AND s.rating = m.rating
+          AND s.with_media <> m.with_media
+        """
+    )
+
+
+def downgrade() -> None:
+    # Data-only correction; nothing to undo.
+    pass
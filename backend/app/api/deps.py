@@ -1,16 +1,43 @@
 from __future__ import annotations
 
-from fastapi import Depends, HTTPException, status
+from dataclasses import dataclass
+
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.db import get_session
 from app.core.security import decode_token
+from app.repos.pagination import InvalidCursor, decode_cursor
 from app.repos.user_repo import UserRepo
 
 bearer = HTTPBearer(auto_error=False)
 
 
+@dataclass(frozen=True)
+class PageCursor:
+    cursor: str | None
+    with_total: bool
+
+
+def page_cursor(
+    cursor: str | None = Query(default=None, description="X-Next-Cursor of the previous page (replaces offset)"),
+    include_total: bool | None = Query(default=None, description="Count all matches (default: first page only)"),
+) -> PageCursor:
+    """Keyset pagination params shared by the list endpoints.
+
+    The full count is the expensive part of deep pages, so it is skipped once the client
+    is following cursors unless explicitly requested.
+    """
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except InvalidCursor:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    with_total = include_total if include_total is not None else not cursor
+    return PageCursor(cursor=cursor or None, with_total=with_total)
+
+
 async def get_db() -> AsyncSession:
     async for s in get_session():
         yield s
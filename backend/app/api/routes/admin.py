@@ -19,7 +19,7 @@ from sqlalchemy import select, func
 from app.repos.prompt_repo import PromptRepo
 from app.repos.tone_repo import ToneRepo
 from app.schemas.tone import ToneCreate, ToneUpdate
-from app.services.prompt_store import get_global_bundle, set_global_bundle
+from app.services.prompt_store import bump_bundle_version, get_global_bundle, set_global_bundle
 
 router = APIRouter()
 
@@ -367,6 +367,7 @@ async def update_prompts(payload: dict, db: AsyncSession = Depends(get_db), user
             await repo.set_json(scope="global", key=key, value_json=value)
         else:
             await repo.set_text(scope="global", key=key, value_text=str(value) if value is not None else "")
+        await bump_bundle_version(db)
         bundle = await get_global_bundle(db)
         await db.commit()
         return bundle.as_dict()
@@ -404,6 +405,7 @@ async def put_prompt_by_key(key: str, payload: dict, db: AsyncSession = Depends(
         await repo.set_json(scope="global", key=key, value_json=value)
     else:
         await repo.set_text(scope="global", key=key, value_text=str(value) if value is not None else "")
+    await bump_bundle_version(db)
     bundle = await get_global_bundle(db)
     await db.commit()
     return {"ok": True, "key": key, "value": bundle.as_dict().get(key)}
@@ -450,6 +452,7 @@ async def create_tone(payload: ToneCreate, db: AsyncSession = Depends(get_db), u
         sort_order=payload.sort_order,
         is_active=payload.is_active,
     )
+    await bump_bundle_version(db)
     await db.commit()
     return {"id": tone.id}
 
@@ -466,6 +469,7 @@ async def update_tone(tone_id: int, payload: ToneUpdate, db: AsyncSession = Depe
         raise HTTPException(status_code=404, detail="Tone not found")
     data = payload.model_dump(exclude_unset=True)
     await repo.update(tone, data)
+    await bump_bundle_version(db)
     await db.commit()
     return {"ok": True}
 
@@ -481,5 +485,6 @@ async def delete_tone(tone_id: int, db: AsyncSession = Depends(get_db), user=Dep
     if not tone:
         raise HTTPException(status_code=404, detail="Tone not found")
     await repo.deactivate(tone)
+    await bump_bundle_version(db)
     await db.commit()
     return {"ok": True}
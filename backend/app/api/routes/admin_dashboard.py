@@ -6,6 +6,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_db, get_current_user
 from app.api.access import require_super_admin
 from app.repos.admin_dashboard_repo import AdminDashboardRepo
+from app.services.gpt_accounting import generation_cache_stats
+from app.services.usage_buffer import gpt_usage_buffer
+from app.services.llm_governor import llm_governor
 from app.schemas.admin_dashboard import SystemHealthOut, FinanceBreakdownOut, OpsDashboardOut, ShopDashboardOut
 
 router = APIRouter()
@@ -15,6 +18,9 @@ router = APIRouter()
 async def system_health(db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
     await require_super_admin(user)
     data = await AdminDashboardRepo(db).system_health()
+    data["llm_governor"] = llm_governor.snapshot()
+    data["generation_cache"] = generation_cache_stats.snapshot()
+    data["gpt_usage_buffer"] = gpt_usage_buffer.snapshot()
     return SystemHealthOut(**data)
 
 
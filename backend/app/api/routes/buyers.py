@@ -67,8 +67,8 @@ async def buyer_thread(
 ):
     (await require_shop_access(db, user, shop_id, request=request, min_role=ShopMemberRole.manager.value)).shop
 
-    fb_rows, _ = await FeedbackRepo(db).list(shop_id=shop_id, is_answered=None, q=None, user_name=user_name, limit=limit, offset=0)
-    q_rows, _ = await QuestionRepo(db).list(shop_id=shop_id, is_answered=None, q=None, user_name=user_name, limit=limit, offset=0)
+    fb_rows, _ = await FeedbackRepo(db).list(shop_id=shop_id, is_answered=None, q=None, user_name=user_name, limit=limit, offset=0, with_total=False)
+    q_rows, _ = await QuestionRepo(db).list(shop_id=shop_id, is_answered=None, q=None, user_name=user_name, limit=limit, offset=0, with_total=False)
 
     items: list[BuyerThreadItem] = []
     for r in fb_rows:
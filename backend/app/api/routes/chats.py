@@ -3,19 +3,24 @@ from __future__ import annotations
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import PageCursor, get_db, get_current_user, page_cursor
 from app.api.access import require_shop_access
 from app.models.enums import ShopMemberRole, UserRole
 from app.repos.shop_repo import ShopRepo
 from app.repos.job_repo import JobRepo
 from app.repos.chat_repo import ChatRepo
+from app.repos.pagination import next_cursor
 from app.models.enums import JobType
 from app.schemas.chat import ChatSessionOut, ChatEventOut, ChatDraftOut, ChatSessionsPageOut, ChatSessionRowOut
 from app.services.openai_client import OpenAIService
-from app.services.chat_drafting import generate_chat_reply
+from app.services.chat_drafting import generate_chat_reply, sanitize, stream_chat_reply
+from app.services.gpt_accounting import record_gpt_usage
+from app.services.streaming import SSE_HEADERS, refund_credits, sse_generation
+from app.core.db import AsyncSessionMaker
 from app.services.prompt_store import get_global_bundle
 from app.core.config import settings
 from app.repos.shop_billing_repo import ShopBillingRepo
@@ -103,6 +108,7 @@ async def list_chats_page(
     date_from_unix: int | None = Query(default=None, description="UTC unix seconds"),
     date_to_unix: int | None = Query(default=None, description="UTC unix seconds"),
     unread: bool | None = Query(default=None, description="true=only unread, false=only read"),
+    page: PageCursor = Depends(page_cursor),
     db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user),
 ):
@@ -120,6 +126,8 @@ async def list_chats_page(
         dt_from=dt_from,
         dt_to=dt_to,
         unread=unread,
+        cursor=page.cursor,
+        with_total=page.with_total,
     )
 
     items: list[ChatSessionRowOut] = []
@@ -130,7 +138,11 @@ async def list_chats_page(
         base = base_model.model_dump() if hasattr(base_model, "model_dump") else base_model.dict()
         items.append(ChatSessionRowOut(**base, shop_id=session_obj.shop_id, shop_name=shop_name))
 
-    return ChatSessionsPageOut(total=total, items=items)
+    return ChatSessionsPageOut(
+        total=total,
+        items=items,
+        next_cursor=next_cursor([r[0] for r in rows], limit, "updated_at"),
+    )
 
 
 @router.get("/{shop_id}", response_model=list[ChatSessionOut])
@@ -212,15 +224,7 @@ async def chat_events(
     return await repo.list_events(shop_id=shop_id, chat_id=chat_id, limit=limit, offset=offset)
 
 
-@router.post("/{shop_id}/{chat_id}/draft", response_model=ChatDraftOut)
-async def suggest_chat_reply(shop_id: int, chat_id: str, request: Request, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
-    (await require_shop_access(db, user, shop_id, request=request, min_role=ShopMemberRole.manager.value)).shop
-    settings_obj = await ShopRepo(db).get_settings(shop_id)
-    if not settings_obj or not settings_obj.chat_enabled:
-        raise HTTPException(status_code=400, detail="Chat is disabled in settings")
-
-    repo = ChatRepo(db)
-
+async def _latest_buyer_message(db: AsyncSession, repo: ChatRepo, shop_id: int, chat_id: str) -> tuple[str, dict | None]:
     # Use newest buyer message from stored events. If cache is empty, pull events on demand.
     events = await repo.list_events(shop_id=shop_id, chat_id=chat_id, limit=50, offset=0)
     if not events:
@@ -267,6 +271,18 @@ async def suggest_chat_reply(shop_id: int, chat_id: str, request: Request, db: A
 
     if not last_text:
         raise HTTPException(status_code=400, detail="No messages found for this chat yet.")
+    return last_text, ctx
+
+
+@router.post("/{shop_id}/{chat_id}/draft", response_model=ChatDraftOut)
+async def suggest_chat_reply(shop_id: int, chat_id: str, request: Request, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    (await require_shop_access(db, user, shop_id, request=request, min_role=ShopMemberRole.manager.value)).shop
+    settings_obj = await ShopRepo(db).get_settings(shop_id)
+    if not settings_obj or not settings_obj.chat_enabled:
+        raise HTTPException(status_code=400, detail="Chat is disabled in settings")
+
+    repo = ChatRepo(db)
+    last_text, ctx = await _latest_buyer_message(db, repo, shop_id, chat_id)
 
     # Billing: charge credits before spending OpenAI tokens.
     credits_per_draft = int(getattr(settings, "CREDITS_PER_DRAFT", 1) or 1)
@@ -284,7 +300,7 @@ async def suggest_chat_reply(shop_id: int, chat_id: str, request: Request, db: A
     openai = OpenAIService()
     bundle = await get_global_bundle(db)
     try:
-        text, model, rid = await generate_chat_reply(openai, settings_obj, last_text, context=ctx, bundle=bundle)
+        text, model, rid, prompt_tokens, completion_tokens = await generate_chat_reply(openai, settings_obj, last_text, context=ctx, bundle=bundle)
     except Exception:
         if charged and credits_per_draft > 0:
             await ShopBillingRepo(db).apply_credits(
@@ -296,10 +312,67 @@ async def suggest_chat_reply(shop_id: int, chat_id: str, request: Request, db: A
             await db.flush()
         raise
     draft = await repo.create_draft(shop_id=shop_id, chat_id=chat_id, text=text, openai_model=model, openai_response_id=rid)
+    await record_gpt_usage(
+        db,
+        shop_id=shop_id,
+        model=model,
+        operation_type="chat_reply",
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        response_id=rid,
+    )
     await db.commit()
     return draft
 
 
+@router.post("/{shop_id}/{chat_id}/draft/stream")
+async def suggest_chat_reply_stream(shop_id: int, chat_id: str, request: Request, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    """SSE variant of suggest: `delta`/`replace` events while generating, `done` once the draft is saved."""
+    (await require_shop_access(db, user, shop_id, request=request, min_role=ShopMemberRole.manager.value)).shop
+    settings_obj = await ShopRepo(db).get_settings(shop_id)
+    if not settings_obj or not settings_obj.chat_enabled:
+        raise HTTPException(status_code=400, detail="Chat is disabled in settings")
+
+    last_text, ctx = await _latest_buyer_message(db, ChatRepo(db), shop_id, chat_id)
+
+    credits_per_draft = int(getattr(settings, "CREDITS_PER_DRAFT", 1) or 1)
+    meta = {"shop_id": shop_id, "chat_id": chat_id}
+    if credits_per_draft > 0:
+        charged = await ShopBillingRepo(db).try_charge(shop_id, amount=credits_per_draft, reason="chat_draft_api", meta=meta)
+        if not charged:
+            raise HTTPException(status_code=402, detail="Insufficient credits")
+
+    bundle = await get_global_bundle(db)
+    chunks = stream_chat_reply(OpenAIService(), settings_obj, last_text, context=ctx, bundle=bundle)
+    await db.commit()
+
+    async def _on_complete(text: str, res) -> dict:
+        async with AsyncSessionMaker() as s:
+            async with s.begin():
+                draft = await ChatRepo(s).create_draft(
+                    shop_id=shop_id, chat_id=chat_id, text=text, openai_model=res.model, openai_response_id=res.response_id
+                )
+                await record_gpt_usage(
+                    s,
+                    shop_id=shop_id,
+                    model=res.model,
+                    operation_type="chat_reply",
+                    prompt_tokens=res.prompt_tokens,
+                    completion_tokens=res.completion_tokens,
+                    response_id=res.response_id,
+                )
+        return {"draft_id": draft.id}
+
+    async def _on_error(exc: BaseException) -> None:
+        await refund_credits(shop_id, amount=credits_per_draft, reason="refund_chat_draft_api_error", meta=meta)
+
+    return StreamingResponse(
+        sse_generation(chunks, sanitize=sanitize, on_complete=_on_complete, on_error=_on_error),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
 @router.post("/{shop_id}/{chat_id}/send")
 async def send_chat_message(
     shop_id: int,
@@ -4,10 +4,11 @@ from datetime import datetime, date, timedelta, timezone
 import re
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy import select, func, and_, or_, desc, cast, Integer
+from sqlalchemy import select, func, and_, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db, get_current_user
+from app.core.db import gather_in_sessions
 from app.api.access import require_shop_access
 from app.models.enums import ShopMemberRole, UserRole, JobType, DraftStatus
 from app.models.shop import Shop
@@ -18,8 +19,10 @@ from app.models.chat import ChatSession
 from app.models.draft import FeedbackDraft
 from app.models.question_draft import QuestionDraft
 from app.models.settings import ShopSettings
+from app.models.stats import FeedbackDailyStat, QuestionDailyStat
 from app.repos.job_repo import JobRepo
 from app.repos.shop_repo import ShopRepo
+from app.services.dashboard_cache import cached_dashboard_response
 from app.schemas.dashboard import (
     AttentionItem,
     DashboardFeedbacksOut,
@@ -104,51 +107,77 @@ async def _accessible_shop_ids(db: AsyncSession, request: Request, user, shop_id
     return ids
 
 
-async def _feedbacks_kpis(db: AsyncSession, shop_ids: list[int], dt_from: datetime, dt_to: datetime) -> DashboardKpis:
-    cond = [Feedback.shop_id.in_(shop_ids), Feedback.created_date >= dt_from, Feedback.created_date <= dt_to]
+async def _shop_settings(db: AsyncSession, shop_id: int | None) -> ShopSettings | None:
+    return await ShopRepo(db).get_settings(shop_id) if shop_id else None
+
+
+def _window(col, dt_from: datetime, dt_to: datetime):
+    return and_(col >= dt_from, col <= dt_to)
 
-    total_q = select(func.count()).select_from(Feedback).where(and_(*cond))
-    total = int((await db.execute(total_q)).scalar_one() or 0)
 
-    pending_q = select(func.count()).select_from(Feedback).where(and_(*cond, Feedback.answer_text.is_(None)))
-    pending = int((await db.execute(pending_q)).scalar_one() or 0)
+def _day_window(col, dt_from: datetime, dt_to: datetime):
+    # Dashboard windows are whole UTC days, so the daily rollups answer them exactly.
+    return and_(col >= dt_from.date(), col <= dt_to.date())
 
-    answered = max(total - pending, 0)
 
-    # Drafts ready to review (status = 'drafted')
-    drafts_ready_q = (
+def _feedback_drafts_ready(shop_ids: list[int]):
+    """Drafts waiting for review (status = 'drafted'), as a scalar subquery for the KPI statement."""
+    return (
         select(func.count())
         .select_from(FeedbackDraft)
-        .join(Feedback, FeedbackDraft.feedback_id == Feedback.id)
         .where(and_(
-            Feedback.shop_id.in_(shop_ids),
+            FeedbackDraft.shop_id.in_(shop_ids),
             FeedbackDraft.status == DraftStatus.drafted.value,
         ))
+        .scalar_subquery()
+    )
+
+
+def _sum(expr, *conds):
+    """SUM(expr) FILTER (WHERE conds) over rollup rows, 0 when nothing matches."""
+    agg = func.sum(expr)
+    if conds:
+        agg = agg.filter(and_(*conds))
+    return func.coalesce(agg, 0)
+
+
+def _rating_avg(*conds):
+    rated = FeedbackDailyStat.rating > 0
+    return (
+        _sum(FeedbackDailyStat.rating * FeedbackDailyStat.total, rated, *conds)
+        / func.nullif(_sum(FeedbackDailyStat.total, rated, *conds), 0)
     )
-    drafts_ready = int((await db.execute(drafts_ready_q)).scalar_one() or 0)
 
-    # Average rating across all reviews with rating set
-    avg_q = select(func.avg(cast(Feedback.product_valuation, Integer))).where(and_(*cond, Feedback.product_valuation.is_not(None)))
-    avg_val = (await db.execute(avg_q)).scalar_one()
-    avg_rating = float(avg_val or 0.0)
 
+async def _feedbacks_kpis(db: AsyncSession, shop_ids: list[int], dt_from: datetime, dt_to: datetime) -> DashboardKpis:
+    st = FeedbackDailyStat
+    q = (
+        select(
+            _sum(st.total).label("total"),
+            _sum(st.answered).label("answered"),
+            _rating_avg().label("avg_rating"),
+            _sum(st.total, st.rating > 0).label("rated"),
+            _sum(st.total, st.rating.in_([4, 5])).label("positive"),
+            _feedback_drafts_ready(shop_ids).label("drafts_ready"),
+        )
+        .where(st.shop_id.in_(shop_ids), _day_window(st.day_utc, dt_from, dt_to))
+    )
+    r = (await db.execute(q)).one()
+
+    total = int(r.total or 0)
+    answered = int(r.answered or 0)
+    pending = max(total - answered, 0)
+    rated_cnt = int(r.rated or 0)
     # Positive share = % of ratings 4-5 among rated reviews
-    rated_cnt_q = select(func.count()).select_from(Feedback).where(and_(*cond, Feedback.product_valuation.is_not(None)))
-    rated_cnt = int((await db.execute(rated_cnt_q)).scalar_one() or 0)
-    if rated_cnt > 0:
-        pos_cnt_q = select(func.count()).select_from(Feedback).where(and_(*cond, Feedback.product_valuation.in_([4, 5])))
-        pos_cnt = int((await db.execute(pos_cnt_q)).scalar_one() or 0)
-        positive_share = int(round((pos_cnt / rated_cnt) * 100))
-    else:
-        positive_share = 0
+    positive_share = int(round((int(r.positive or 0) / rated_cnt) * 100)) if rated_cnt > 0 else 0
 
     return DashboardKpis(
         total=total,
         pending=pending,
         unanswered=pending,
         answered=answered,
-        draftsReady=drafts_ready,
-        avgRating=round(avg_rating, 1),
+        draftsReady=int(r.drafts_ready or 0),
+        avgRating=round(float(r.avg_rating or 0.0), 1),
         positiveShare=positive_share,
     )
 
@@ -161,70 +190,60 @@ async def _feedbacks_kpis_extended(
     prev_dt_from: datetime,
     prev_dt_to: datetime,
 ) -> tuple[DashboardKpis, RatingDistribution]:
-    """Extended KPIs with tooltips data and rating distribution."""
-    cond = [Feedback.shop_id.in_(shop_ids), Feedback.created_date >= dt_from, Feedback.created_date <= dt_to]
-    prev_cond = [Feedback.shop_id.in_(shop_ids), Feedback.created_date >= prev_dt_from, Feedback.created_date <= prev_dt_to]
-
-    # Total
-    total = int((await db.execute(select(func.count()).select_from(Feedback).where(and_(*cond)))).scalar_one() or 0)
-    prev_total = int((await db.execute(select(func.count()).select_from(Feedback).where(and_(*prev_cond)))).scalar_one() or 0)
-
-    # Unanswered
-    pending = int((await db.execute(select(func.count()).select_from(Feedback).where(and_(*cond, Feedback.answer_text.is_(None))))).scalar_one() or 0)
-    answered = max(total - pending, 0)
-
-    # Drafts ready
-    drafts_ready_q = (
+    """Extended KPIs with tooltips data and rating distribution.
+
+    One statement over feedback_daily_stats: every KPI is a SUM(...) FILTER (...) over the
+    current + previous window. Drafts ready and negatives waiting > 24h (not day-aligned)
+    are scalar subqueries on the raw tables.
+    """
+    st = FeedbackDailyStat
+    cur = _day_window(st.day_utc, dt_from, dt_to)
+    prev = _day_window(st.day_utc, prev_dt_from, prev_dt_to)
+
+    # Negative feedbacks waiting > 24h (not limited to the period)
+    h24_ago = datetime.now(timezone.utc) - timedelta(hours=24)
+    neg_waiting_sq = (
         select(func.count())
-        .select_from(FeedbackDraft)
-        .join(Feedback, FeedbackDraft.feedback_id == Feedback.id)
+        .select_from(Feedback)
         .where(and_(
             Feedback.shop_id.in_(shop_ids),
-            FeedbackDraft.status == DraftStatus.drafted.value,
+            Feedback.answer_text.is_(None),
+            Feedback.product_valuation.is_not(None),
+            Feedback.product_valuation <= 2,
+            Feedback.created_date <= h24_ago,
         ))
+        .scalar_subquery()
     )
-    drafts_ready = int((await db.execute(drafts_ready_q)).scalar_one() or 0)
-
-    # Processed by system = answered or with draft
-    processed = answered + drafts_ready
-
-    # Negative feedbacks waiting > 24h
-    now = datetime.now(timezone.utc)
-    h24_ago = now - timedelta(hours=24)
-    neg_waiting_q = select(func.count()).select_from(Feedback).where(and_(
-        Feedback.shop_id.in_(shop_ids),
-        Feedback.answer_text.is_(None),
-        Feedback.product_valuation.is_not(None),
-        Feedback.product_valuation <= 2,
-        Feedback.created_date <= h24_ago,
-    ))
-    neg_waiting_24h = int((await db.execute(neg_waiting_q)).scalar_one() or 0)
-
-    # Average rating
-    avg_q = select(func.avg(cast(Feedback.product_valuation, Integer))).where(and_(*cond, Feedback.product_valuation.is_not(None)))
-    avg_rating = float((await db.execute(avg_q)).scalar_one() or 0.0)
-
-    # Positive share
-    rated_cnt = int((await db.execute(select(func.count()).select_from(Feedback).where(and_(*cond, Feedback.product_valuation.is_not(None))))).scalar_one() or 0)
-    if rated_cnt > 0:
-        pos_cnt = int((await db.execute(select(func.count()).select_from(Feedback).where(and_(*cond, Feedback.product_valuation.in_([4, 5]))))).scalar_one() or 0)
-        positive_share = int(round((pos_cnt / rated_cnt) * 100))
-    else:
-        positive_share = 0
-
-    # Rating distribution for current period
-    stars5 = int((await db.execute(select(func.count()).select_from(Feedback).where(and_(*cond, Feedback.product_valuation == 5)))).scalar_one() or 0)
-    stars4 = int((await db.execute(select(func.count()).select_from(Feedback).where(and_(*cond, Feedback.product_valuation == 4)))).scalar_one() or 0)
-    stars3 = int((await db.execute(select(func.count()).select_from(Feedback).where(and_(*cond, Feedback.product_valuation == 3)))).scalar_one() or 0)
-    stars2 = int((await db.execute(select(func.count()).select_from(Feedback).where(and_(*cond, Feedback.product_valuation == 2)))).scalar_one() or 0)
-    stars1 = int((await db.execute(select(func.count()).select_from(Feedback).where(and_(*cond, Feedback.product_valuation == 1)))).scalar_one() or 0)
-
-    # Previous period rating distribution for growth calculation
-    prev_stars5 = int((await db.execute(select(func.count()).select_from(Feedback).where(and_(*prev_cond, Feedback.product_valuation == 5)))).scalar_one() or 0)
-    prev_stars4 = int((await db.execute(select(func.count()).select_from(Feedback).where(and_(*prev_cond, Feedback.product_valuation == 4)))).scalar_one() or 0)
-    prev_stars3 = int((await db.execute(select(func.count()).select_from(Feedback).where(and_(*prev_cond, Feedback.product_valuation == 3)))).scalar_one() or 0)
-    prev_stars2 = int((await db.execute(select(func.count()).select_from(Feedback).where(and_(*prev_cond, Feedback.product_valuation == 2)))).scalar_one() or 0)
-    prev_stars1 = int((await db.execute(select(func.count()).select_from(Feedback).where(and_(*prev_cond, Feedback.product_valuation == 1)))).scalar_one() or 0)
+
+    q = (
+        select(
+            _sum(st.total, cur).label("total"),
+            _sum(st.total, prev).label("prev_total"),
+            _sum(st.answered, cur).label("answered"),
+            _rating_avg(cur).label("avg_rating"),
+            _sum(st.total, cur, st.rating > 0).label("rated"),
+            _sum(st.total, cur, st.rating.in_([4, 5])).label("positive"),
+            *[_sum(st.total, cur, st.rating == n).label(f"stars{n}") for n in range(1, 6)],
+            *[_sum(st.total, prev, st.rating == n).label(f"prev_stars{n}") for n in range(1, 6)],
+            _feedback_drafts_ready(shop_ids).label("drafts_ready"),
+            neg_waiting_sq.label("neg_waiting_24h"),
+        )
+        .where(
+            st.shop_id.in_(shop_ids),
+            _day_window(st.day_utc, min(dt_from, prev_dt_from), max(dt_to, prev_dt_to)),
+        )
+    )
+    r = (await db.execute(q)).one()
+
+    total = int(r.total or 0)
+    prev_total = int(r.prev_total or 0)
+    answered = int(r.answered or 0)
+    pending = max(total - answered, 0)
+    drafts_ready = int(r.drafts_ready or 0)
+    rated_cnt = int(r.rated or 0)
+    positive_share = int(round((int(r.positive or 0) / rated_cnt) * 100)) if rated_cnt > 0 else 0
+    stars = {n: int(getattr(r, f"stars{n}") or 0) for n in range(1, 6)}
+    prev_stars = {n: int(getattr(r, f"prev_stars{n}") or 0) for n in range(1, 6)}
 
     kpis = DashboardKpis(
         total=total,
@@ -232,25 +251,26 @@ async def _feedbacks_kpis_extended(
         unanswered=pending,
         answered=answered,
         draftsReady=drafts_ready,
-        avgRating=round(avg_rating, 1),
+        avgRating=round(float(r.avg_rating or 0.0), 1),
         positiveShare=positive_share,
-        processedBySystem=processed,
+        # Processed by system = answered or with draft
+        processedBySystem=answered + drafts_ready,
         periodGrowth=total - prev_total if prev_total else total,
         awaitingProcessing=pending - drafts_ready,
-        negativeWaiting24h=neg_waiting_24h,
+        negativeWaiting24h=int(r.neg_waiting_24h or 0),
     )
 
     rating_dist = RatingDistribution(
-        stars5=stars5,
-        stars4=stars4,
-        stars3=stars3,
-        stars2=stars2,
-        stars1=stars1,
-        stars5Growth=stars5 - prev_stars5,
-        stars4Growth=stars4 - prev_stars4,
-        stars3Growth=stars3 - prev_stars3,
-        stars2Growth=stars2 - prev_stars2,
-        stars1Growth=stars1 - prev_stars1,
+        stars5=stars[5],
+        stars4=stars[4],
+        stars3=stars[3],
+        stars2=stars[2],
+        stars1=stars[1],
+        stars5Growth=stars[5] - prev_stars[5],
+        stars4Growth=stars[4] - prev_stars[4],
+        stars3Growth=stars[3] - prev_stars[3],
+        stars2Growth=stars[2] - prev_stars[2],
+        stars1Growth=stars[1] - prev_stars[1],
         totalRated=rated_cnt,
     )
 
@@ -265,18 +285,13 @@ async def _questions_kpis_extended(
     prev_dt_from: datetime,
     prev_dt_to: datetime,
 ) -> DashboardKpis:
-    """Extended KPIs for questions with tooltips data."""
-    cond = [Question.shop_id.in_(shop_ids), Question.created_date >= dt_from, Question.created_date <= dt_to]
-    prev_cond = [Question.shop_id.in_(shop_ids), Question.created_date >= prev_dt_from, Question.created_date <= prev_dt_to]
-
-    total = int((await db.execute(select(func.count()).select_from(Question).where(and_(*cond)))).scalar_one() or 0)
-    prev_total = int((await db.execute(select(func.count()).select_from(Question).where(and_(*prev_cond)))).scalar_one() or 0)
-
-    pending = int((await db.execute(select(func.count()).select_from(Question).where(and_(*cond, Question.answer_text.is_(None))))).scalar_one() or 0)
-    answered = max(total - pending, 0)
+    """Extended KPIs for questions with tooltips data (one statement over question_daily_stats)."""
+    st = QuestionDailyStat
+    cur = _day_window(st.day_utc, dt_from, dt_to)
+    prev = _day_window(st.day_utc, prev_dt_from, prev_dt_to)
 
     # Question drafts ready
-    drafts_ready_q = (
+    drafts_ready_sq = (
         select(func.count())
         .select_from(QuestionDraft)
         .join(Question, QuestionDraft.question_id == Question.id)
@@ -284,8 +299,27 @@ async def _questions_kpis_extended(
             Question.shop_id.in_(shop_ids),
             QuestionDraft.status == DraftStatus.drafted.value,
         ))
+        .scalar_subquery()
     )
-    drafts_ready = int((await db.execute(drafts_ready_q)).scalar_one() or 0)
+    q = (
+        select(
+            _sum(st.total, cur).label("total"),
+            _sum(st.total, prev).label("prev_total"),
+            _sum(st.answered, cur).label("answered"),
+            drafts_ready_sq.label("drafts_ready"),
+        )
+        .where(
+            st.shop_id.in_(shop_ids),
+            _day_window(st.day_utc, min(dt_from, prev_dt_from), max(dt_to, prev_dt_to)),
+        )
+    )
+    r = (await db.execute(q)).one()
+
+    total = int(r.total or 0)
+    prev_total = int(r.prev_total or 0)
+    answered = int(r.answered or 0)
+    pending = max(total - answered, 0)
+    drafts_ready = int(r.drafts_ready or 0)
 
     return DashboardKpis(
         total=total,
@@ -307,20 +341,32 @@ async def _chats_kpis_extended(
     prev_dt_from: datetime,
     prev_dt_to: datetime,
 ) -> DashboardKpis:
-    """Extended KPIs for chats with tooltips data."""
-    cond = [ChatSession.shop_id.in_(shop_ids), ChatSession.updated_at >= dt_from, ChatSession.updated_at <= dt_to]
-    prev_cond = [ChatSession.shop_id.in_(shop_ids), ChatSession.updated_at >= prev_dt_from, ChatSession.updated_at <= prev_dt_to]
+    """Extended KPIs for chats with tooltips data (one FILTER-aggregate statement)."""
+    cur = _window(ChatSession.updated_at, dt_from, dt_to)
+    prev = _window(ChatSession.updated_at, prev_dt_from, prev_dt_to)
 
-    total = int((await db.execute(select(func.count()).select_from(ChatSession).where(and_(*cond)))).scalar_one() or 0)
-    prev_total = int((await db.execute(select(func.count()).select_from(ChatSession).where(and_(*prev_cond)))).scalar_one() or 0)
+    q = (
+        select(
+            func.count().filter(cur).label("total"),
+            func.count().filter(prev).label("prev_total"),
+            # Active chats = those with unread > 0
+            func.count().filter(and_(cur, ChatSession.unread_count > 0)).label("active"),
+        )
+        .select_from(ChatSession)
+        .where(
+            ChatSession.shop_id.in_(shop_ids),
+            _window(ChatSession.updated_at, min(dt_from, prev_dt_from), max(dt_to, prev_dt_to)),
+        )
+    )
+    r = (await db.execute(q)).one()
 
-    # Active chats = those with unread > 0
-    active = int((await db.execute(select(func.count()).select_from(ChatSession).where(and_(*cond, ChatSession.unread_count > 0)))).scalar_one() or 0)
-    closed = total - active
+    total = int(r.total or 0)
+    prev_total = int(r.prev_total or 0)
+    active = int(r.active or 0)
 
     return DashboardKpis(
         total=total,
-        closed=closed,
+        closed=total - active,
         active=active,
         periodGrowth=total - prev_total if prev_total else total,
     )
@@ -345,84 +391,89 @@ async def dashboard_main(
     d_from, d_to = _range_dates(range_days=range_days, period=period, date_from_unix=date_from_unix, date_to_unix=date_to_unix)
     dt_from, dt_to = _date_bounds_utc(d_from, d_to)
 
-    # Previous period
-    eff_days = (d_to - d_from).days + 1
-    prev_to = d_from - timedelta(days=1)
-    prev_from = prev_to - timedelta(days=(eff_days - 1))
-    prev_dt_from, prev_dt_to = _date_bounds_utc(prev_from, prev_to)
-
-    # Get extended KPIs
-    feedbacks_kpis, rating_dist = await _feedbacks_kpis_extended(db, shop_ids, dt_from, dt_to, prev_dt_from, prev_dt_to)
-    questions_kpis = await _questions_kpis_extended(db, shop_ids, dt_from, dt_to, prev_dt_from, prev_dt_to)
-    chats_kpis = await _chats_kpis_extended(db, shop_ids, dt_from, dt_to, prev_dt_from, prev_dt_to)
-
-    # Attention items
-    attention_items: list[AttentionItem] = []
-
-    # 1. Negative reviews waiting > 24h (highest priority)
-    if feedbacks_kpis.negativeWaiting24h > 0:
-        attention_items.append(AttentionItem(
-            type="negative_reviews",
-            count=feedbacks_kpis.negativeWaiting24h,
-            title=f"{feedbacks_kpis.negativeWaiting24h} негативных отзыва",
-            subtitle="Клиенты ждут ответа более 24 часов",
-            severity="high",
-            link="/app/feedbacks?filter=negative",
-        ))
-
-    # 2. Unanswered feedbacks (new - high priority)
-    unanswered_feedbacks = feedbacks_kpis.unanswered or 0
-    if unanswered_feedbacks > 0:
-        attention_items.append(AttentionItem(
-            type="unanswered_reviews",
-            count=unanswered_feedbacks,
-            title=f"{unanswered_feedbacks} отзывов без ответа",
-            subtitle="Ожидают ответа",
-            severity="high",
-            link="/app/feedbacks?filter=unanswered",
-        ))
-
-    # 3. Drafts ready for review
-    if feedbacks_kpis.draftsReady > 0:
-        attention_items.append(AttentionItem(
-            type="pending_drafts",
-            count=feedbacks_kpis.draftsReady,
-            title=f"{feedbacks_kpis.draftsReady} черновиков готовы",
-            subtitle="Проверьте и опубликуйте ответы",
-            severity="medium",
-            link="/app/drafts",
-        ))
-
-    # 4. Unanswered questions
-    if questions_kpis.unanswered > 0:
-        attention_items.append(AttentionItem(
-            type="unanswered_questions",
-            count=questions_kpis.unanswered,
-            title=f"{questions_kpis.unanswered} вопроса без ответа",
-            subtitle="Вопросы от покупателей",
-            severity="low",
-            link="/app/questions",
-        ))
-
-    # 5. Active chats
-    if chats_kpis.active > 0:
-        attention_items.append(AttentionItem(
-            type="active_chats",
-            count=chats_kpis.active,
-            title=f"{chats_kpis.active} активных чатов",
-            subtitle="Требуют ответа",
-            severity="medium",
-            link="/app/chats",
-        ))
+    async def _build() -> DashboardMainOut:
+        # Previous period
+        eff_days = (d_to - d_from).days + 1
+        prev_to = d_from - timedelta(days=1)
+        prev_from = prev_to - timedelta(days=(eff_days - 1))
+        prev_dt_from, prev_dt_to = _date_bounds_utc(prev_from, prev_to)
+
+        # Get extended KPIs
+        # Independent blocks run concurrently on separate pooled sessions.
+        windows = (dt_from, dt_to, prev_dt_from, prev_dt_to)
+        (feedbacks_kpis, rating_dist), questions_kpis, chats_kpis, settings_obj = await gather_in_sessions(
+            lambda s: _feedbacks_kpis_extended(s, shop_ids, *windows),
+            lambda s: _questions_kpis_extended(s, shop_ids, *windows),
+            lambda s: _chats_kpis_extended(s, shop_ids, *windows),
+            lambda s: _shop_settings(s, shop_id),
+            release=db,
+        )
 
-    # Get settings for automation status
-    automation_mode = "control"
-    automation_status = "ok"
-    sync_interval = "каждый час"
-    last_sync_at: str | None = None
+        # Attention items
+        attention_items: list[AttentionItem] = []
+
+        # 1. Negative reviews waiting > 24h (highest priority)
+        if feedbacks_kpis.negativeWaiting24h > 0:
+            attention_items.append(AttentionItem(
+                type="negative_reviews",
+                count=feedbacks_kpis.negativeWaiting24h,
+                title=f"{feedbacks_kpis.negativeWaiting24h} негативных отзыва",
+                subtitle="Клиенты ждут ответа более 24 часов",
+                severity="high",
+                link="/app/feedbacks?filter=negative",
+            ))
+
+        # 2. Unanswered feedbacks (new - high priority)
+        unanswered_feedbacks = feedbacks_kpis.unanswered or 0
+        if unanswered_feedbacks > 0:
+            attention_items.append(AttentionItem(
+                type="unanswered_reviews",
+                count=unanswered_feedbacks,
+                title=f"{unanswered_feedbacks} отзывов без ответа",
+                subtitle="Ожидают ответа",
+                severity="high",
+                link="/app/feedbacks?filter=unanswered",
+            ))
+
+        # 3. Drafts ready for review
+        if feedbacks_kpis.draftsReady > 0:
+            attention_items.append(AttentionItem(
+                type="pending_drafts",
+                count=feedbacks_kpis.draftsReady,
+                title=f"{feedbacks_kpis.draftsReady} черновиков готовы",
+                subtitle="Проверьте и опубликуйте ответы",
+                severity="medium",
+                link="/app/drafts",
+            ))
+
+        # 4. Unanswered questions
+        if questions_kpis.unanswered > 0:
+            attention_items.append(AttentionItem(
+                type="unanswered_questions",
+                count=questions_kpis.unanswered,
+                title=f"{questions_kpis.unanswered} вопроса без ответа",
+                subtitle="Вопросы от покупателей",
+                severity="low",
+                link="/app/questions",
+            ))
+
+        # 5. Active chats
+        if chats_kpis.active > 0:
+            attention_items.append(AttentionItem(
+                type="active_chats",
+                count=chats_kpis.active,
+                title=f"{chats_kpis.active} активных чатов",
+                subtitle="Требуют ответа",
+                severity="medium",
+                link="/app/chats",
+            ))
+
+        # Get settings for automation status
+        automation_mode = "control"
+        automation_status = "ok"
+        sync_interval = "каждый час"
+        last_sync_at: str | None = None
 
-    if shop_id:
-        settings_obj = await ShopRepo(db).get_settings(shop_id)
         if settings_obj:
             config = settings_obj.config or {}
             automation_mode = config.get("automation_mode", "control")
@@ -435,17 +486,19 @@ async def dashboard_main(
                     automation_status = "stale"
                 last_sync_at = settings_obj.last_sync_at.isoformat()
 
-    return DashboardMainOut(
-        feedbacks=feedbacks_kpis,
-        questions=questions_kpis,
-        chats=chats_kpis,
-        attentionItems=attention_items,
-        ratingDistribution=rating_dist,
-        automationStatus=automation_status,
-        automationMode=automation_mode,
-        syncInterval=sync_interval,
-        lastSyncAt=last_sync_at,
-    )
+        return DashboardMainOut(
+            feedbacks=feedbacks_kpis,
+            questions=questions_kpis,
+            chats=chats_kpis,
+            attentionItems=attention_items,
+            ratingDistribution=rating_dist,
+            automationStatus=automation_status,
+            automationMode=automation_mode,
+            syncInterval=sync_interval,
+            lastSyncAt=last_sync_at,
+        )
+
+    return await cached_dashboard_response(request, db, key=("main", shop_id, d_from, d_to), shop_ids=shop_ids, build=_build)
 
 
 @router.post("/sync-all", response_model=DashboardSyncOut)
@@ -516,27 +569,14 @@ async def dashboard_sync_all(
     return DashboardSyncOut(queued=queued, skipped=skipped, job_ids=job_ids)
 
 
-async def _timeseries_feedbacks(
-    db: AsyncSession,
-    shop_ids: list[int],
-    d_from: date,
-    d_to: date,
-) -> list[DashboardLinePoint]:
-    dt_from, dt_to = _date_bounds_utc(d_from, d_to)
-    day_expr = func.date_trunc("day", Feedback.created_date).label("day")
+async def _daily_line(db: AsyncSession, model, shop_ids: list[int], d_from: date, d_to: date) -> list[DashboardLinePoint]:
+    """Per-day totals from a daily stats rollup, zero-filled over [d_from, d_to]."""
     q = (
-        select(day_expr, func.count().label("cnt"))
-        .where(and_(Feedback.shop_id.in_(shop_ids), Feedback.created_date >= dt_from, Feedback.created_date <= dt_to))
-        .group_by(day_expr)
-        .order_by(day_expr)
+        select(model.day_utc, func.sum(model.total).label("cnt"))
+        .where(model.shop_id.in_(shop_ids), model.day_utc >= d_from, model.day_utc <= d_to)
+        .group_by(model.day_utc)
     )
-    rows = (await db.execute(q)).all()
-    by_day: dict[date, int] = {}
-    for day_dt, cnt in rows:
-        try:
-            by_day[day_dt.date()] = int(cnt)
-        except Exception:
-            continue
+    by_day: dict[date, int] = {day: int(cnt or 0) for day, cnt in (await db.execute(q)).all()}
 
     out: list[DashboardLinePoint] = []
     cur = d_from
@@ -546,6 +586,15 @@ async def _timeseries_feedbacks(
     return out
 
 
+async def _timeseries_feedbacks(
+    db: AsyncSession,
+    shop_ids: list[int],
+    d_from: date,
+    d_to: date,
+) -> list[DashboardLinePoint]:
+    return await _daily_line(db, FeedbackDailyStat, shop_ids, d_from, d_to)
+
+
 async def _top_products_feedbacks(
     db: AsyncSession,
     shop_ids: list[int],
@@ -555,32 +604,29 @@ async def _top_products_feedbacks(
     positive: bool,
     limit: int,
 ) -> list[DashboardTopItem]:
-    title_expr = Feedback.product_details["productName"].astext
-    brand_expr = Feedback.product_details["brandName"].astext
-
+    st = FeedbackDailyStat
     cond = [
-        Feedback.shop_id.in_(shop_ids),
-        Feedback.created_date >= dt_from,
-        Feedback.created_date <= dt_to,
-        title_expr.is_not(None),
+        st.shop_id.in_(shop_ids),
+        _day_window(st.day_utc, dt_from, dt_to),
+        st.product_name.is_not(None),
     ]
 
     if positive:
-        cond.append(Feedback.product_valuation.in_([4, 5]))
+        cond.append(st.rating.in_([4, 5]))
     else:
         # "Отрицательные" in UI: everything <= 3
-        cond.append(Feedback.product_valuation.is_not(None))
-        cond.append(Feedback.product_valuation <= 3)
+        cond.append(st.rating.between(1, 3))
 
+    cnt = func.sum(st.total)
     q = (
         select(
-            title_expr.label("title"),
-            brand_expr.label("brand"),
-            func.count().label("cnt"),
+            st.product_name.label("title"),
+            st.brand_name.label("brand"),
+            cnt.label("cnt"),
         )
         .where(and_(*cond))
-        .group_by(title_expr, brand_expr)
-        .order_by(desc(func.count()))
+        .group_by(st.product_name, st.brand_name)
+        .order_by(desc(cnt))
         .limit(limit)
     )
     rows = (await db.execute(q)).mappings().all()
@@ -615,29 +661,34 @@ async def dashboard_feedbacks(
     d_from, d_to = _range_dates(range_days=range_days, period=period, date_from_unix=date_from_unix, date_to_unix=date_to_unix)
     dt_from, dt_to = _date_bounds_utc(d_from, d_to)
 
-    kpis = await _feedbacks_kpis(db, shop_ids, dt_from, dt_to)
-    current_line = await _timeseries_feedbacks(db, shop_ids, d_from, d_to)
-
-    # Previous period for legend/compare
-    eff_days = (d_to - d_from).days + 1
-    prev_to = d_from - timedelta(days=1)
-    prev_from = prev_to - timedelta(days=(eff_days - 1))
-    prev_line = await _timeseries_feedbacks(db, shop_ids, prev_from, prev_to)
-
-    top_pos = await _top_products_feedbacks(db, shop_ids, dt_from, dt_to, positive=True, limit=top_n)
-    top_neg = await _top_products_feedbacks(db, shop_ids, dt_from, dt_to, positive=False, limit=top_n)
-
-    return DashboardFeedbacksOut(
-        meta=DashboardMeta(shop_ids=shop_ids, range_days=eff_days, date_from=d_from, date_to=d_to),
-        kpis=kpis,
-        line=DashboardLineBlock(
-            data=current_line,
-            periodText=_fmt_period(d_from, d_to),
-            previousData=prev_line,
-            previousPeriodText=_fmt_period(prev_from, prev_to),
-        ),
-        top=DashboardTopBlock(positive=top_pos, negative=top_neg),
-    )
+    async def _build() -> DashboardFeedbacksOut:
+        # Previous period for legend/compare
+        eff_days = (d_to - d_from).days + 1
+        prev_to = d_from - timedelta(days=1)
+        prev_from = prev_to - timedelta(days=(eff_days - 1))
+
+        kpis, current_line, prev_line, top_pos, top_neg = await gather_in_sessions(
+            lambda s: _feedbacks_kpis(s, shop_ids, dt_from, dt_to),
+            lambda s: _timeseries_feedbacks(s, shop_ids, d_from, d_to),
+            lambda s: _timeseries_feedbacks(s, shop_ids, prev_from, prev_to),
+            lambda s: _top_products_feedbacks(s, shop_ids, dt_from, dt_to, positive=True, limit=top_n),
+            lambda s: _top_products_feedbacks(s, shop_ids, dt_from, dt_to, positive=False, limit=top_n),
+            release=db,
+        )
+
+        return DashboardFeedbacksOut(
+            meta=DashboardMeta(shop_ids=shop_ids, range_days=eff_days, date_from=d_from, date_to=d_to),
+            kpis=kpis,
+            line=DashboardLineBlock(
+                data=current_line,
+                periodText=_fmt_period(d_from, d_to),
+                previousData=prev_line,
+                previousPeriodText=_fmt_period(prev_from, prev_to),
+            ),
+            top=DashboardTopBlock(positive=top_pos, negative=top_neg),
+        )
+
+    return await cached_dashboard_response(request, db, key=("feedbacks", d_from, d_to, top_n), shop_ids=shop_ids, build=_build)
 
 
 @router.post("/feedbacks/sync", response_model=DashboardSyncOut)
@@ -706,6 +757,7 @@ async def dashboard_reviews_alias(
     user=Depends(get_current_user),
 ):
     return await dashboard_feedbacks(
+        request=request,
         shop_id=shop_id,
         period=period,
         range_days=range_days,
@@ -761,73 +813,45 @@ async def dashboard_questions(
     d_from, d_to = _range_dates(range_days=range_days, period=period, date_from_unix=date_from_unix, date_to_unix=date_to_unix)
     dt_from, dt_to = _date_bounds_utc(d_from, d_to)
 
-    # KPIs (questions answered/unanswered)
-    cond = [Question.shop_id.in_(shop_ids), Question.created_date >= dt_from, Question.created_date <= dt_to]
-    total = int((await db.execute(select(func.count()).select_from(Question).where(and_(*cond)))).scalar_one() or 0)
-    pending = int((await db.execute(select(func.count()).select_from(Question).where(and_(*cond, Question.answer_text.is_(None))))).scalar_one() or 0)
-    answered = max(total - pending, 0)
-    kpis = DashboardKpis(total=total, pending=pending, unanswered=pending, answered=answered, avgRating=0.0, positiveShare=0)
-
-    # Timeseries: reuse same line format
-    day_expr = func.date_trunc("day", Question.created_date).label("day")
-    q = (
-        select(day_expr, func.count().label("cnt"))
-        .where(and_(Question.shop_id.in_(shop_ids), Question.created_date >= dt_from, Question.created_date <= dt_to))
-        .group_by(day_expr)
-        .order_by(day_expr)
-    )
-    rows = (await db.execute(q)).all()
-    by_day: dict[date, int] = {r[0].date(): int(r[1]) for r in rows}
-    data: list[DashboardLinePoint] = []
-    cur = d_from
-    while cur <= d_to:
-        data.append(DashboardLinePoint(d=cur.strftime("%d.%m"), v=by_day.get(cur, 0)))
-        cur += timedelta(days=1)
+    async def _build() -> DashboardFeedbacksOut:
+        # KPIs (questions answered/unanswered)
+        st = QuestionDailyStat
+        total, answered = (await db.execute(
+            select(_sum(st.total), _sum(st.answered)).where(st.shop_id.in_(shop_ids), _day_window(st.day_utc, dt_from, dt_to))
+        )).one()
+        total, answered = int(total or 0), int(answered or 0)
+        pending = max(total - answered, 0)
+        kpis = DashboardKpis(total=total, pending=pending, unanswered=pending, answered=answered, avgRating=0.0, positiveShare=0)
+
+        # Timeseries: reuse same line format
+        data = await _timeseries_questions(db, shop_ids, d_from, d_to)
+
+        # Previous
+        eff_days = (d_to - d_from).days + 1
+        prev_to = d_from - timedelta(days=1)
+        prev_from = prev_to - timedelta(days=(eff_days - 1))
+        prev_data = []
+        # keep cheap: no extra query if not needed
+        prev_data = await _timeseries_questions(db, shop_ids, prev_from, prev_to)
+
+        # Top block not used yet for questions; return empty.
+        return DashboardFeedbacksOut(
+            meta=DashboardMeta(shop_ids=shop_ids, range_days=eff_days, date_from=d_from, date_to=d_to),
+            kpis=kpis,
+            line=DashboardLineBlock(
+                data=data,
+                periodText=_fmt_period(d_from, d_to),
+                previousData=prev_data,
+                previousPeriodText=_fmt_period(prev_from, prev_to),
+            ),
+            top=DashboardTopBlock(positive=[], negative=[]),
+        )
 
-    # Previous
-    eff_days = (d_to - d_from).days + 1
-    prev_to = d_from - timedelta(days=1)
-    prev_from = prev_to - timedelta(days=(eff_days - 1))
-    prev_data = []
-    # keep cheap: no extra query if not needed
-    prev_data = await _timeseries_questions(db, shop_ids, prev_from, prev_to)
-
-    # Top block not used yet for questions; return empty.
-    return DashboardFeedbacksOut(
-        meta=DashboardMeta(shop_ids=shop_ids, range_days=eff_days, date_from=d_from, date_to=d_to),
-        kpis=kpis,
-        line=DashboardLineBlock(
-            data=data,
-            periodText=_fmt_period(d_from, d_to),
-            previousData=prev_data,
-            previousPeriodText=_fmt_period(prev_from, prev_to),
-        ),
-        top=DashboardTopBlock(positive=[], negative=[]),
-    )
+    return await cached_dashboard_response(request, db, key=("questions", d_from, d_to), shop_ids=shop_ids, build=_build)
 
 
 async def _timeseries_questions(db: AsyncSession, shop_ids: list[int], d_from: date, d_to: date) -> list[DashboardLinePoint]:
-    dt_from, dt_to = _date_bounds_utc(d_from, d_to)
-    day_expr = func.date_trunc("day", Question.created_date).label("day")
-    q = (
-        select(day_expr, func.count().label("cnt"))
-        .where(and_(Question.shop_id.in_(shop_ids), Question.created_date >= dt_from, Question.created_date <= dt_to))
-        .group_by(day_expr)
-        .order_by(day_expr)
-    )
-    rows = (await db.execute(q)).all()
-    by_day: dict[date, int] = {}
-    for day_dt, cnt in rows:
-        try:
-            by_day[day_dt.date()] = int(cnt)
-        except Exception:
-            continue
-    out: list[DashboardLinePoint] = []
-    cur = d_from
-    while cur <= d_to:
-        out.append(DashboardLinePoint(d=cur.strftime("%d.%m"), v=by_day.get(cur, 0)))
-        cur += timedelta(days=1)
-    return out
+    return await _daily_line(db, QuestionDailyStat, shop_ids, d_from, d_to)
 
 
 @router.post("/questions/sync", response_model=DashboardSyncOut)
@@ -896,48 +920,51 @@ async def dashboard_chats(
     d_from, d_to = _range_dates(range_days=range_days, period=period, date_from_unix=date_from_unix, date_to_unix=date_to_unix)
     dt_from, dt_to = _date_bounds_utc(d_from, d_to)
 
-    # Chats KPI: number of sessions updated in range.
-    total = int(
-        (await db.execute(
-            select(func.count()).select_from(ChatSession).where(
-                and_(ChatSession.shop_id.in_(shop_ids), ChatSession.updated_at >= dt_from, ChatSession.updated_at <= dt_to)
-            )
-        )).scalar_one() or 0
-    )
-    kpis = DashboardKpis(total=total, pending=0, unanswered=0, answered=0, avgRating=0.0, positiveShare=0)
-
-    # Timeseries based on updated_at
-    day_expr = func.date_trunc("day", ChatSession.updated_at).label("day")
-    q = (
-        select(day_expr, func.count().label("cnt"))
-        .where(and_(ChatSession.shop_id.in_(shop_ids), ChatSession.updated_at >= dt_from, ChatSession.updated_at <= dt_to))
-        .group_by(day_expr)
-        .order_by(day_expr)
-    )
-    rows = (await db.execute(q)).all()
-    by_day: dict[date, int] = {r[0].date(): int(r[1]) for r in rows}
-    data: list[DashboardLinePoint] = []
-    cur = d_from
-    while cur <= d_to:
-        data.append(DashboardLinePoint(d=cur.strftime("%d.%m"), v=by_day.get(cur, 0)))
-        cur += timedelta(days=1)
+    async def _build() -> DashboardFeedbacksOut:
+        # Chats KPI: number of sessions updated in range.
+        total = int(
+            (await db.execute(
+                select(func.count()).select_from(ChatSession).where(
+                    and_(ChatSession.shop_id.in_(shop_ids), ChatSession.updated_at >= dt_from, ChatSession.updated_at <= dt_to)
+                )
+            )).scalar_one() or 0
+        )
+        kpis = DashboardKpis(total=total, pending=0, unanswered=0, answered=0, avgRating=0.0, positiveShare=0)
+
+        # Timeseries based on updated_at
+        day_expr = func.date_trunc("day", ChatSession.updated_at).label("day")
+        q = (
+            select(day_expr, func.count().label("cnt"))
+            .where(and_(ChatSession.shop_id.in_(shop_ids), ChatSession.updated_at >= dt_from, ChatSession.updated_at <= dt_to))
+            .group_by(day_expr)
+            .order_by(day_expr)
+        )
+        rows = (await db.execute(q)).all()
+        by_day: dict[date, int] = {r[0].date(): int(r[1]) for r in rows}
+        data: list[DashboardLinePoint] = []
+        cur = d_from
+        while cur <= d_to:
+            data.append(DashboardLinePoint(d=cur.strftime("%d.%m"), v=by_day.get(cur, 0)))
+            cur += timedelta(days=1)
+
+        eff_days = (d_to - d_from).days + 1
+        prev_to = d_from - timedelta(days=1)
+        prev_from = prev_to - timedelta(days=(eff_days - 1))
+        prev_data = await _timeseries_chats(db, shop_ids, prev_from, prev_to)
+
+        return DashboardFeedbacksOut(
+            meta=DashboardMeta(shop_ids=shop_ids, range_days=eff_days, date_from=d_from, date_to=d_to),
+            kpis=kpis,
+            line=DashboardLineBlock(
+                data=data,
+                periodText=_fmt_period(d_from, d_to),
+                previousData=prev_data,
+                previousPeriodText=_fmt_period(prev_from, prev_to),
+            ),
+            top=DashboardTopBlock(positive=[], negative=[]),
+        )
 
-    eff_days = (d_to - d_from).days + 1
-    prev_to = d_from - timedelta(days=1)
-    prev_from = prev_to - timedelta(days=(eff_days - 1))
-    prev_data = await _timeseries_chats(db, shop_ids, prev_from, prev_to)
-
-    return DashboardFeedbacksOut(
-        meta=DashboardMeta(shop_ids=shop_ids, range_days=eff_days, date_from=d_from, date_to=d_to),
-        kpis=kpis,
-        line=DashboardLineBlock(
-            data=data,
-            periodText=_fmt_period(d_from, d_to),
-            previousData=prev_data,
-            previousPeriodText=_fmt_period(prev_from, prev_to),
-        ),
-        top=DashboardTopBlock(positive=[], negative=[]),
-    )
+    return await cached_dashboard_response(request, db, key=("chats", d_from, d_to), shop_ids=shop_ids, build=_build)
 
 
 async def _timeseries_chats(db: AsyncSession, shop_ids: list[int], d_from: date, d_to: date) -> list[DashboardLinePoint]:
@@ -1,18 +1,23 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.db import AsyncSessionMaker
+
 from app.core.config import settings as app_settings
 from app.repos.product_card_repo import ProductCardRepo
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import PageCursor, get_db, get_current_user, page_cursor
 from app.api.access import require_shop_access
 from app.models.enums import ShopMemberRole
 from app.repos.shop_repo import ShopRepo
 from app.repos.feedback_repo import FeedbackRepo
 from app.repos.draft_repo import DraftRepo
+from app.repos.pagination import next_cursor
 from app.repos.shop_billing_repo import ShopBillingRepo
+from app.repos.shop_data_version_repo import ShopDataVersionRepo
 from app.schemas.drafts import DraftListItem, DraftDetail, DraftUpdateRequest
 
 import logging
@@ -83,6 +88,7 @@ async def list_drafts(
     status: str | None = Query(default=None, description="drafted|published|rejected"),
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    page: PageCursor = Depends(page_cursor),
     db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user),
 ):
@@ -92,12 +98,18 @@ async def list_drafts(
         shop_id=shop_id,
         status=status,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=page.cursor,
+        with_total=page.with_total,
     )
 
     await _attach_product_images(db, shop_id, drafts)
     if response is not None:
-        response.headers["X-Total-Count"] = str(total)
+        if total is not None:
+            response.headers["X-Total-Count"] = str(total)
+        nxt = next_cursor(drafts, limit, "created_at")
+        if nxt:
+            response.headers["X-Next-Cursor"] = nxt
     return drafts
 
 
@@ -113,6 +125,7 @@ async def list_pending_drafts(
     has_media: bool | None = Query(default=None),
     rating_min: int | None = Query(default=None, ge=1, le=5),
     rating_max: int | None = Query(default=None, ge=1, le=5),
+    page: PageCursor = Depends(page_cursor),
     db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user),
 ):
@@ -131,11 +144,17 @@ async def list_pending_drafts(
         has_media=has_media,
         rating_min=rating_min,
         rating_max=rating_max,
+        cursor=page.cursor,
+        with_total=page.with_total,
     )
 
     await _attach_product_images(db, shop_id, drafts)
     if response is not None:
-        response.headers["X-Total-Count"] = str(total)
+        if total is not None:
+            response.headers["X-Total-Count"] = str(total)
+        nxt = next_cursor(drafts, limit, "created_at")
+        if nxt:
+            response.headers["X-Next-Cursor"] = nxt
     return drafts
 
 
@@ -226,7 +245,7 @@ async def approve_draft(
     finally:
         await wb.aclose()
     
-    draft.feedback.answer_text = draft.text
+    await FeedbackRepo(db).set_answer(draft.feedback, draft.text)
     draft.status = DraftStatus.published.value
     draft.published_at = datetime.now(timezone.utc)
     
@@ -259,6 +278,7 @@ async def reject_draft(
     from app.models.enums import DraftStatus
     
     draft.status = DraftStatus.rejected.value
+    await ShopDataVersionRepo(db).bump(shop_id)
     await db.commit()
     
     return {"rejected": True}
@@ -286,7 +306,11 @@ async def regenerate_draft(
         raise HTTPException(status_code=404, detail="Settings not found")
     
     # Billing: charge credits before spending OpenAI tokens.
+    from app.services.template_drafting import TEMPLATE_MODEL, template_fast_path_applies
+
     credits_per_draft = int(getattr(app_settings, "CREDITS_PER_DRAFT", 1) or 1)
+    if template_fast_path_applies(draft.feedback, settings_obj):
+        credits_per_draft = 0
     charged = False
     if credits_per_draft > 0:
         charged = await ShopBillingRepo(db).try_charge(
@@ -305,8 +329,9 @@ async def regenerate_draft(
 
     openai = OpenAIService()
     try:
-        text, model, response_id, prompt_tokens, completion_tokens = await generate_draft_text(
-            openai, draft.feedback, settings_obj, bundle=bundle
+        # Regenerate must produce a new reply, never a stored candidate (it is charged).
+        text, model, response_id, prompt_tokens, completion_tokens, cached = await generate_draft_text(
+            openai, draft.feedback, settings_obj, bundle=bundle, use_cache=False
         )
     except Exception:
         if charged and credits_per_draft > 0:
@@ -328,15 +353,16 @@ async def regenerate_draft(
     if not updated:
         raise HTTPException(status_code=404, detail="Draft not found")
 
-    await record_gpt_usage(
-        db,
-        shop_id=shop_id,
-        model=model,
-        operation_type="review_draft",
-        prompt_tokens=prompt_tokens,
-        completion_tokens=completion_tokens,
-        response_id=response_id,
-    )
+    if model != TEMPLATE_MODEL and not cached:
+        await record_gpt_usage(
+            db,
+            shop_id=shop_id,
+            model=model,
+            operation_type="review_draft",
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            response_id=response_id,
+        )
 
     await db.commit()
     await db.refresh(updated)
@@ -348,6 +374,79 @@ async def regenerate_draft(
     }
 
 
+@router.post("/{shop_id}/drafts/{draft_id}/regenerate/stream")
+async def regenerate_draft_stream(
+    shop_id: int,
+    draft_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """SSE variant of regenerate: `delta`/`replace` events while generating, `done` once the draft is saved."""
+    (await require_shop_access(db, user, shop_id, request=request, min_role=ShopMemberRole.manager.value)).shop
+
+    draft = await DraftRepo(db).get_with_feedback(draft_id)
+    if not draft or draft.feedback.shop_id != shop_id:
+        raise HTTPException(status_code=404, detail="Draft not found")
+
+    settings_obj = await ShopRepo(db).get_settings(shop_id)
+    if not settings_obj:
+        raise HTTPException(status_code=404, detail="Settings not found")
+
+    from app.services.openai_client import OpenAIService
+    from app.services.drafting import sanitize_output, stream_draft_text
+    from app.services.gpt_accounting import record_gpt_usage
+    from app.services.streaming import SSE_HEADERS, refund_credits, sse_generation
+    from app.services.template_drafting import TEMPLATE_MODEL, template_fast_path_applies
+
+    credits_per_draft = int(getattr(app_settings, "CREDITS_PER_DRAFT", 1) or 1)
+    if template_fast_path_applies(draft.feedback, settings_obj):
+        credits_per_draft = 0
+    meta = {"shop_id": shop_id, "draft_id": draft_id, "feedback_id": draft.feedback_id}
+    if credits_per_draft > 0:
+        charged = await ShopBillingRepo(db).try_charge(
+            shop_id, amount=credits_per_draft, reason="feedback_regenerate", meta=meta
+        )
+        if not charged:
+            raise HTTPException(status_code=402, detail="Insufficient credits")
+
+    bundle = await get_global_bundle(db)
+    openai = OpenAIService()
+    # Loaded objects survive the commit (expire_on_commit=False); don't hold the transaction while streaming.
+    # Regenerate must produce a new reply, never a stored candidate (it is charged).
+    chunks = stream_draft_text(openai, draft.feedback, settings_obj, bundle=bundle, use_cache=False)
+    await db.commit()
+
+    async def _on_complete(text: str, res) -> dict:
+        async with AsyncSessionMaker() as s:
+            async with s.begin():
+                updated = await DraftRepo(s).update_text(
+                    draft_id, text=text, openai_model=res.model, openai_response_id=res.response_id
+                )
+                if not updated:
+                    raise RuntimeError("Draft not found")
+                if res.model != TEMPLATE_MODEL and not res.cached:
+                    await record_gpt_usage(
+                        s,
+                        shop_id=shop_id,
+                        model=res.model,
+                        operation_type="review_draft",
+                        prompt_tokens=res.prompt_tokens,
+                        completion_tokens=res.completion_tokens,
+                        response_id=res.response_id,
+                    )
+        return {"regenerated": True, "draft_id": draft_id}
+
+    async def _on_error(exc: BaseException) -> None:
+        await refund_credits(shop_id, amount=credits_per_draft, reason="refund_feedback_regenerate_error", meta=meta)
+
+    return StreamingResponse(
+        sse_generation(chunks, sanitize=sanitize_output, on_complete=_on_complete, on_error=_on_error),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
 @router.get("/{shop_id}/drafts/stats")
 async def get_draft_stats(
     shop_id: int,
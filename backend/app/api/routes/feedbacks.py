@@ -4,15 +4,17 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Response, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import PageCursor, get_db, get_current_user, page_cursor
 from app.api.access import require_shop_access
 from app.models.enums import ShopMemberRole
 from app.repos.shop_repo import ShopRepo
 from app.repos.feedback_repo import FeedbackRepo
+from app.repos.pagination import next_cursor
 from app.repos.product_card_repo import ProductCardRepo
 from app.repos.draft_repo import DraftRepo
 from app.repos.job_repo import JobRepo
 from app.repos.shop_billing_repo import ShopBillingRepo
+from app.repos.shop_data_version_repo import ShopDataVersionRepo
 from app.models.enums import JobType
 from app.schemas.feedback import (
     FeedbackListItem,
@@ -25,7 +27,9 @@ from app.schemas.feedback import (
 )
 from app.services.openai_client import OpenAIService
 from app.services.drafting import generate_draft_text
+from app.services.template_drafting import TEMPLATE_MODEL, template_fast_path_applies
 from app.services.gpt_accounting import record_gpt_usage
+from app.services import credit_reservations
 from app.services.prompt_store import get_global_bundle
 from app.services.wb_client import WBClient
 from app.core.crypto import decrypt_secret
@@ -88,9 +92,28 @@ async def bulk_draft(
         return BulkDraftResponse(queued=0, skipped_existing=0, limited_by_balance=True)
 
     fbs = await FeedbackRepo(db).list_unanswered_without_drafts(shop_id=shop_id, limit=cap)
+    if not fbs:
+        return BulkDraftResponse(queued=0, skipped_existing=0, limited_by_balance=limited_by_balance)
+
+    # One locked charge for the whole batch; jobs consume from the reservation and the
+    # unused remainder is returned when the batch settles.
+    reservation = await credit_reservations.reserve(
+        db,
+        shop_id,
+        amount=len(fbs) * credits_per_draft,
+        expected_items=len(fbs),
+        reason="bulk_draft",
+        actor_user_id=getattr(user, "id", None),
+    )
+    if reservation is None:
+        return BulkDraftResponse(queued=0, skipped_existing=0, limited_by_balance=True)
+
     job_repo = JobRepo(db)
     for fb in fbs:
-        await job_repo.enqueue(JobType.generate_draft.value, {"shop_id": shop_id, "feedback_id": fb.id, "source": "bulk"})
+        await job_repo.enqueue(
+            JobType.generate_draft.value,
+            {"shop_id": shop_id, "feedback_id": fb.id, "source": "bulk", "reservation_id": reservation.id},
+        )
 
     await db.commit()
     return BulkDraftResponse(queued=len(fbs), skipped_existing=0, limited_by_balance=limited_by_balance)
@@ -112,8 +135,11 @@ async def list_feedbacks(
     rating_max: int | None = Query(default=None, ge=1, le=5, description="Maximum rating (inclusive)"),
     has_text: bool | None = Query(default=None),
     has_media: bool | None = Query(default=None),
+    nm_id: int | None = Query(default=None, description="WB article (nmId)"),
+    sort: str = Query(default="relevance", pattern=r"^(relevance|date)$", description="Order of q= results"),
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    page: PageCursor = Depends(page_cursor),
     db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user),
 ):
@@ -131,8 +157,12 @@ async def list_feedbacks(
         rating_max=rating_max,
         has_text=has_text,
         has_media=has_media,
+        nm_id=nm_id,
+        sort=sort,
         limit=limit,
         offset=offset,
+        cursor=page.cursor,
+        with_total=page.with_total,
     )
 
     # Debug: show nmID extraction quality.
@@ -181,7 +211,13 @@ async def list_feedbacks(
             shop_id,
         )
 
-    response.headers["X-Total-Count"] = str(total)
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    # Relevance-ranked search pages have no keyset; those keep using offset.
+    if page.cursor or not (q and q.strip() and sort == "relevance"):
+        nxt = next_cursor(rows, limit, "created_date")
+        if nxt:
+            response.headers["X-Next-Cursor"] = nxt
     return rows
 
 
@@ -239,6 +275,8 @@ async def generate_draft(shop_id: int, wb_id: str,request: Request, db: AsyncSes
 
     # Billing: charge credits before spending OpenAI tokens.
     credits_per_draft = int(getattr(settings, "CREDITS_PER_DRAFT", 1) or 1)
+    if template_fast_path_applies(fb, s):
+        credits_per_draft = 0
     charged = False
     if credits_per_draft > 0:
         charged = await ShopBillingRepo(db).try_charge(
@@ -253,7 +291,7 @@ async def generate_draft(shop_id: int, wb_id: str,request: Request, db: AsyncSes
     openai = OpenAIService()
     bundle = await get_global_bundle(db)
     try:
-        text, model, response_id, prompt_tokens, completion_tokens = await generate_draft_text(openai, fb, s, bundle=bundle)
+        text, model, response_id, prompt_tokens, completion_tokens, cached = await generate_draft_text(openai, fb, s, bundle=bundle)
     except Exception:
         if charged and credits_per_draft > 0:
             await ShopBillingRepo(db).apply_credits(
@@ -265,18 +303,20 @@ async def generate_draft(shop_id: int, wb_id: str,request: Request, db: AsyncSes
             await db.flush()
         raise
 
-    draft = await DraftRepo(db).create(feedback_id=fb.id, text=text, openai_model=model, openai_response_id=response_id)
+    draft = await DraftRepo(db).create(feedback_id=fb.id, text=text, openai_model=model, openai_response_id=response_id, shop_id=shop_id)
+    await ShopDataVersionRepo(db).bump(shop_id)
 
     # GPT usage accounting (finance dashboard)
-    await record_gpt_usage(
-        db,
-        shop_id=shop_id,
-        model=model,
-        operation_type="review_draft",
-        prompt_tokens=prompt_tokens,
-        completion_tokens=completion_tokens,
-        response_id=response_id,
-    )
+    if model != TEMPLATE_MODEL and not cached:
+        await record_gpt_usage(
+            db,
+            shop_id=shop_id,
+            model=model,
+            operation_type="review_draft",
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            response_id=response_id,
+        )
     await db.commit()
     return DraftCreateResponse(draft_id=draft.id, status=draft.status, text=draft.text)
 
@@ -328,7 +368,7 @@ async def publish_answer(shop_id: int, wb_id: str, request: Request, payload: An
     finally:
         await wb.aclose()
 
-    fb.answer_text = text
+    await FeedbackRepo(db).set_answer(fb, text)
     await db.commit()
     return {"published": True}
 
@@ -346,7 +386,7 @@ async def edit_answer(shop_id: int, wb_id: str, request: Request, payload: Answe
 
     fb = await FeedbackRepo(db).get_by_wb_id(shop_id, wb_id)
     if fb:
-        fb.answer_text = payload.text
+        await FeedbackRepo(db).set_answer(fb, payload.text)
     await db.commit()
     return {"edited": True}
 
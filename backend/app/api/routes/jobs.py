@@ -5,10 +5,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
 
 from app.api.deps import get_db, get_current_user
-from app.api.access import get_shop_access
-from app.models.enums import ShopMemberRole
+from app.api.access import get_shop_access, require_shop_access
+from app.models.enums import ShopMemberRole, JobType
 from app.models.job import Job
-from app.schemas.jobs import JobOut
+from app.repos.backfill_repo import BackfillRepo
+from app.schemas.jobs import JobOut, BackfillOut
 
 router = APIRouter()
 
@@ -24,12 +25,37 @@ async def _authorize_job(user, db: AsyncSession, job: Job) -> None:
         raise HTTPException(status_code=403, detail="Forbidden")
 
 
+async def _attach_progress(db: AsyncSession, jobs: list[Job]) -> None:
+    backfill_jobs = [j for j in jobs if j.type == JobType.backfill_shop.value and isinstance(j.payload, dict)]
+    if not backfill_jobs:
+        return
+    shop_ids = list({int(j.payload["shop_id"]) for j in backfill_jobs if j.payload.get("shop_id") is not None})
+    by_key = await BackfillRepo(db).map_for_shops(shop_ids)
+    for j in backfill_jobs:
+        bf = by_key.get((int(j.payload.get("shop_id") or 0), str(j.payload.get("stream"))))
+        setattr(j, "progress_pct", bf.progress_pct if bf else 0.0)
+
+
+@router.get("/backfill", response_model=list[BackfillOut])
+async def list_backfill(
+    request: Request,
+    shop_id: int = Query(...),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Initial backfill progress of a shop, per stream."""
+    await require_shop_access(db, user, shop_id, request=request, min_role=ShopMemberRole.manager.value)
+    rows = await BackfillRepo(db).list_for_shop(shop_id)
+    return [BackfillOut.model_validate(r) for r in rows]
+
+
 @router.get("/{job_id}", response_model=JobOut)
 async def get_job(job_id: int, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
     job = await db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     await _authorize_job(user, db, job)
+    await _attach_progress(db, [job])
     return job
 
 
@@ -58,4 +84,5 @@ async def list_jobs(
         access = await get_shop_access(db, user, int(sid))
         if access and access.at_least(ShopMemberRole.manager.value):
             out.append(j)
+    await _attach_progress(db, out)
     return out
@@ -1,16 +1,19 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import PageCursor, get_db, get_current_user, page_cursor
 from app.api.access import require_shop_access
 from app.models.enums import ShopMemberRole
 from app.repos.shop_repo import ShopRepo
 from app.repos.job_repo import JobRepo
+from app.repos.pagination import next_cursor
 from app.repos.question_repo import QuestionRepo
 from app.repos.question_draft_repo import QuestionDraftRepo
 from app.repos.shop_billing_repo import ShopBillingRepo
+from app.repos.shop_data_version_repo import ShopDataVersionRepo
 from app.models.enums import JobType
 from app.schemas.question import (
     QuestionListItem,
@@ -19,12 +22,14 @@ from app.schemas.question import (
     QuestionAnswerRequest,
 )
 from app.services.openai_client import OpenAIService
-from app.services.question_drafting import generate_question_draft_text
+from app.services.question_drafting import generate_question_draft_text, sanitize_output, stream_question_draft_text
 from app.services.gpt_accounting import record_gpt_usage
+from app.services.streaming import SSE_HEADERS, refund_credits, sse_generation
 from app.services.prompt_store import get_global_bundle
 from app.services.wb_client import WBClient
 from app.core.crypto import decrypt_secret
-from app.models import settings
+from app.core.config import settings
+from app.core.db import AsyncSessionMaker
 
 
 router = APIRouter()
@@ -60,24 +65,39 @@ async def request_sync(shop_id: int,request: Request, payload: QuestionSyncReque
 async def list_questions(
     request: Request,
     shop_id: int,
+    response: Response,
     is_answered: bool | None = Query(default=None),
     q: str | None = Query(default=None),
     user_name: str | None = Query(default=None),
+    nm_id: int | None = Query(default=None, description="WB article (nmId)"),
+    sort: str = Query(default="relevance", pattern=r"^(relevance|date)$", description="Order of q= results"),
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    page: PageCursor = Depends(page_cursor),
     db: AsyncSession = Depends(get_db),
     user=Depends(get_current_user),
 ):
     (await require_shop_access(db, user, shop_id, request=request, min_role=ShopMemberRole.manager.value)).shop
 
-    rows, _total = await QuestionRepo(db).list(
+    rows, total = await QuestionRepo(db).list(
         shop_id=shop_id,
         is_answered=is_answered,
         q=q,
         user_name=user_name,
+        nm_id=nm_id,
+        sort=sort,
         limit=limit,
         offset=offset,
+        cursor=page.cursor,
+        with_total=page.with_total,
     )
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+    # Relevance-ranked search pages have no keyset; those keep using offset.
+    if page.cursor or not (q and q.strip() and sort == "relevance"):
+        nxt = next_cursor(rows, limit, "created_date")
+        if nxt:
+            response.headers["X-Next-Cursor"] = nxt
     return rows
 
 
@@ -150,6 +170,7 @@ async def generate_draft(shop_id: int, wb_id: str, request: Request, db: AsyncSe
         raise
 
     draft = await QuestionDraftRepo(db).create(question_id=q.id, text=text, openai_model=model, openai_response_id=response_id)
+    await ShopDataVersionRepo(db).bump(shop_id)
     await record_gpt_usage(
         db,
         shop_id=shop_id,
@@ -163,6 +184,59 @@ async def generate_draft(shop_id: int, wb_id: str, request: Request, db: AsyncSe
     return {"draft_id": draft.id, "status": draft.status, "text": draft.text}
 
 
+@router.post("/{shop_id}/{wb_id}/draft/stream")
+async def generate_draft_stream(shop_id: int, wb_id: str, request: Request, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    """SSE variant of the question draft: `delta`/`replace` events while generating, `done` once saved."""
+    (await require_shop_access(db, user, shop_id, request=request, min_role=ShopMemberRole.manager.value)).shop
+
+    s = await ShopRepo(db).get_settings(shop_id)
+    if not s:
+        raise HTTPException(status_code=404, detail="Settings not found")
+
+    q = await QuestionRepo(db).get_by_wb_id(shop_id, wb_id)
+    if not q:
+        raise HTTPException(status_code=404, detail="Question not found in DB. Run sync first.")
+
+    credits_per_draft = int(getattr(settings, "CREDITS_PER_DRAFT", 1) or 1)
+    meta = {"shop_id": shop_id, "question_wb_id": wb_id, "question_id": q.id}
+    if credits_per_draft > 0:
+        charged = await ShopBillingRepo(db).try_charge(shop_id, amount=credits_per_draft, reason="question_draft_api", meta=meta)
+        if not charged:
+            raise HTTPException(status_code=402, detail="Insufficient credits")
+
+    bundle = await get_global_bundle(db)
+    chunks = stream_question_draft_text(OpenAIService(), q, s, bundle=bundle)
+    question_id = q.id
+    await db.commit()
+
+    async def _on_complete(text: str, res) -> dict:
+        async with AsyncSessionMaker() as s2:
+            async with s2.begin():
+                draft = await QuestionDraftRepo(s2).create(
+                    question_id=question_id, text=text, openai_model=res.model, openai_response_id=res.response_id
+                )
+                await ShopDataVersionRepo(s2).bump(shop_id)
+                await record_gpt_usage(
+                    s2,
+                    shop_id=shop_id,
+                    model=res.model,
+                    operation_type="question_draft",
+                    prompt_tokens=res.prompt_tokens,
+                    completion_tokens=res.completion_tokens,
+                    response_id=res.response_id,
+                )
+        return {"draft_id": draft.id, "status": draft.status}
+
+    async def _on_error(exc: BaseException) -> None:
+        await refund_credits(shop_id, amount=credits_per_draft, reason="refund_question_draft_api_error", meta=meta)
+
+    return StreamingResponse(
+        sse_generation(chunks, sanitize=sanitize_output, on_complete=_on_complete, on_error=_on_error),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
 @router.post("/{shop_id}/{wb_id}/publish")
 async def publish_answer(shop_id: int, wb_id: str,request: Request, payload: QuestionAnswerRequest | None = None, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
     shop = (await require_shop_access(db, user, shop_id, request=request, min_role=ShopMemberRole.manager.value)).shop
@@ -185,7 +259,7 @@ async def publish_answer(shop_id: int, wb_id: str,request: Request, payload: Que
     finally:
         await wb.aclose()
 
-    q.answer_text = text
+    await QuestionRepo(db).set_answer(q, text)
     await db.commit()
     return {"published": True}
 
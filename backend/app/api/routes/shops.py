@@ -6,7 +6,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_db, get_current_user
 from app.api.access import require_shop_access, require_admin_write
-from app.models.enums import UserRole, ShopMemberRole
+from app.core.config import settings
+from app.models.enums import UserRole, ShopMemberRole, JobType
 from app.models.shop_member import ShopMember
 from app.models.shop import Shop
 from app.repos.shop_member_repo import ShopMemberRepo
@@ -15,6 +16,7 @@ from app.core.crypto import encrypt_secret, decrypt_secret
 from app.services.wb_analytics_client import WBAnalyticsClient, cache_get, cache_set
 from app.repos.shop_repo import ShopRepo
 from app.repos.job_repo import JobRepo
+from app.services.backfill import BACKFILL_STREAMS
 from app.schemas.shop import ShopCreate, ShopOut, ShopTokenVerifyIn, ShopTokenVerifyOut
 from app.services.wb_common_client import WBCommonClient, WBCommonApiError
 
@@ -89,13 +91,19 @@ async def create_shop(payload: ShopCreate, db: AsyncSession = Depends(get_db), u
     repo = ShopRepo(db)
     shop = await repo.create(owner_user_id=user.id, name=shop_name, wb_token_enc=encrypt_secret(payload.wb_token))
     
-    # Auto-trigger initial sync for feedbacks, questions, chats, and cards
+    # Auto-trigger initial sync: resumable backfill for feedbacks/questions, plus chats and cards.
     job_repo = JobRepo(db)
-    await job_repo.enqueue("feedback_sync", {"shop_id": shop.id, "is_answered": False, "take": 5000, "skip": 0})
-    await job_repo.enqueue("feedback_sync", {"shop_id": shop.id, "is_answered": True, "take": 5000, "skip": 0})
-    await job_repo.enqueue("questions_sync", {"shop_id": shop.id, "take": 5000, "skip": 0})
-    await job_repo.enqueue("sync_chats", {"shop_id": shop.id})
-    await job_repo.enqueue("cards_sync", {"shop_id": shop.id})
+    for stream in BACKFILL_STREAMS:
+        await job_repo.enqueue(
+            JobType.backfill_shop.value,
+            {"shop_id": shop.id, "stream": stream},
+            max_attempts=int(settings.BACKFILL_MAX_ATTEMPTS),
+        )
+    await job_repo.enqueue(JobType.sync_chats.value, {"shop_id": shop.id})
+    await job_repo.enqueue(
+        JobType.sync_product_cards.value,
+        {"shop_id": shop.id, "pages": int(settings.CARDS_SYNC_PAGES_PER_RUN), "limit": int(settings.CARDS_SYNC_LIMIT)},
+    )
     
     await db.commit()
     return shop
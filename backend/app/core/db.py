@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import asyncio
+from typing import Any, Awaitable, Callable
+
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
@@ -20,3 +23,32 @@ AsyncSessionMaker = async_sessionmaker(
 async def get_session() -> AsyncSession:
     async with AsyncSessionMaker() as session:
         yield session
+
+
+# Process-wide bound on fan-out sessions, so concurrent requests cannot drain the pool between them.
+_fanout_sem = asyncio.Semaphore(max(1, int(settings.DB_FANOUT_MAX_SESSIONS)))
+
+
+async def gather_in_sessions(
+    *blocks: Callable[[AsyncSession], Awaitable[Any]],
+    limit: int | None = None,
+    release: AsyncSession | None = None,
+) -> list:
+    """Run independent read-only blocks concurrently, each on its own pooled session.
+
+    Results come back in argument order. At most `limit` (DB_FANOUT_MAX_CONCURRENCY) sessions
+    are open per call and DB_FANOUT_MAX_SESSIONS per process. `release` (the request session)
+    has its transaction committed first, returning its connection to the pool instead of
+    holding it while waiting for fan-out slots. Fan-out sessions are never committed.
+    """
+    if release is not None and release.in_transaction():
+        await release.commit()
+
+    sem = asyncio.Semaphore(max(1, int(limit or settings.DB_FANOUT_MAX_CONCURRENCY)))
+
+    async def _run(block: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+        async with sem, _fanout_sem:
+            async with AsyncSessionMaker() as session:
+                return await block(session)
+
+    return list(await asyncio.gather(*(_run(b) for b in blocks)))
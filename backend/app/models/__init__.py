@@ -14,9 +14,13 @@ from app.models.shop_member import ShopMember
 from app.models.prompt_record import PromptRecord
 from app.models.tone import Tone
 from app.models.signature import Signature
-from app.models.billing import CreditLedger, ShopCreditLedger
+from app.models.billing import CreditLedger, ShopCreditLedger, CreditReservation, CreditReservationItem
 from app.models.payments import Payment
-from app.models.gpt_usage import GptUsage
-from app.models.stats import HourlyStat, DailyStat
+from app.models.gpt_usage import GptUsage, GptUsageDaily
+from app.models.stats import HourlyStat, DailyStat, FeedbackDailyStat, QuestionDailyStat
+from app.models.shop_data_version import ShopDataVersion
 from app.models.ai_settings import AISettings
 from app.models.system_flags import SystemFlags
+from app.models.backfill import SyncBackfill
+from app.models.sync_schedule import SyncSchedule
+from app.models.generation_cache import GenerationCache
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class SyncBackfill(Base):
+    """Checkpointed initial download of one stream (e.g. answered feedbacks) for a shop.
+
+    History is walked backwards in date windows of `window_days`, from `window_to`
+    down to `horizon_at`; inside a window pages are requested by `skip`.
+    (window_to, skip) is the resume point and is committed together with every stored page.
+    """
+
+    __tablename__ = "sync_backfills"
+    __table_args__ = (UniqueConstraint("shop_id", "stream", name="uq_sync_backfills_shop_stream"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    shop_id: Mapped[int] = mapped_column(ForeignKey("shops.id", ondelete="CASCADE"), index=True, nullable=False)
+
+    # feedbacks_unanswered | feedbacks_answered | questions_unanswered | questions_answered
+    stream: Mapped[str] = mapped_column(String(32), nullable=False)
+
+    # pending | running | done | failed
+    status: Mapped[str] = mapped_column(String(16), default="pending", nullable=False)
+
+    window_days: Mapped[int] = mapped_column(Integer, default=30, nullable=False)
+    horizon_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    window_to: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    skip: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    windows_done: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    windows_total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    fetched: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # WB countUnanswered/countArchive seen on the first page (used for progress).
+    total_expected: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    # Newest createdDate seen by this backfill.
+    cursor_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    last_error: Mapped[str | None] = mapped_column(String, nullable=True)
+
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+
+    @property
+    def progress_pct(self) -> float:
+        if self.status == "done":
+            return 100.0
+        pct = 0.0
+        if self.total_expected:
+            pct = 100.0 * float(self.fetched) / float(self.total_expected)
+        elif self.windows_total:
+            pct = 100.0 * float(self.windows_done) / float(self.windows_total)
+        # Never report 100% before the last window is finished.
+        return round(max(0.0, min(pct, 99.0)), 1)
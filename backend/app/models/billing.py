@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String
+from sqlalchemy import DateTime, ForeignKey, Integer, String, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -40,3 +40,42 @@ class ShopCreditLedger(Base):
     meta: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+
+class CreditReservation(Base):
+    """Credits held for a batch (e.g. bulk drafts) in one locked charge.
+
+    Items consume from `reserved` without touching the shops row; on settle the unused
+    remainder goes back to the shop with a single summarized ledger entry.
+    """
+
+    __tablename__ = "credit_reservations"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    shop_id: Mapped[int] = mapped_column(ForeignKey("shops.id", ondelete="CASCADE"), index=True, nullable=False)
+    actor_user_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    reason: Mapped[str] = mapped_column(String(64), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), default="open", index=True, nullable=False)  # open | settled
+
+    reserved: Mapped[int] = mapped_column(Integer, nullable=False)
+    consumed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    expected_items: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True, nullable=False)
+    settled_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class CreditReservationItem(Base):
+    __tablename__ = "credit_reservation_items"
+    __table_args__ = (UniqueConstraint("reservation_id", "item_key", name="uq_credit_reservation_items_key"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    reservation_id: Mapped[int] = mapped_column(ForeignKey("credit_reservations.id", ondelete="CASCADE"), index=True, nullable=False)
+    item_key: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    amount: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False)  # consumed | released | done | skipped
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
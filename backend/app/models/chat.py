@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from sqlalchemy import String, DateTime, ForeignKey, Text, UniqueConstraint, Boolean, BigInteger, Integer
+from sqlalchemy import String, DateTime, ForeignKey, Text, UniqueConstraint, Boolean, BigInteger, Integer, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -30,6 +30,7 @@ class ChatSession(Base):
 
     __table_args__ = (
         UniqueConstraint("shop_id", "chat_id", name="uq_chat_sessions_shop_chat"),
+        Index("ix_chat_sessions_shop_updated_id", "shop_id", "updated_at", "id"),
     )
 
 
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from sqlalchemy import DateTime, ForeignKey, Text, String
+from sqlalchemy import DateTime, ForeignKey, Index, Text, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -13,6 +13,8 @@ class FeedbackDraft(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     feedback_id: Mapped[int] = mapped_column(ForeignKey("feedbacks.id", ondelete="CASCADE"), index=True, nullable=False)
+    # Denormalized from feedbacks.shop_id so shop draft lists seek an index without the join.
+    shop_id: Mapped[int] = mapped_column(ForeignKey("shops.id", ondelete="CASCADE"), nullable=False)
 
     status: Mapped[str] = mapped_column(String(16), default=DraftStatus.drafted.value, nullable=False)
 
@@ -30,3 +32,8 @@ class FeedbackDraft(Base):
     published_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     feedback = relationship("Feedback", back_populates="drafts")
+
+    __table_args__ = (
+        Index("ix_feedback_drafts_shop_created_id", "shop_id", "created_at", "id"),
+        Index("ix_feedback_drafts_shop_status_created_id", "shop_id", "status", "created_at", "id"),
+    )
@@ -36,6 +36,10 @@ class JobType(str, enum.Enum):
 
     sync_product_cards = "sync_product_cards"
 
+    backfill_shop = "backfill_shop"
+    poll_feedbacks = "poll_feedbacks"
+    repair_stats = "repair_stats"
+
 class UserRole(str, enum.Enum):
     super_admin = "super_admin"
     support_admin = "support_admin"
@@ -1,13 +1,48 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from sqlalchemy import String, DateTime, Boolean, ForeignKey, Integer, Text, UniqueConstraint
-from sqlalchemy.dialects.postgresql import JSONB
+import re
+
+from sqlalchemy import BigInteger, Computed, String, DateTime, Boolean, ForeignKey, Index, Integer, Text, UniqueConstraint, text as sa_text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
 
 
+# Search document (see repos.search): product fields weigh more than review texts.
+FEEDBACK_SEARCH_TSV = (
+    "setweight(to_tsvector('russian'::regconfig, coalesce(product_name, '') || ' ' || coalesce(brand_name, '') || ' ' || coalesce(supplier_article, '')), 'A')"
+    " || setweight(to_tsvector('russian'::regconfig, coalesce(text, '') || ' ' || coalesce(pros, '') || ' ' || coalesce(cons, '')), 'B')"
+)
+
+
+# Same bound as the backfill in migration c3f7a91e5d08: non-negative and fits BIGINT.
+_NM_ID_RE = re.compile(r"[0-9]{1,18}")
+
+
+def product_columns(product_details: dict | None) -> dict:
+    """nm_id / product_name / brand_name / supplier_article column values from WB productDetails."""
+    pd = product_details if isinstance(product_details, dict) else {}
+    v = pd.get("nmId") or pd.get("nmID")
+    raw = str(v) if isinstance(v, (int, str)) and not isinstance(v, bool) else ""
+    nm_id = int(raw) if _NM_ID_RE.fullmatch(raw) else None
+
+    def _str(key: str, max_len: int | None = None) -> str | None:
+        s = pd.get(key)
+        if s is None or s == "":
+            return None
+        s = str(s)
+        return s[:max_len] if max_len else s
+
+    return {
+        "nm_id": nm_id,
+        "product_name": _str("productName"),
+        "brand_name": _str("brandName", 255),
+        "supplier_article": _str("supplierArticle", 128),
+    }
+
+
 class Feedback(Base):
     __tablename__ = "feedbacks"
 
@@ -33,6 +68,13 @@ class Feedback(Base):
     answer_editable: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
 
     product_details: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    # Denormalized from product_details at upsert time (see product_columns) for indexed filters.
+    nm_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    product_name: Mapped[str | None] = mapped_column(Text, nullable=True)
+    brand_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    supplier_article: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    # Generated by Postgres (GIN-indexed); deferred so list queries do not load it.
+    search_tsv: Mapped[str | None] = mapped_column(TSVECTOR, Computed(FEEDBACK_SEARCH_TSV, persisted=True), deferred=True, nullable=True)
     photo_links: Mapped[list | None] = mapped_column(JSONB, nullable=True)
     video: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     bables: Mapped[list | None] = mapped_column(JSONB, nullable=True)
@@ -44,37 +86,20 @@ class Feedback(Base):
     shop = relationship("Shop", back_populates="feedbacks")
     drafts = relationship("FeedbackDraft", back_populates="feedback", cascade="all,delete-orphan")
 
-
-    @property
-    def nm_id(self) -> int | None:
-        pd = self.product_details or {}
-        v = pd.get("nmId") or pd.get("nmID")
-        try:
-            return int(v) if v is not None else None
-        except Exception:
-            return None
-
-    @property
-    def product_name(self) -> str | None:
-        pd = self.product_details or {}
-        return pd.get("productName")
-
-    @property
-    def supplier_article(self) -> str | None:
-        pd = self.product_details or {}
-        return pd.get("supplierArticle")
-
-    @property
-    def brand_name(self) -> str | None:
-        pd = self.product_details or {}
-        return pd.get("brandName")
-
     @property
     def product_image_url(self) -> str | None:
         return getattr(self, "_product_image_url", None)
 
     __table_args__ = (
         UniqueConstraint("shop_id", "wb_id", name="uq_feedbacks_shop_wb"),
+        Index("ix_feedbacks_shop_created_id", "shop_id", "created_date", "id"),
+        Index("ix_feedbacks_shop_nm_id", "shop_id", "nm_id"),
+        Index("ix_feedbacks_shop_product_name", "shop_id", "product_name"),
+        Index("ix_feedbacks_search_tsv", "search_tsv", postgresql_using="gin"),
+        Index("ix_feedbacks_user_name_trgm", "user_name", postgresql_using="gin", postgresql_ops={"user_name": "gin_trgm_ops"}),
+        Index("ix_feedbacks_product_name_trgm", "product_name", postgresql_using="gin", postgresql_ops={"product_name": "gin_trgm_ops"}),
+        Index("ix_feedbacks_supplier_article_trgm", "supplier_article", postgresql_using="gin", postgresql_ops={"supplier_article": "gin_trgm_ops"}),
+        Index("ix_feedbacks_imt_id", sa_text("(product_details->>'imtId')")),
     )
 
     created_at: Mapped[datetime] = mapped_column(
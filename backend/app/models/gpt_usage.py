@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 
-from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String
+from sqlalchemy import BigInteger, Date, DateTime, ForeignKey, Index, Integer, Numeric, String, UniqueConstraint, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
@@ -15,6 +15,10 @@ class GptUsage(Base):
     """
 
     __tablename__ = "gpt_usage"
+    __table_args__ = (
+        # Dedup key for the buffered writer (retried flushes must not double count).
+        Index("uq_gpt_usage_response_id", "response_id", unique=True, postgresql_where=text("response_id IS NOT NULL")),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -33,3 +37,31 @@ class GptUsage(Base):
     response_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), index=True, nullable=False)
+
+
+class GptUsageDaily(Base):
+    """Daily rollup of gpt_usage per (day, shop, model, operation_type).
+
+    Incremented by the usage writer for every inserted gpt_usage row and re-derived
+    from the raw table for recent closed days by a periodic compactor.
+    """
+
+    __tablename__ = "gpt_usage_daily"
+    __table_args__ = (
+        UniqueConstraint("day_utc", "shop_id", "model", "operation_type", name="uq_gpt_usage_daily"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    day_utc: Mapped[date] = mapped_column(Date, index=True, nullable=False)
+    shop_id: Mapped[int] = mapped_column(ForeignKey("shops.id", ondelete="CASCADE"), index=True, nullable=False)
+    model: Mapped[str] = mapped_column(String(64), nullable=False)
+    operation_type: Mapped[str] = mapped_column(String(32), nullable=False)
+
+    prompt_tokens: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    completion_tokens: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    cost_usd: Mapped[float] = mapped_column(Numeric(18, 6), default=0, nullable=False)
+    cost_rub: Mapped[float] = mapped_column(Numeric(16, 2), default=0, nullable=False)
+    usage_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
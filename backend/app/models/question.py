@@ -2,13 +2,19 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
-from sqlalchemy import String, DateTime, Boolean, ForeignKey, Text, UniqueConstraint
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import BigInteger, Computed, String, DateTime, Boolean, ForeignKey, Index, Text, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
 
 
+QUESTION_SEARCH_TSV = (
+    "setweight(to_tsvector('russian'::regconfig, coalesce(product_name, '') || ' ' || coalesce(brand_name, '') || ' ' || coalesce(supplier_article, '')), 'A')"
+    " || setweight(to_tsvector('russian'::regconfig, coalesce(text, '')), 'B')"
+)
+
+
 class Question(Base):
     __tablename__ = "questions"
 
@@ -28,6 +34,12 @@ class Question(Base):
     answer_editable: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
 
     product_details: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    # Denormalized from product_details at upsert time (see models.feedback.product_columns).
+    nm_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    product_name: Mapped[str | None] = mapped_column(Text, nullable=True)
+    brand_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    supplier_article: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    search_tsv: Mapped[str | None] = mapped_column(TSVECTOR, Computed(QUESTION_SEARCH_TSV, persisted=True), deferred=True, nullable=True)
     raw: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False)
 
     synced_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
@@ -37,4 +49,11 @@ class Question(Base):
 
     __table_args__ = (
         UniqueConstraint("shop_id", "wb_id", name="uq_questions_shop_wb"),
+        Index("ix_questions_shop_created_id", "shop_id", "created_date", "id"),
+        Index("ix_questions_shop_nm_id", "shop_id", "nm_id"),
+        Index("ix_questions_shop_product_name", "shop_id", "product_name"),
+        Index("ix_questions_search_tsv", "search_tsv", postgresql_using="gin"),
+        Index("ix_questions_user_name_trgm", "user_name", postgresql_using="gin", postgresql_ops={"user_name": "gin_trgm_ops"}),
+        Index("ix_questions_product_name_trgm", "product_name", postgresql_using="gin", postgresql_ops={"product_name": "gin_trgm_ops"}),
+        Index("ix_questions_supplier_article_trgm", "supplier_article", postgresql_using="gin", postgresql_ops={"supplier_article": "gin_trgm_ops"}),
     )
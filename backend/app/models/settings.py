@@ -59,12 +59,23 @@ class ShopSettings(Base):
     last_feedback_created_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     last_questions_sync_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     last_chat_sync_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Hot poll state: last seen unanswered count / newest unanswered createdDate.
+    last_hot_poll_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    hot_unanswered_count: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    hot_newest_feedback_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     last_full_sync_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Answered feedbacks are synced incrementally from this cursor (newest answered createdDate seen);
+    # a deep reconcile re-reads the answered archive every ANSWERED_RECONCILE_INTERVAL_HOURS.
+    last_answered_feedback_created_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_answered_reconcile_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     chat_next_ms: Mapped[int | None] = mapped_column(BigInteger, nullable=True) 
 
     last_cards_sync_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     cards_cursor_updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     cards_cursor_nm_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    # Delta sync: max card updatedAt seen; full reconcile runs every CARDS_FULL_RECONCILE_INTERVAL_HOURS.
+    cards_hwm_updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_cards_full_sync_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class ShopDataVersion(Base):
+    """Monotonic per-shop counter of dashboard-visible changes (sync, drafts, publish).
+
+    Bumped in the same transaction as the change, so a cached dashboard built under an older
+    version is never served after the change is committed (see services.dashboard_cache).
+    """
+
+    __tablename__ = "shop_data_versions"
+
+    shop_id: Mapped[int] = mapped_column(ForeignKey("shops.id", ondelete="CASCADE"), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, default=1, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
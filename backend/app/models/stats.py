@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime, date, timezone
 
-from sqlalchemy import DateTime, Date, ForeignKey, Integer, Numeric, String, UniqueConstraint
+from sqlalchemy import BigInteger, DateTime, Date, ForeignKey, Integer, Numeric, SmallInteger, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
@@ -45,3 +45,54 @@ class DailyStat(Base):
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+
+
+class FeedbackDailyStat(Base):
+    """Feedback counts per (shop, UTC day of created_date, nm_id, rating).
+
+    nm_id = 0 / rating = 0 stand for "unknown" (keys must be non-null for the upsert).
+    Maintained with deltas by StatsRollupRepo (sync upserts); repaired from raw rows by the repair_stats job.
+    """
+
+    __tablename__ = "feedback_daily_stats"
+    __table_args__ = (
+        UniqueConstraint("shop_id", "day_utc", "nm_id", "rating", name="uq_feedback_daily_stats"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    shop_id: Mapped[int] = mapped_column(ForeignKey("shops.id", ondelete="CASCADE"), nullable=False)
+    day_utc: Mapped[date] = mapped_column(Date, nullable=False)
+    nm_id: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    rating: Mapped[int] = mapped_column(SmallInteger, default=0, nullable=False)
+
+    total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    answered: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    with_media: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    # Last seen product labels (for "top products" blocks).
+    product_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    brand_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+
+
+class QuestionDailyStat(Base):
+    """Question counts per (shop, UTC day of created_date, nm_id); see FeedbackDailyStat."""
+
+    __tablename__ = "question_daily_stats"
+    __table_args__ = (
+        UniqueConstraint("shop_id", "day_utc", "nm_id", name="uq_question_daily_stats"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    shop_id: Mapped[int] = mapped_column(ForeignKey("shops.id", ondelete="CASCADE"), nullable=False)
+    day_utc: Mapped[date] = mapped_column(Date, nullable=False)
+    nm_id: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+    total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    answered: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    product_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    brand_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class SyncSchedule(Base):
+    """Adaptive schedule of one periodic sync stream (feedbacks/questions/chats) for a shop.
+
+    `rate_per_hour` is an EWMA of observed new items per hour; `next_due_at` is derived from it
+    within ADAPTIVE_SYNC_MIN/MAX_INTERVAL_MIN. The scheduler selects due rows by the next_due_at index.
+    """
+
+    __tablename__ = "sync_schedules"
+    __table_args__ = (UniqueConstraint("shop_id", "stream", name="uq_sync_schedules_shop_stream"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    shop_id: Mapped[int] = mapped_column(ForeignKey("shops.id", ondelete="CASCADE"), index=True, nullable=False)
+    stream: Mapped[str] = mapped_column(String(16), nullable=False)
+
+    next_due_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True, nullable=False)
+
+    rate_per_hour: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    interval_min: Mapped[int] = mapped_column(Integer, default=120, nullable=False)
+    last_observed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_new_items: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
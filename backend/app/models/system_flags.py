@@ -16,6 +16,9 @@ class SystemFlags(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     kill_switch: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
+    # Bumped on every change of global prompts/tones; processes rebuild their cached PromptBundle on change.
+    prompt_bundle_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
@@ -1,19 +1,36 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, time, timedelta, timezone
+from functools import partial
 
-from sqlalchemy import func, select, text, case
+from sqlalchemy import func, literal, select, text, case, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.db import gather_in_sessions
 from app.models.shop import Shop
 from app.models.settings import ShopSettings
 from app.models.job import Job
 from app.models.enums import JobStatus, JobType
 from app.models.payments import Payment
-from app.models.gpt_usage import GptUsage
+from app.models.gpt_usage import GptUsage, GptUsageDaily
+
+
+async def _scalar(q, session: AsyncSession):
+    return (await session.execute(q)).scalar()
+
+
+async def _all(q, session: AsyncSession) -> list:
+    return list((await session.execute(q)).all())
+
+
+async def _get(model, ident, session: AsyncSession):
+    return await session.get(model, ident)
 
 
 class AdminDashboardRepo:
+    """Admin dashboards. Independent statements of one dashboard run concurrently on
+    separate pooled sessions (core.db.gather_in_sessions); `db` only has its transaction ended first."""
+
     def __init__(self, db: AsyncSession):
         self.db = db
 
@@ -21,30 +38,38 @@ class AdminDashboardRepo:
         now = datetime.now(timezone.utc)
         since_24h = now - timedelta(hours=24)
 
-        active_shops = (await self.db.execute(select(func.count(Shop.id)).where(Shop.is_active.is_(True)))).scalar_one() or 0
-
         sync_failed_q = select(func.count(func.distinct(text("(payload->>'shop_id')"))))\
             .select_from(Job)\
             .where(Job.type == JobType.sync_shop.value)\
             .where(Job.status == JobStatus.failed.value)\
             .where(Job.updated_at >= since_24h)
-        shops_with_sync_errors = int((await self.db.execute(sync_failed_q)).scalar() or 0)
 
         gen_types = [JobType.generate_draft.value, JobType.generate_question_draft.value, JobType.generate_chat_draft.value]
-        generation_queue_size = int((await self.db.execute(select(func.count(Job.id)).where(Job.type.in_(gen_types)).where(Job.status == JobStatus.queued.value))).scalar() or 0)
-
-        generation_errors_24h = int((await self.db.execute(select(func.count(Job.id)).where(Job.type.in_(gen_types)).where(Job.status == JobStatus.failed.value).where(Job.updated_at >= since_24h))).scalar() or 0)
-
         ap_enabled = select(func.count(ShopSettings.shop_id)).where(
             (ShopSettings.auto_publish.is_(True)) | (ShopSettings.questions_auto_publish.is_(True)) | (ShopSettings.chat_auto_reply.is_(True))
         )
-        autopublish_enabled_shops = int((await self.db.execute(ap_enabled)).scalar() or 0)
-
         publish_types = [JobType.publish_answer.value, JobType.publish_question_answer.value, JobType.send_chat_message.value]
-        autopublish_errors_24h = int((await self.db.execute(select(func.count(Job.id)).where(Job.type.in_(publish_types)).where(Job.status == JobStatus.failed.value).where(Job.updated_at >= since_24h))).scalar() or 0)
+
+        counts = await gather_in_sessions(
+            partial(_scalar, select(func.count(Shop.id)).where(Shop.is_active.is_(True))),
+            partial(_scalar, sync_failed_q),
+            partial(_scalar, select(func.count(Job.id)).where(Job.type.in_(gen_types)).where(Job.status == JobStatus.queued.value)),
+            partial(_scalar, select(func.count(Job.id)).where(Job.type.in_(gen_types)).where(Job.status == JobStatus.failed.value).where(Job.updated_at >= since_24h)),
+            partial(_scalar, ap_enabled),
+            partial(_scalar, select(func.count(Job.id)).where(Job.type.in_(publish_types)).where(Job.status == JobStatus.failed.value).where(Job.updated_at >= since_24h)),
+            release=self.db,
+        )
+        (
+            active_shops,
+            shops_with_sync_errors,
+            generation_queue_size,
+            generation_errors_24h,
+            autopublish_enabled_shops,
+            autopublish_errors_24h,
+        ) = (int(c or 0) for c in counts)
 
         return {
-            "active_shops": int(active_shops),
+            "active_shops": active_shops,
             "shops_with_sync_errors": shops_with_sync_errors,
             "generation_queue_size": generation_queue_size,
             "generation_errors_24h": generation_errors_24h,
@@ -66,26 +91,87 @@ class AdminDashboardRepo:
         # default
         return now - timedelta(days=7), now
 
+    def _usage_rows(self, date_from: datetime | None, shop_id: int | None = None):
+        """GPT usage since date_from as (shop_id, operation_type, cost_rub, cnt) rows.
+
+        Whole days come from the gpt_usage_daily rollup; only a partial first day
+        (rolling windows like "last 24h") is read from raw gpt_usage.
+        """
+        daily = select(
+            GptUsageDaily.shop_id.label("shop_id"),
+            GptUsageDaily.operation_type.label("operation_type"),
+            GptUsageDaily.cost_rub.label("cost_rub"),
+            GptUsageDaily.usage_count.label("cnt"),
+        )
+        if shop_id is not None:
+            daily = daily.where(GptUsageDaily.shop_id == shop_id)
+        if date_from is None:
+            return daily.subquery()
+
+        date_from = date_from.astimezone(timezone.utc)
+        first_full_day = datetime.combine(date_from.date(), time.min, tzinfo=timezone.utc)
+        if first_full_day < date_from:
+            first_full_day += timedelta(days=1)
+        daily = daily.where(GptUsageDaily.day_utc >= first_full_day.date())
+        if first_full_day == date_from:
+            return daily.subquery()
+
+        raw = select(
+            GptUsage.shop_id,
+            GptUsage.operation_type,
+            GptUsage.cost_rub,
+            literal(1).label("cnt"),
+        ).where(GptUsage.created_at >= date_from, GptUsage.created_at < first_full_day)
+        if shop_id is not None:
+            raw = raw.where(GptUsage.shop_id == shop_id)
+        return union_all(daily, raw).subquery()
+
     async def finance(self, period: str) -> dict:
         date_from, date_to = self._period_range(period)
 
         pay_q = select(func.coalesce(func.sum(Payment.amount_rub), 0))
-        gpt_q = select(func.coalesce(func.sum(GptUsage.cost_rub), 0))
         if date_from and date_to:
             pay_q = pay_q.where(Payment.created_at >= date_from).where(Payment.created_at <= date_to)
-            gpt_q = gpt_q.where(GptUsage.created_at >= date_from).where(GptUsage.created_at <= date_to)
 
-        money_received = float((await self.db.execute(pay_q)).scalar_one() or 0)
-        gpt_cost = float((await self.db.execute(gpt_q)).scalar_one() or 0)
+        # Windows always end "now", so usage is everything since date_from.
+        usage = self._usage_rows(date_from)
 
         # Breakdown by operation_type
         breakdown_q = select(
-            GptUsage.operation_type,
-            func.coalesce(func.sum(GptUsage.cost_rub), 0).label("cost"),
-        ).group_by(GptUsage.operation_type)
-        if date_from and date_to:
-            breakdown_q = breakdown_q.where(GptUsage.created_at >= date_from).where(GptUsage.created_at <= date_to)
-        rows = (await self.db.execute(breakdown_q)).all()
+            usage.c.operation_type,
+            func.coalesce(func.sum(usage.c.cost_rub), 0).label("cost"),
+        ).group_by(usage.c.operation_type)
+
+        # Top shops by GPT cost (aggregate first, join shop names for the 20 winners only)
+        per_shop = (
+            select(
+                usage.c.shop_id,
+                func.coalesce(func.sum(usage.c.cost_rub), 0).label("gpt_cost_rub"),
+                func.coalesce(func.sum(usage.c.cnt), 0).label("generations_count"),
+            )
+            .group_by(usage.c.shop_id)
+            .order_by(text("gpt_cost_rub DESC"))
+            .limit(20)
+            .subquery()
+        )
+        top_q = (
+            select(Shop.id, Shop.name, per_shop.c.gpt_cost_rub, per_shop.c.generations_count)
+            .join(Shop, Shop.id == per_shop.c.shop_id)
+            .order_by(per_shop.c.gpt_cost_rub.desc())
+        )
+
+        # Financial incidents: zero balance shops
+        zero_q = select(Shop.id, Shop.name).where(Shop.credits_balance <= 0)
+
+        money_received, rows, top_rows, zero_rows = await gather_in_sessions(
+            partial(_scalar, pay_q),
+            partial(_all, breakdown_q),
+            partial(_all, top_q),
+            partial(_all, zero_q),
+            release=self.db,
+        )
+        money_received = float(money_received or 0)
+        gpt_cost = float(sum(float(cost or 0) for _, cost in rows))
 
         breakdown = []
         total = gpt_cost if gpt_cost > 0 else 0.0
@@ -98,25 +184,11 @@ class AdminDashboardRepo:
             })
         breakdown.sort(key=lambda x: x["gpt_cost_rub"], reverse=True)
 
-        # Top shops by GPT cost
-        top_q = select(
-            Shop.id,
-            Shop.name,
-            func.coalesce(func.sum(GptUsage.cost_rub), 0).label("gpt_cost_rub"),
-            func.count(GptUsage.id).label("generations_count"),
-        ).join(Shop, Shop.id == GptUsage.shop_id).group_by(Shop.id)
-        if date_from and date_to:
-            top_q = top_q.where(GptUsage.created_at >= date_from).where(GptUsage.created_at <= date_to)
-        top_q = top_q.order_by(text("gpt_cost_rub DESC")).limit(20)
-        top_rows = (await self.db.execute(top_q)).all()
         top_shops = [
             {"shop_id": int(sid), "shop": name, "gpt_cost_rub": float(cost or 0), "generations_count": int(cnt or 0)}
             for sid, name, cost, cnt in top_rows
         ]
 
-        # Financial incidents: zero balance shops
-        zero_q = select(Shop.id, Shop.name).where(Shop.credits_balance <= 0)
-        zero_rows = (await self.db.execute(zero_q)).all()
         incidents = [{"shop_id": int(sid), "shop": name, "incident_type": "zero_balance"} for sid, name in zero_rows]
 
         return {
@@ -137,19 +209,13 @@ class AdminDashboardRepo:
         now = datetime.now(timezone.utc)
         since_24h = now - timedelta(hours=24)
 
-        jobs_pending = int((await self.db.execute(select(func.count(Job.id)).where(Job.status == JobStatus.queued.value))).scalar() or 0)
-        jobs_running = int((await self.db.execute(select(func.count(Job.id)).where(Job.status == JobStatus.running.value))).scalar() or 0)
-        jobs_failed = int((await self.db.execute(select(func.count(Job.id)).where(Job.status == JobStatus.failed.value).where(Job.updated_at >= since_24h))).scalar() or 0)
-        jobs_retrying = int((await self.db.execute(select(func.count(Job.id)).where(Job.status == JobStatus.retrying.value))).scalar() or 0)
-
         # Avg generation time for generation jobs that completed in last 24h (best-effort)
-        gen_types = [JobType.generate_draft.value, JobType.generate_question_draft.value, JobType.generate_chat_reply.value]
+        gen_types = [JobType.generate_draft.value, JobType.generate_question_draft.value, JobType.generate_chat_draft.value]
         avg_q = select(func.avg(func.extract("epoch", Job.updated_at - Job.created_at))).where(
             Job.type.in_(gen_types),
             Job.status == JobStatus.done.value,
             Job.updated_at >= since_24h,
         )
-        avg_sec = float((await self.db.execute(avg_q)).scalar() or 0.0)
 
         # Errors table
         # Group by a coarse error type prefix (split by ':')
@@ -159,7 +225,17 @@ class AdminDashboardRepo:
             func.count(Job.id).label("cnt"),
             func.max(Job.updated_at).label("last_seen"),
         ).where(Job.status == JobStatus.failed.value).where(Job.updated_at >= since_24h).group_by(err_expr).order_by(text("cnt DESC")).limit(30)
-        errs = (await self.db.execute(errs_q)).all()
+
+        jobs_pending, jobs_running, jobs_failed, jobs_retrying, avg_sec, errs = await gather_in_sessions(
+            partial(_scalar, select(func.count(Job.id)).where(Job.status == JobStatus.queued.value)),
+            partial(_scalar, select(func.count(Job.id)).where(Job.status == JobStatus.running.value)),
+            partial(_scalar, select(func.count(Job.id)).where(Job.status == JobStatus.failed.value).where(Job.updated_at >= since_24h)),
+            # Retries are re-queued jobs with at least one failed attempt.
+            partial(_scalar, select(func.count(Job.id)).where(Job.status == JobStatus.queued.value).where(Job.attempts > 0)),
+            partial(_scalar, avg_q),
+            partial(_all, errs_q),
+            release=self.db,
+        )
         errors = [
             {"error_type": (e or "unknown"), "count_24h": int(c or 0), "last_seen": ls}
             for e, c, ls in errs
@@ -167,11 +243,11 @@ class AdminDashboardRepo:
 
         return {
             "summary": {
-                "jobs_pending": jobs_pending,
-                "jobs_running": jobs_running,
-                "jobs_failed_24h": jobs_failed,
-                "jobs_retrying": jobs_retrying,
-                "avg_generation_time_sec": avg_sec,
+                "jobs_pending": int(jobs_pending or 0),
+                "jobs_running": int(jobs_running or 0),
+                "jobs_failed_24h": int(jobs_failed or 0),
+                "jobs_retrying": int(jobs_retrying or 0),
+                "avg_generation_time_sec": float(avg_sec or 0.0),
             },
             "errors": errors,
         }
@@ -180,19 +256,29 @@ class AdminDashboardRepo:
         now = datetime.now(timezone.utc)
         since_24h = now - timedelta(hours=24)
 
-        shop = await self.db.get(Shop, shop_id)
+        usage = self._usage_rows(since_24h, shop_id=shop_id)
+        usage_q = select(func.coalesce(func.sum(usage.c.cost_rub), 0), func.coalesce(func.sum(usage.c.cnt), 0))
+
+        # Published answers: jobs done in last 24h
+        pub_types = [JobType.publish_answer.value, JobType.publish_question_answer.value, JobType.send_chat_message.value]
+        published_q = select(func.count(Job.id)).where(Job.type.in_(pub_types)).where(Job.status == JobStatus.done.value).where(Job.updated_at >= since_24h).where(text("(payload->>'shop_id')::int = :sid")).params(sid=shop_id)
+
+        shop, settings_obj, usage_rows, published = await gather_in_sessions(
+            partial(_get, Shop, shop_id),
+            partial(_get, ShopSettings, shop_id),
+            partial(_all, usage_q),
+            partial(_scalar, published_q),
+            release=self.db,
+        )
         if not shop:
             return {}
-        settings_obj = await self.db.get(ShopSettings, shop_id)
 
         balance_row = int(getattr(shop, "credits_balance", 0) or 0)
 
-        gpt_cost_24h = float((await self.db.execute(select(func.coalesce(func.sum(GptUsage.cost_rub), 0)).where(GptUsage.shop_id == shop_id).where(GptUsage.created_at >= since_24h))).scalar_one() or 0)
-        responses_generated_24h = int((await self.db.execute(select(func.count(GptUsage.id)).where(GptUsage.shop_id == shop_id).where(GptUsage.created_at >= since_24h))).scalar_one() or 0)
-
-        # Published answers: jobs done in last 24h
-        pub_types = [JobType.publish_answer.value, JobType.publish_question_answer.value, JobType.send_chat_message.value]
-        responses_published_24h = int((await self.db.execute(select(func.count(Job.id)).where(Job.type.in_(pub_types)).where(Job.status == JobStatus.done.value).where(Job.updated_at >= since_24h).where(text("(payload->>'shop_id')::int = :sid")).params(sid=shop_id))).scalar() or 0)
+        cost_24h, cnt_24h = usage_rows[0]
+        gpt_cost_24h = float(cost_24h or 0)
+        responses_generated_24h = int(cnt_24h or 0)
+        responses_published_24h = int(published or 0)
 
         sync_status = None
         last_sync_at = getattr(settings_obj, "last_sync_at", None) if settings_obj else None
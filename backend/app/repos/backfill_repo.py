@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone, timedelta
+import math
+
+from sqlalchemy import select, asc
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.backfill import SyncBackfill
+
+
+class BackfillRepo:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, shop_id: int, stream: str, *, for_update: bool = False) -> SyncBackfill | None:
+        q = select(SyncBackfill).where(SyncBackfill.shop_id == shop_id, SyncBackfill.stream == stream)
+        if for_update:
+            q = q.with_for_update()
+        res = await self.session.execute(q)
+        return res.scalar_one_or_none()
+
+    async def get_or_create(self, shop_id: int, stream: str, *, horizon_days: int, window_days: int) -> SyncBackfill:
+        bf = await self.get(shop_id, stream, for_update=True)
+        if bf:
+            return bf
+
+        now = datetime.now(timezone.utc)
+        window_days = max(1, int(window_days))
+        horizon_days = max(window_days, int(horizon_days))
+        bf = SyncBackfill(
+            shop_id=shop_id,
+            stream=stream,
+            status="pending",
+            window_days=window_days,
+            horizon_at=now - timedelta(days=horizon_days),
+            window_to=now,
+            skip=0,
+            windows_done=0,
+            windows_total=int(math.ceil(horizon_days / window_days)),
+            fetched=0,
+        )
+        self.session.add(bf)
+        await self.session.flush()
+        return bf
+
+    async def list_for_shop(self, shop_id: int) -> list[SyncBackfill]:
+        res = await self.session.execute(
+            select(SyncBackfill).where(SyncBackfill.shop_id == shop_id).order_by(asc(SyncBackfill.id))
+        )
+        return list(res.scalars().all())
+
+    async def map_for_shops(self, shop_ids: list[int]) -> dict[tuple[int, str], SyncBackfill]:
+        if not shop_ids:
+            return {}
+        res = await self.session.execute(select(SyncBackfill).where(SyncBackfill.shop_id.in_(shop_ids)))
+        return {(bf.shop_id, bf.stream): bf for bf in res.scalars().all()}
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.shop import Shop
 
 from app.models.chat import ChatSession, ChatEvent, ChatDraft
+from app.repos.pagination import keyset_before
 
 
 class ChatRepo:
@@ -76,8 +77,13 @@ class ChatRepo:
         dt_from: datetime | None = None,
         dt_to: datetime | None = None,
         unread: bool | None = None,
-    ) -> tuple[int, list[tuple[ChatSession, str]]]:
-        """Returns (total_count, rows), where each row is (session, shop_name)."""
+        cursor: str | None = None,
+        with_total: bool = True,
+    ) -> tuple[int | None, list[tuple[ChatSession, str]]]:
+        """Returns (total_count, rows), where each row is (session, shop_name).
+
+        `cursor` continues by keyset on (updated_at, id); total_count is None unless with_total.
+        """
 
         cond = [ChatSession.shop_id.in_(shop_ids)]
         if dt_from is not None:
@@ -89,10 +95,16 @@ class ChatRepo:
         elif unread is False:
             cond.append(ChatSession.unread_count == 0)
 
-        total = int(
-            (await self.session.execute(select(func.count()).select_from(ChatSession).where(and_(*cond)))).scalar_one()
-            or 0
-        )
+        total = None
+        if with_total:
+            total = int(
+                (await self.session.execute(select(func.count()).select_from(ChatSession).where(and_(*cond)))).scalar_one()
+                or 0
+            )
+
+        if cursor:
+            cond.append(keyset_before(ChatSession.updated_at, ChatSession.id, cursor))
+            offset = 0
 
         q = (
             select(ChatSession, Shop.name)
@@ -113,11 +125,13 @@ class ChatRepo:
         if not event_id or not chat_id or not event_type:
             raise ValueError("WB event missing eventID/chatID/eventType")
 
-        existing = await self.session.execute(
-            select(ChatEvent).where(ChatEvent.shop_id == shop_id, ChatEvent.event_id == event_id)
-        )
-        if existing.scalar_one_or_none():
-            return existing.scalar_one_or_none()
+        existing = (
+            await self.session.execute(
+                select(ChatEvent).where(ChatEvent.shop_id == shop_id, ChatEvent.event_id == event_id)
+            )
+        ).scalar_one_or_none()
+        if existing:
+            return existing
 
         # WB /api/v1/seller/events returns addTimestamp on the event object.
         # Some payloads may also include it inside message, so we fall back.
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.billing import CreditReservation, CreditReservationItem
+
+
+class CreditReservationRepo:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get(self, reservation_id: int, *, for_update: bool = False) -> CreditReservation | None:
+        q = select(CreditReservation).where(CreditReservation.id == int(reservation_id))
+        if for_update:
+            q = q.with_for_update()
+        return (await self.session.execute(q)).scalar_one_or_none()
+
+    async def get_item(self, reservation_id: int, item_key: str, *, for_update: bool = False) -> CreditReservationItem | None:
+        q = select(CreditReservationItem).where(
+            CreditReservationItem.reservation_id == int(reservation_id),
+            CreditReservationItem.item_key == item_key,
+        )
+        if for_update:
+            q = q.with_for_update()
+        return (await self.session.execute(q)).scalar_one_or_none()
+
+    async def list_items(self, reservation_id: int) -> list[CreditReservationItem]:
+        res = await self.session.execute(
+            select(CreditReservationItem)
+            .where(CreditReservationItem.reservation_id == int(reservation_id))
+            .order_by(CreditReservationItem.id.asc())
+        )
+        return list(res.scalars().all())
+
+    async def take(self, reservation_id: int, amount: int) -> bool:
+        """Atomically move `amount` from reserved to consumed (single guarded UPDATE, no shops lock)."""
+        res = await self.session.execute(
+            update(CreditReservation)
+            .where(
+                CreditReservation.id == int(reservation_id),
+                CreditReservation.status == "open",
+                CreditReservation.consumed + int(amount) <= CreditReservation.reserved,
+            )
+            .values(consumed=CreditReservation.consumed + int(amount))
+            .returning(CreditReservation.id)
+        )
+        return res.scalar_one_or_none() is not None
+
+    async def give_back(self, reservation_id: int, amount: int) -> None:
+        await self.session.execute(
+            update(CreditReservation)
+            .where(CreditReservation.id == int(reservation_id), CreditReservation.status == "open")
+            .values(consumed=func.greatest(CreditReservation.consumed - int(amount), 0))
+        )
+
+    async def set_item(self, reservation_id: int, item_key: str, *, status: str, amount: int) -> CreditReservationItem:
+        item = await self.get_item(reservation_id, item_key, for_update=True)
+        if item is None:
+            item = CreditReservationItem(reservation_id=int(reservation_id), item_key=item_key[:64], status=status, amount=int(amount))
+            self.session.add(item)
+        else:
+            item.status = status
+            item.amount = int(amount)
+        await self.session.flush()
+        return item
+
+    async def count_finished_items(self, reservation_id: int) -> int:
+        # "consumed" items are still generating (or may yet be released); only done/skipped are final.
+        res = await self.session.execute(
+            select(func.count(CreditReservationItem.id)).where(
+                CreditReservationItem.reservation_id == int(reservation_id),
+                CreditReservationItem.status.in_(("done", "skipped")),
+            )
+        )
+        return int(res.scalar_one() or 0)
+
+    async def expired_open_ids(self, now: datetime | None = None, *, limit: int = 50) -> list[int]:
+        now = now or datetime.now(timezone.utc)
+        res = await self.session.execute(
+            select(CreditReservation.id)
+            .where(CreditReservation.status == "open", CreditReservation.expires_at <= now)
+            .order_by(CreditReservation.id.asc())
+            .limit(limit)
+        )
+        return [int(x) for x in res.scalars().all()]
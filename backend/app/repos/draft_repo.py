@@ -7,6 +7,8 @@ from sqlalchemy.orm import joinedload
 from app.models.draft import FeedbackDraft
 from app.models.feedback import Feedback
 from app.models.enums import DraftStatus
+from app.repos.pagination import keyset_before
+from app.repos.search import text_search
 
 
 class DraftRepo:
@@ -18,10 +20,13 @@ class DraftRepo:
         feedback_id: int, 
         text: str, 
         openai_model: str | None, 
-        openai_response_id: str | None
+        openai_response_id: str | None,
+        *,
+        shop_id: int,
     ) -> FeedbackDraft:
         d = FeedbackDraft(
             feedback_id=feedback_id,
+            shop_id=shop_id,
             text=text,
             openai_model=openai_model,
             openai_response_id=openai_response_id,
@@ -60,32 +65,40 @@ class DraftRepo:
         status: str | None = None,
         limit: int = 50,
         offset: int = 0,
-    ) -> tuple[list[FeedbackDraft], int]:
-        """List all drafts for a shop with optional status filter."""
+        cursor: str | None = None,
+        with_total: bool = True,
+    ) -> tuple[list[FeedbackDraft], int | None]:
+        """List all drafts for a shop with optional status filter.
+
+        `cursor` continues by keyset on (created_at, id); the total is None unless with_total.
+        """
         query = (
             select(FeedbackDraft)
-            .join(Feedback)
-            .where(Feedback.shop_id == shop_id)
+            .where(FeedbackDraft.shop_id == shop_id)
             .options(joinedload(FeedbackDraft.feedback))
-            .order_by(desc(FeedbackDraft.created_at))
+            .order_by(desc(FeedbackDraft.created_at), desc(FeedbackDraft.id))
         )
         
         if status:
             query = query.where(FeedbackDraft.status == status)
         
         # Get total count
-        count_query = (
-            select(func.count(FeedbackDraft.id))
-            .join(Feedback)
-            .where(Feedback.shop_id == shop_id)
-        )
-        if status:
-            count_query = count_query.where(FeedbackDraft.status == status)
-        
-        count_result = await self.session.execute(count_query)
-        total = count_result.scalar() or 0
+        total = None
+        if with_total:
+            count_query = (
+                select(func.count(FeedbackDraft.id))
+                .where(FeedbackDraft.shop_id == shop_id)
+            )
+            if status:
+                count_query = count_query.where(FeedbackDraft.status == status)
+            
+            count_result = await self.session.execute(count_query)
+            total = count_result.scalar() or 0
         
         # Get paginated results
+        if cursor:
+            query = query.where(keyset_before(FeedbackDraft.created_at, FeedbackDraft.id, cursor))
+            offset = 0
         query = query.limit(limit).offset(offset)
         result = await self.session.execute(query)
         drafts = list(result.scalars().all())
@@ -102,24 +115,27 @@ class DraftRepo:
         has_media: bool | None = None,
         rating_min: int | None = None,
         rating_max: int | None = None,
-    ) -> tuple[list[FeedbackDraft], int]:
+        cursor: str | None = None,
+        with_total: bool = True,
+    ) -> tuple[list[FeedbackDraft], int | None]:
         """
         List pending drafts (status='drafted') for a shop with optional filters.
         These are auto-generated drafts waiting for review.
+        `cursor` continues by keyset on (created_at, id); the total is None unless with_total.
         """
         query = (
             select(FeedbackDraft)
             .join(Feedback)
-            .where(Feedback.shop_id == shop_id)
+            .where(FeedbackDraft.shop_id == shop_id)
             .where(FeedbackDraft.status == "drafted")
             .options(joinedload(FeedbackDraft.feedback))
-            .order_by(desc(FeedbackDraft.created_at))
+            .order_by(desc(FeedbackDraft.created_at), desc(FeedbackDraft.id))
         )
         
         count_query = (
             select(func.count(FeedbackDraft.id))
             .join(Feedback)
-            .where(Feedback.shop_id == shop_id)
+            .where(FeedbackDraft.shop_id == shop_id)
             .where(FeedbackDraft.status == "drafted")
         )
         
@@ -127,17 +143,12 @@ class DraftRepo:
         if q:
             qv = q.strip()
             if qv:
-                like_pattern = f"%{qv}%"
-                search_cond = (
-                    Feedback.text.ilike(like_pattern) |
-                    Feedback.user_name.ilike(like_pattern)
-                )
-                # Try to match nm_id if numeric
-                try:
-                    nm_val = int(qv)
-                    search_cond = search_cond | (Feedback.nm_id == nm_val)
-                except ValueError:
-                    pass
+                search_cond = text_search(
+                    Feedback,
+                    qv,
+                    trigram_columns=(Feedback.user_name,),
+                    exact_columns=(Feedback.nm_id,),
+                ).cond
                 query = query.where(search_cond)
                 count_query = count_query.where(search_cond)
         
@@ -165,9 +176,14 @@ class DraftRepo:
             query = query.where(Feedback.product_valuation <= rating_max)
             count_query = count_query.where(Feedback.product_valuation <= rating_max)
         
-        count_result = await self.session.execute(count_query)
-        total = count_result.scalar() or 0
+        total = None
+        if with_total:
+            count_result = await self.session.execute(count_query)
+            total = count_result.scalar() or 0
         
+        if cursor:
+            query = query.where(keyset_before(FeedbackDraft.created_at, FeedbackDraft.id, cursor))
+            offset = 0
         query = query.limit(limit).offset(offset)
         result = await self.session.execute(query)
         drafts = list(result.scalars().all())
@@ -181,29 +197,25 @@ class DraftRepo:
         # Count by status
         drafted_query = (
             select(func.count(FeedbackDraft.id))
-            .join(Feedback)
-            .where(Feedback.shop_id == shop_id)
+            .where(FeedbackDraft.shop_id == shop_id)
             .where(FeedbackDraft.status == DraftStatus.drafted.value)
         )
         
         published_query = (
             select(func.count(FeedbackDraft.id))
-            .join(Feedback)
-            .where(Feedback.shop_id == shop_id)
+            .where(FeedbackDraft.shop_id == shop_id)
             .where(FeedbackDraft.status == DraftStatus.published.value)
         )
         
         rejected_query = (
             select(func.count(FeedbackDraft.id))
-            .join(Feedback)
-            .where(Feedback.shop_id == shop_id)
+            .where(FeedbackDraft.shop_id == shop_id)
             .where(FeedbackDraft.status == DraftStatus.rejected.value)
         )
         
         total_query = (
             select(func.count(FeedbackDraft.id))
-            .join(Feedback)
-            .where(Feedback.shop_id == shop_id)
+            .where(FeedbackDraft.shop_id == shop_id)
         )
         
         drafted_result = await self.session.execute(drafted_query)
@@ -224,8 +236,7 @@ class DraftRepo:
         
         query = (
             select(func.count(FeedbackDraft.id))
-            .join(Feedback)
-            .where(Feedback.shop_id == shop_id)
+            .where(FeedbackDraft.shop_id == shop_id)
             .where(FeedbackDraft.status == DraftStatus.drafted.value)
         )
         
@@ -4,8 +4,13 @@ from datetime import datetime, timezone
 from sqlalchemy import select, func, and_, or_, desc, case
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.feedback import Feedback
+from app.models.feedback import Feedback, product_columns
 from app.models.draft import FeedbackDraft
+from app.models.stats import FeedbackDailyStat
+from app.repos.pagination import keyset_before
+from app.repos.search import text_search
+from app.repos.shop_data_version_repo import ShopDataVersionRepo
+from app.repos.stats_rollup_repo import StatsRollupRepo, feedback_stat_key
 
 
 class FeedbackRepo:
@@ -27,9 +32,11 @@ class FeedbackRepo:
         existing = await self.get_by_wb_id(shop_id=shop_id, wb_id=wb_id)
         if existing:
             fb = existing
+            stat_before = feedback_stat_key(existing)
         else:
             fb = Feedback(shop_id=shop_id, wb_id=wb_id, created_date=created_date)
             self.session.add(fb)
+            stat_before = None
 
         fb.text = payload.get("text")
         fb.pros = payload.get("pros")
@@ -45,14 +52,24 @@ class FeedbackRepo:
         fb.answer_editable = ans.get("editable")
 
         fb.product_details = payload.get("productDetails")
+        for k, v in product_columns(fb.product_details).items():
+            setattr(fb, k, v)
         fb.photo_links = payload.get("photoLinks")
         fb.video = payload.get("video")
         fb.bables = payload.get("bables")
         fb.raw = payload
 
         await self.session.flush()
+        await StatsRollupRepo(self.session).track_feedback(stat_before, fb)
         return fb
 
+    async def set_answer(self, fb: Feedback, text: str | None) -> None:
+        """Set the answer text, keeping the daily stats rollup and the dashboard data version in sync."""
+        stat_before = feedback_stat_key(fb)
+        fb.answer_text = text
+        await StatsRollupRepo(self.session).track_feedback(stat_before, fb)
+        await ShopDataVersionRepo(self.session).bump(fb.shop_id)
+
     async def list(
         self,
         shop_id: int,
@@ -68,8 +85,20 @@ class FeedbackRepo:
         rating_max: int | None = None,
         has_text: bool | None = None,
         has_media: bool | None = None,
-    ) -> tuple[list[Feedback], int]:
+        nm_id: int | None = None,
+        sort: str = "relevance",
+        cursor: str | None = None,
+        with_total: bool = True,
+    ) -> tuple[list[Feedback], int | None]:
+        """Filtered page of a shop's feedbacks and the total count (None unless with_total).
+
+        With `q`, results are ordered by full-text relevance (then date) unless sort="date".
+        A `cursor` (pagination.encode_cursor of the last row's created_date, id) continues
+        a date-ordered listing by keyset instead of `offset`.
+        """
         cond = [Feedback.shop_id == shop_id]
+        if nm_id is not None:
+            cond.append(Feedback.nm_id == int(nm_id))
         if is_answered is True:
             cond.append(Feedback.answer_text.is_not(None))
         elif is_answered is False:
@@ -106,42 +135,44 @@ class FeedbackRepo:
             (func.jsonb_typeof(Feedback.photo_links) == "array", func.jsonb_array_length(Feedback.photo_links)),
             else_=0,
         )
+        # video is JSONB without none_as_null, so a missing video is stored as JSON 'null'.
+        video_obj = func.coalesce(func.jsonb_typeof(Feedback.video) == "object", False)
         if has_media is True:
-            cond.append(or_(photo_len > 0, Feedback.video.is_not(None)))
+            cond.append(or_(photo_len > 0, video_obj))
         elif has_media is False:
-            cond.append(and_(photo_len == 0, Feedback.video.is_(None)))
+            cond.append(and_(photo_len == 0, ~video_obj))
 
-        if q:
+        order = [desc(Feedback.created_date), desc(Feedback.id)]
+        if q and q.strip():
             qv = q.strip()
-            like = f"%{qv}%"
-
-            exprs = [
-                Feedback.text.ilike(like),
-                Feedback.pros.ilike(like),
-                Feedback.cons.ilike(like),
-                Feedback.user_name.ilike(like),
-                # Search product details (name, brand, supplier article)
-                Feedback.product_details["productName"].astext.ilike(like),
-                Feedback.product_details["brandName"].astext.ilike(like),
-                Feedback.product_details["supplierArticle"].astext.ilike(like),
-            ]
-
-            # Also search by nm_id column directly
+            # Words via the GIN tsvector, substrings of names/articles via pg_trgm, ids by equality.
+            search = text_search(
+                Feedback,
+                qv,
+                trigram_columns=(Feedback.user_name, Feedback.product_name, Feedback.supplier_article),
+                exact_columns=(Feedback.nm_id,),
+            )
+            exprs = [search.cond]
             if qv.isdigit():
-                exprs.append(Feedback.nm_id == int(qv))
-                # Direct match by nmId / imtId stored in productDetails
-                exprs.append(Feedback.product_details["nmId"].astext == qv)
-                exprs.append(Feedback.product_details["nmID"].astext == qv)
+                # Direct match by imtId stored in productDetails (expression index)
                 exprs.append(Feedback.product_details["imtId"].astext == qv)
-
             cond.append(or_(*exprs))
+            if sort == "relevance" and search.rank is not None and cursor is None:
+                order.insert(0, desc(search.rank))
 
         base = select(Feedback).where(and_(*cond))
-        total_q = select(func.count()).select_from(base.subquery())
-        total = (await self.session.execute(total_q)).scalar_one()
+        total = None
+        if with_total:
+            total_q = select(func.count()).select_from(base.subquery())
+            total = (await self.session.execute(total_q)).scalar_one()
+
+        if cursor:
+            # Keyset page: seek past the previous page's last (created_date, id); no OFFSET.
+            base = base.where(keyset_before(Feedback.created_date, Feedback.id, cursor))
+            offset = 0
 
         rows = await self.session.execute(
-            base.order_by(desc(Feedback.created_date)).limit(limit).offset(offset)
+            base.order_by(*order).limit(limit).offset(offset)
         )
         return list(rows.scalars().all()), total
 
@@ -191,73 +222,43 @@ class FeedbackRepo:
 
     async def get_product_analytics(self, shop_id: int, limit: int = 5) -> dict:
         """
-        Return analytics grouped by product:
+        Return analytics grouped by product (served from feedback_daily_stats):
         - top_products: products with most positive reviews (4-5 stars)
         - problem_products: products with most negative reviews (1-2 stars)
         """
         from datetime import timedelta
 
-        now = datetime.now(timezone.utc)
-        week_ago = now - timedelta(days=7)
-
-        # Get product name from JSONB
-        product_name_expr = Feedback.product_details["productName"].astext
-
-        # Top products (rating 4-5)
-        top_q = (
-            select(
-                product_name_expr.label("product_name"),
-                func.count().label("total_count"),
-                func.sum(
-                    case((Feedback.created_date >= week_ago, 1), else_=0)
-                ).label("recent_count"),
-            )
-            .where(
-                Feedback.shop_id == shop_id,
-                Feedback.product_valuation.in_([4, 5]),
-                product_name_expr.isnot(None),
-            )
-            .group_by(product_name_expr)
-            .order_by(func.count().desc())
-            .limit(limit)
-        )
-        top_rows = (await self.session.execute(top_q)).mappings().all()
+        st = FeedbackDailyStat
+        week_ago = datetime.now(timezone.utc).date() - timedelta(days=6)
 
-        # Problem products (rating 1-2)
-        problem_q = (
-            select(
-                product_name_expr.label("product_name"),
-                func.count().label("total_count"),
-                func.sum(
-                    case((Feedback.created_date >= week_ago, 1), else_=0)
-                ).label("recent_count"),
+        async def _products(ratings: list[int]) -> list[dict]:
+            total = func.sum(st.total)
+            q = (
+                select(
+                    st.product_name.label("product_name"),
+                    total.label("total_count"),
+                    func.sum(case((st.day_utc >= week_ago, st.total), else_=0)).label("recent_count"),
+                )
+                .where(
+                    st.shop_id == shop_id,
+                    st.rating.in_(ratings),
+                    st.product_name.isnot(None),
+                )
+                .group_by(st.product_name)
+                .order_by(total.desc())
+                .limit(limit)
             )
-            .where(
-                Feedback.shop_id == shop_id,
-                Feedback.product_valuation.in_([1, 2]),
-                product_name_expr.isnot(None),
-            )
-            .group_by(product_name_expr)
-            .order_by(func.count().desc())
-            .limit(limit)
-        )
-        problem_rows = (await self.session.execute(problem_q)).mappings().all()
-
-        return {
-            "top_products": [
-                {
-                    "name": row["product_name"],
-                    "count": row["total_count"],
-                    "recent": row["recent_count"] or 0,
-                }
-                for row in top_rows
-            ],
-            "problem_products": [
+            rows = (await self.session.execute(q)).mappings().all()
+            return [
                 {
                     "name": row["product_name"],
-                    "count": row["total_count"],
-                    "recent": row["recent_count"] or 0,
+                    "count": int(row["total_count"] or 0),
+                    "recent": int(row["recent_count"] or 0),
                 }
-                for row in problem_rows
-            ],
+                for row in rows
+            ]
+
+        return {
+            "top_products": await _products([4, 5]),
+            "problem_products": await _products([1, 2]),
         }
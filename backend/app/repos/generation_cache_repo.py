@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.generation_cache import GenerationCache
+
+
+class GenerationCacheRepo:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def candidates(self, cache_key: str, now: datetime) -> list[GenerationCache]:
+        res = await self.session.execute(
+            select(GenerationCache)
+            .where(GenerationCache.cache_key == cache_key, GenerationCache.expires_at > now)
+            .order_by(GenerationCache.id.asc())
+        )
+        return list(res.scalars().all())
+
+    async def touch(self, row_id: int, now: datetime) -> None:
+        await self.session.execute(
+            update(GenerationCache)
+            .where(GenerationCache.id == row_id)
+            .values(hits=GenerationCache.hits + 1, last_hit_at=now)
+        )
+
+    async def add(
+        self,
+        *,
+        cache_key: str,
+        model: str,
+        text: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        ttl: timedelta,
+    ) -> GenerationCache:
+        now = datetime.now(timezone.utc)
+        row = GenerationCache(
+            cache_key=cache_key,
+            model=model,
+            text=text,
+            prompt_tokens=int(prompt_tokens or 0),
+            completion_tokens=int(completion_tokens or 0),
+            created_at=now,
+            expires_at=now + ttl,
+        )
+        self.session.add(row)
+        await self.session.flush()
+        return row
+
+    async def purge(self, now: datetime, *, max_rows: int) -> int:
+        """Delete expired rows, then the least recently used ones above max_rows."""
+        res = await self.session.execute(delete(GenerationCache).where(GenerationCache.expires_at <= now))
+        removed = int(res.rowcount or 0)
+
+        total = int((await self.session.execute(select(func.count(GenerationCache.id)))).scalar_one() or 0)
+        excess = total - int(max_rows)
+        if excess > 0:
+            lru_ids = (
+                select(GenerationCache.id)
+                .order_by(func.coalesce(GenerationCache.last_hit_at, GenerationCache.created_at).asc())
+                .limit(excess)
+                .scalar_subquery()
+            )
+            res = await self.session.execute(delete(GenerationCache).where(GenerationCache.id.in_(lru_ids)))
+            removed += int(res.rowcount or 0)
+        return removed
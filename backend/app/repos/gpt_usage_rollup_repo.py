@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import delete, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.gpt_usage import GptUsageDaily
+
+
+def _as_utc_day(ts: datetime | None) -> date:
+    ts = ts or datetime.now(timezone.utc)
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc)
+    return ts.date()
+
+
+class GptUsageRollupRepo:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def add_rows(self, rows: list[dict]) -> None:
+        """Increment the daily rollup by freshly inserted gpt_usage rows (same transaction as the insert)."""
+        acc: dict[tuple, dict] = {}
+        for r in rows:
+            key = (_as_utc_day(r.get("created_at")), int(r["shop_id"]), str(r["model"]), str(r["operation_type"]))
+            a = acc.setdefault(key, {"prompt_tokens": 0, "completion_tokens": 0, "cost_usd": Decimal("0"), "cost_rub": Decimal("0"), "usage_count": 0})
+            a["prompt_tokens"] += int(r.get("prompt_tokens") or 0)
+            a["completion_tokens"] += int(r.get("completion_tokens") or 0)
+            a["cost_usd"] += Decimal(str(r.get("cost_usd") or 0))
+            a["cost_rub"] += Decimal(str(r.get("cost_rub") or 0))
+            a["usage_count"] += 1
+        if not acc:
+            return
+
+        now = datetime.now(timezone.utc)
+        # Sorted keys: concurrent writers (API + worker processes) lock rollup rows in the same order.
+        values = [
+            {"day_utc": k[0], "shop_id": k[1], "model": k[2], "operation_type": k[3], "updated_at": now, **acc[k]}
+            for k in sorted(acc)
+        ]
+        stmt = pg_insert(GptUsageDaily).values(values)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_gpt_usage_daily",
+            set_={
+                "prompt_tokens": GptUsageDaily.prompt_tokens + stmt.excluded.prompt_tokens,
+                "completion_tokens": GptUsageDaily.completion_tokens + stmt.excluded.completion_tokens,
+                "cost_usd": GptUsageDaily.cost_usd + stmt.excluded.cost_usd,
+                "cost_rub": GptUsageDaily.cost_rub + stmt.excluded.cost_rub,
+                "usage_count": GptUsageDaily.usage_count + stmt.excluded.usage_count,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def rebuild(self, day_from: date, day_to: date) -> int:
+        """Re-derive rollup rows for [day_from, day_to] from raw gpt_usage. Returns rows written."""
+        start = datetime.combine(day_from, time.min, tzinfo=timezone.utc)
+        end = datetime.combine(day_to + timedelta(days=1), time.min, tzinfo=timezone.utc)
+        await self.session.execute(
+            delete(GptUsageDaily).where(GptUsageDaily.day_utc >= day_from, GptUsageDaily.day_utc <= day_to)
+        )
+        res = await self.session.execute(
+            text(
+                """
+                INSERT INTO gpt_usage_daily
+                    (day_utc, shop_id, model, operation_type,
+                     prompt_tokens, completion_tokens, cost_usd, cost_rub, usage_count, updated_at)
+                SELECT (created_at AT TIME ZONE 'UTC')::date, shop_id, model, operation_type,
+                       SUM(prompt_tokens), SUM(completion_tokens), SUM(cost_usd), SUM(cost_rub), COUNT(*), now()
+                FROM gpt_usage
+                WHERE created_at >= :start AND created_at < :end
+                GROUP BY 1, 2, 3, 4
+                """
+            ),
+            {"start": start, "end": end},
+        )
+        return int(res.rowcount or 0)
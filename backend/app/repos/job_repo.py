@@ -55,10 +55,12 @@ class JobRepo:
         shop_id: int,
         *,
         max_age_minutes: int = 180,
+        payload_match: dict | None = None,
     ) -> bool:
         """Return True if there is a queued/running job of given type for this shop.
 
         We look only at reasonably recent jobs to avoid a permanently stuck old record blocking scheduling.
+        `payload_match` narrows the check to jobs whose payload contains these keys/values.
         """
         since = datetime.now(timezone.utc) - timedelta(minutes=max_age_minutes)
         q = select(func.count()).select_from(Job).where(
@@ -67,6 +69,8 @@ class JobRepo:
             Job.created_at >= since,
             cast(Job.payload["shop_id"].astext, Integer) == int(shop_id),
         )
+        if payload_match:
+            q = q.where(Job.payload.contains(payload_match))
         cnt = (await self.session.execute(q)).scalar_one()
         return int(cnt) > 0
 
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+import json
+
+from sqlalchemy import tuple_
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(*values) -> str:
+    """Opaque token for a keyset position, e.g. encode_cursor(row.created_date, row.id)."""
+    raw = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    data = json.dumps(raw, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple[datetime, int]:
+    """(timestamp, id) of a token made by encode_cursor; raises InvalidCursor on garbage."""
+    try:
+        data = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        ts, ident = json.loads(data)
+        return datetime.fromisoformat(ts), int(ident)
+    except Exception as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def keyset_before(ts_col, id_col, cursor: str):
+    """Rows strictly after the cursor in (ts desc, id desc) order.
+
+    A row comparison, so Postgres seeks a (…, ts, id) btree index instead of skipping OFFSET rows.
+    """
+    ts, ident = decode_cursor(cursor)
+    return tuple_(ts_col, id_col) < tuple_(ts, ident)
+
+
+def next_cursor(rows: list, limit: int, ts_attr: str, id_attr: str = "id") -> str | None:
+    """Cursor of the page after `rows`, or None when this page was the last one."""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(getattr(last, ts_attr), getattr(last, id_attr))
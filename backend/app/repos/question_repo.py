@@ -5,7 +5,12 @@ from datetime import datetime
 from sqlalchemy import select, func, and_, or_, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.feedback import product_columns
 from app.models.question import Question
+from app.repos.pagination import keyset_before
+from app.repos.search import text_search
+from app.repos.shop_data_version_repo import ShopDataVersionRepo
+from app.repos.stats_rollup_repo import StatsRollupRepo, question_stat_key
 
 
 class QuestionRepo:
@@ -26,9 +31,11 @@ class QuestionRepo:
         existing = await self.get_by_wb_id(shop_id=shop_id, wb_id=wb_id)
         if existing:
             q = existing
+            stat_before = question_stat_key(existing)
         else:
             q = Question(shop_id=shop_id, wb_id=wb_id, created_date=created_date)
             self.session.add(q)
+            stat_before = None
 
         q.text = payload.get("text")
         q.user_name = payload.get("userName")
@@ -40,11 +47,21 @@ class QuestionRepo:
         q.answer_editable = ans.get("editable")
 
         q.product_details = payload.get("productDetails")
+        for k, v in product_columns(q.product_details).items():
+            setattr(q, k, v)
         q.raw = payload
 
         await self.session.flush()
+        await StatsRollupRepo(self.session).track_question(stat_before, q)
         return q
 
+    async def set_answer(self, q: Question, text: str | None) -> None:
+        """Set the answer text, keeping the daily stats rollup and the dashboard data version in sync."""
+        stat_before = question_stat_key(q)
+        q.answer_text = text
+        await StatsRollupRepo(self.session).track_question(stat_before, q)
+        await ShopDataVersionRepo(self.session).bump(q.shop_id)
+
     async def list(
         self,
         shop_id: int,
@@ -53,23 +70,44 @@ class QuestionRepo:
         user_name: str | None,
         limit: int,
         offset: int,
-    ) -> tuple[list[Question], int]:
+        nm_id: int | None = None,
+        sort: str = "relevance",
+        cursor: str | None = None,
+        with_total: bool = True,
+    ) -> tuple[list[Question], int | None]:
         cond = [Question.shop_id == shop_id]
+        if nm_id is not None:
+            cond.append(Question.nm_id == int(nm_id))
         if is_answered is True:
             cond.append(Question.answer_text.is_not(None))
         elif is_answered is False:
             cond.append(Question.answer_text.is_(None))
         if user_name:
             cond.append(Question.user_name == user_name)
-        if q:
-            like = f"%{q}%"
-            cond.append(or_(Question.text.ilike(like),))
+        order = [desc(Question.created_date), desc(Question.id)]
+        if q and q.strip():
+            search = text_search(
+                Question,
+                q,
+                trigram_columns=(Question.user_name, Question.product_name, Question.supplier_article),
+                exact_columns=(Question.nm_id,),
+            )
+            cond.append(search.cond)
+            if sort == "relevance" and search.rank is not None and cursor is None:
+                order.insert(0, desc(search.rank))
 
         base = select(Question).where(and_(*cond))
-        total_q = select(func.count()).select_from(base.subquery())
-        total = (await self.session.execute(total_q)).scalar_one()
+        total = None
+        if with_total:
+            total_q = select(func.count()).select_from(base.subquery())
+            total = (await self.session.execute(total_q)).scalar_one()
+
+        if cursor:
+            # Keyset page: seek past the previous page's last (created_date, id); no OFFSET.
+            base = base.where(keyset_before(Question.created_date, Question.id, cursor))
+            offset = 0
 
-        rows = await self.session.execute(base.order_by(desc(Question.created_date)).limit(limit).offset(offset))
+        rows = await self.session.execute(base.order_by(*order).limit(limit).offset(offset))
         return list(rows.scalars().all()), total
 
     async def buyers_agg(self, shop_id: int, q: str | None, limit: int, offset: int):
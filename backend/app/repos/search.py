@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import re
+
+from sqlalchemy import func, literal_column, or_
+
+
+# Text search configuration of the search_tsv generated columns (see models.feedback).
+SEARCH_CONFIG = "russian"
+
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+_MAX_TERMS = 8
+
+
+@dataclass(frozen=True)
+class SearchClause:
+    """WHERE condition and relevance expression for a free-text query."""
+
+    cond: object
+    rank: object | None
+
+
+def _like_pattern(q: str) -> str:
+    # Backslash is the default LIKE escape character in Postgres.
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def prefix_tsquery(q: str) -> str | None:
+    """to_tsquery text matching every word of `q` as a prefix ("кросс:* & бел:*").
+
+    Only letter/digit tokens are kept, so user input can never break the tsquery syntax.
+    """
+    words = _WORD_RE.findall(q.lower())[:_MAX_TERMS]
+    if not words:
+        return None
+    return " & ".join(f"{w}:*" for w in words)
+
+
+def text_search(model, q: str, *, trigram_columns: tuple = (), exact_columns: tuple = ()) -> SearchClause:
+    """Full-text (model.search_tsv, GIN) OR trigram substring (pg_trgm GIN indexes) search.
+
+    - words match by prefix against the Russian tsvector of texts and product fields;
+    - `trigram_columns` catch substrings the stemmer cannot (buyer names, supplier articles);
+    - `exact_columns` are compared for equality when `q` is numeric (nm_id and the like).
+
+    Every branch is index-backed, so Postgres combines them with a BitmapOr instead of
+    scanning all rows of the shop.
+    """
+    qv = q.strip()
+    branches = []
+    rank = None
+
+    tsq_text = prefix_tsquery(qv)
+    if tsq_text:
+        tsq = func.to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), tsq_text)
+        branches.append(model.search_tsv.op("@@")(tsq))
+        rank = func.ts_rank_cd(model.search_tsv, tsq)
+
+    like = _like_pattern(qv)
+    branches.extend(col.ilike(like) for col in trigram_columns)
+
+    if qv.isdigit() and len(qv) <= 18:
+        branches.extend(col == int(qv) for col in exact_columns)
+
+    return SearchClause(cond=or_(*branches), rank=rank)
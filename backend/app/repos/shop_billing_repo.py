@@ -28,12 +28,15 @@ class ShopBillingRepo:
         reason: str,
         actor_user_id: int | None = None,
         meta: dict | None = None,
+        allow_inactive: bool = False,
     ) -> int:
         """Apply delta to shop credits atomically (row-locked).
 
         delta > 0: topup/refund
         delta < 0: charge
 
+        allow_inactive: skip the inactive-shop guard (returning held credits is not a charge).
+
         Returns new balance.
         """
         res = await self.session.execute(
@@ -42,7 +45,7 @@ class ShopBillingRepo:
         shop = res.scalar_one_or_none()
         if not shop:
             raise ValueError("Shop not found")
-        if not bool(getattr(shop, "is_active", True)):
+        if not allow_inactive and not bool(getattr(shop, "is_active", True)):
             raise ValueError("Shop is inactive")
 
         cur = int(getattr(shop, "credits_balance", 0) or 0)
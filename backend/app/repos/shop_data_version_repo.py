@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.shop_data_version import ShopDataVersion
+
+
+class ShopDataVersionRepo:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def bump(self, shop_id: int) -> None:
+        """Invalidate cached dashboards of the shop (takes the row lock until commit; call late in the transaction)."""
+        now = datetime.now(timezone.utc)
+        stmt = pg_insert(ShopDataVersion).values(shop_id=int(shop_id), version=1, updated_at=now)
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ShopDataVersion.shop_id],
+                set_={"version": ShopDataVersion.version + 1, "updated_at": now},
+            )
+        )
+
+    async def get_many(self, shop_ids: list[int]) -> dict[int, int]:
+        """shop_id -> version (0 for shops that never changed since the table was created)."""
+        res = await self.session.execute(
+            select(ShopDataVersion.shop_id, ShopDataVersion.version).where(ShopDataVersion.shop_id.in_(shop_ids))
+        )
+        found = {int(sid): int(v) for sid, v in res.all()}
+        return {int(sid): found.get(int(sid), 0) for sid in shop_ids}
@@ -9,6 +9,7 @@ from app.models.shop_member import ShopMember
 from app.models.enums import ShopMemberRole
 from app.models.settings import ShopSettings
 from app.repos.signature_repo import SignatureRepo
+from app.repos.sync_schedule_repo import SyncScheduleRepo
 
 
 class ShopRepo:
@@ -36,6 +37,8 @@ class ShopRepo:
 
         self.session.add(ShopSettings(shop_id=shop.id))
         await self.session.flush()
+
+        await SyncScheduleRepo(self.session).ensure_for_shop(shop.id)
         return shop
 
     async def get_settings(self, shop_id: int) -> ShopSettings | None:
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import delete, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.feedback import Feedback
+from app.models.question import Question
+from app.models.stats import FeedbackDailyStat, QuestionDailyStat
+
+
+@dataclass(frozen=True)
+class StatKey:
+    """Where one feedback/question is counted in the daily rollup, and with which flags."""
+
+    shop_id: int
+    day_utc: date
+    nm_id: int
+    rating: int
+    answered: bool
+    media: bool
+
+    @property
+    def dims(self) -> tuple:
+        return (self.shop_id, self.day_utc, self.nm_id, self.rating)
+
+
+def _day(dt: datetime) -> date:
+    return dt.astimezone(timezone.utc).date() if dt.tzinfo else dt.date()
+
+
+def _labels(obj: Feedback | Question) -> tuple[str | None, str | None]:
+    return ((obj.product_name or "")[:255] or None, obj.brand_name or None)
+
+
+def feedback_stat_key(fb: Feedback) -> StatKey:
+    photos = fb.photo_links if isinstance(fb.photo_links, list) else []
+    return StatKey(
+        shop_id=int(fb.shop_id),
+        day_utc=_day(fb.created_date),
+        nm_id=int(fb.nm_id or 0),
+        rating=int(fb.product_valuation or 0),
+        answered=fb.answer_text is not None,
+        media=bool(photos) or isinstance(fb.video, dict),
+    )
+
+
+def question_stat_key(q: Question) -> StatKey:
+    return StatKey(
+        shop_id=int(q.shop_id),
+        day_utc=_day(q.created_date),
+        nm_id=int(q.nm_id or 0),
+        rating=0,
+        answered=q.answer_text is not None,
+        media=False,
+    )
+
+
+class StatsRollupRepo:
+    """Delta maintenance and repair of feedback_daily_stats / question_daily_stats."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def track_feedback(self, before: StatKey | None, fb: Feedback) -> None:
+        """Apply the rollup delta for one feedback whose key was `before` (None = newly inserted)."""
+        await self._track(FeedbackDailyStat, before, feedback_stat_key(fb), _labels(fb))
+
+    async def track_question(self, before: StatKey | None, q: Question) -> None:
+        await self._track(QuestionDailyStat, before, question_stat_key(q), _labels(q))
+
+    async def _track(self, model, before: StatKey | None, after: StatKey, labels: tuple) -> None:
+        if before == after:
+            return
+        if before is not None and before.dims == after.dims:
+            await self._apply(model, after, 0, int(after.answered) - int(before.answered), int(after.media) - int(before.media), labels)
+            return
+        if before is not None:
+            await self._apply(model, before, -1, -int(before.answered), -int(before.media), (None, None))
+        await self._apply(model, after, 1, int(after.answered), int(after.media), labels)
+
+    async def _apply(self, model, key: StatKey, d_total: int, d_answered: int, d_media: int, labels: tuple) -> None:
+        values = {
+            "shop_id": key.shop_id,
+            "day_utc": key.day_utc,
+            "nm_id": key.nm_id,
+            "total": d_total,
+            "answered": d_answered,
+            "product_name": labels[0],
+            "brand_name": labels[1],
+            "updated_at": datetime.now(timezone.utc),
+        }
+        set_ = {
+            "total": model.total + d_total,
+            "answered": model.answered + d_answered,
+            "updated_at": values["updated_at"],
+        }
+        if model is FeedbackDailyStat:
+            values.update(rating=key.rating, with_media=d_media)
+            set_["with_media"] = model.with_media + d_media
+        stmt = pg_insert(model).values(values)
+        set_["product_name"] = func.coalesce(stmt.excluded.product_name, model.product_name)
+        set_["brand_name"] = func.coalesce(stmt.excluded.brand_name, model.brand_name)
+        constraint = "uq_feedback_daily_stats" if model is FeedbackDailyStat else "uq_question_daily_stats"
+        await self.session.execute(stmt.on_conflict_do_update(constraint=constraint, set_=set_))
+
+    async def rebuild(self, shop_id: int, day_from: date | None = None, day_to: date | None = None) -> None:
+        """Re-derive both rollups of a shop from raw rows (all days when day_from is None)."""
+        params: dict = {"shop_id": int(shop_id)}
+        where = "shop_id = :shop_id"
+        if day_from is not None:
+            params["start"] = datetime.combine(day_from, time.min, tzinfo=timezone.utc)
+            where += " AND created_date >= :start"
+        if day_to is not None:
+            params["end"] = datetime.combine(day_to + timedelta(days=1), time.min, tzinfo=timezone.utc)
+            where += " AND created_date < :end"
+
+        for model in (FeedbackDailyStat, QuestionDailyStat):
+            q = delete(model).where(model.shop_id == int(shop_id))
+            if day_from is not None:
+                q = q.where(model.day_utc >= day_from)
+            if day_to is not None:
+                q = q.where(model.day_utc <= day_to)
+            await self.session.execute(q)
+
+        await self.session.execute(
+            text(
+                f"""
+                INSERT INTO feedback_daily_stats
+                    (shop_id, day_utc, nm_id, rating, total, answered, with_media, product_name, brand_name, updated_at)
+                SELECT shop_id, (created_date AT TIME ZONE 'UTC')::date, COALESCE(nm_id, 0), COALESCE(product_valuation, 0),
+                       COUNT(*),
+                       COUNT(*) FILTER (WHERE answer_text IS NOT NULL),
+                       COUNT(*) FILTER (WHERE (jsonb_typeof(photo_links) = 'array' AND jsonb_array_length(photo_links) > 0)
+                                           OR jsonb_typeof(video) = 'object'),
+                       LEFT(MAX(product_name), 255), MAX(brand_name), now()
+                FROM feedbacks
+                WHERE {where}
+                GROUP BY 1, 2, 3, 4
+                """
+            ),
+            params,
+        )
+        await self.session.execute(
+            text(
+                f"""
+                INSERT INTO question_daily_stats
+                    (shop_id, day_utc, nm_id, total, answered, product_name, brand_name, updated_at)
+                SELECT shop_id, (created_date AT TIME ZONE 'UTC')::date, COALESCE(nm_id, 0),
+                       COUNT(*),
+                       COUNT(*) FILTER (WHERE answer_text IS NOT NULL),
+                       LEFT(MAX(product_name), 255), MAX(brand_name), now()
+                FROM questions
+                WHERE {where}
+                GROUP BY 1, 2, 3
+                """
+            ),
+            params,
+        )
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.sync_schedule import SyncSchedule
+
+
+SYNC_SCHEDULE_STREAMS = ("feedbacks", "questions", "chats")
+
+
+class SyncScheduleRepo:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def ensure_for_shop(self, shop_id: int, *, interval_min: int = 120) -> None:
+        res = await self.session.execute(select(SyncSchedule.stream).where(SyncSchedule.shop_id == shop_id))
+        have = set(res.scalars().all())
+        now = datetime.now(timezone.utc)
+        for stream in SYNC_SCHEDULE_STREAMS:
+            if stream not in have:
+                self.session.add(SyncSchedule(shop_id=shop_id, stream=stream, next_due_at=now, interval_min=interval_min))
+        await self.session.flush()
+
+    async def get(self, shop_id: int, stream: str, *, for_update: bool = False) -> SyncSchedule | None:
+        q = select(SyncSchedule).where(SyncSchedule.shop_id == shop_id, SyncSchedule.stream == stream)
+        if for_update:
+            q = q.with_for_update()
+        return (await self.session.execute(q)).scalar_one_or_none()
+
+    async def due_keys(self, now: datetime) -> set[tuple[int, str]]:
+        """(shop_id, stream) pairs with next_due_at <= now (index range scan)."""
+        res = await self.session.execute(
+            select(SyncSchedule.shop_id, SyncSchedule.stream).where(SyncSchedule.next_due_at <= now)
+        )
+        return {(int(r[0]), str(r[1])) for r in res.all()}
+
+    async def postpone(self, shop_id: int, stream: str, until: datetime) -> None:
+        await self.session.execute(
+            update(SyncSchedule)
+            .where(SyncSchedule.shop_id == shop_id, SyncSchedule.stream == stream)
+            .values(next_due_at=until)
+        )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.system_flags import SystemFlags
@@ -20,4 +21,24 @@ class SystemFlagsRepo:
 
     async def is_kill_switch_on(self) -> bool:
         row = await self.get_or_create()
-        return bool(row.kill_switch)
\ No newline at end of file
+        return bool(row.kill_switch)
+
+    async def prompt_bundle_version(self) -> int:
+        """Cheap PK read that bypasses the identity map (another process may have bumped it)."""
+        res = await self.db.execute(select(SystemFlags.prompt_bundle_version).where(SystemFlags.id == 1))
+        return int(res.scalar_one_or_none() or 0)
+
+    async def bump_prompt_bundle_version(self) -> int:
+        res = await self.db.execute(
+            update(SystemFlags)
+            .where(SystemFlags.id == 1)
+            .values(prompt_bundle_version=SystemFlags.prompt_bundle_version + 1)
+            .returning(SystemFlags.prompt_bundle_version)
+        )
+        version = res.scalar_one_or_none()
+        if version is None:
+            row = await self.get_or_create()
+            row.prompt_bundle_version = 1
+            await self.db.flush()
+            version = 1
+        return int(version)
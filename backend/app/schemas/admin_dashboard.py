@@ -11,6 +11,12 @@ class SystemHealthOut(BaseModel):
     generation_errors_24h: int
     autopublish_enabled_shops: int
     autopublish_errors_24h: int
+    # In-process LLM governor metrics (wait times, budgets).
+    llm_governor: dict = {}
+    # Generation cache hit/miss counters (this process).
+    generation_cache: dict = {}
+    # Buffered gpt_usage writer (pending rows, flush errors).
+    gpt_usage_buffer: dict = {}
 
 
 class IncidentItem(BaseModel):
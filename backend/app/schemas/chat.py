@@ -53,5 +53,7 @@ class ChatSessionRowOut(ChatSessionOut):
 
 
 class ChatSessionsPageOut(BaseModel):
-    total: int
+    # None on cursor pages unless include_total=true.
+    total: int | None = None
     items: list[ChatSessionRowOut]
+    next_cursor: str | None = None
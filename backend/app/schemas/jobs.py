@@ -16,5 +16,28 @@ class JobOut(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+    # Only for backfill_shop jobs (see sync_backfills).
+    progress_pct: float | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class BackfillOut(BaseModel):
+    shop_id: int
+    stream: str
+    status: str
+    progress_pct: float
+    fetched: int
+    total_expected: int | None = None
+    windows_done: int
+    windows_total: int
+    window_to: datetime
+    skip: int
+    last_error: str | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    updated_at: datetime
+
     class Config:
         from_attributes = True
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone, timedelta
+import logging
+
+from app.core.config import settings
+from app.core.crypto import decrypt_secret
+from app.core.db import AsyncSessionMaker
+from app.models.backfill import SyncBackfill
+from app.models.settings import ShopSettings
+from app.models.shop import Shop
+from app.repos.backfill_repo import BackfillRepo
+from app.repos.feedback_repo import FeedbackRepo
+from app.repos.question_repo import QuestionRepo
+from app.repos.shop_data_version_repo import ShopDataVersionRepo
+from app.services.paging import Page, run_pipelined
+from app.services.wb_client import WBClient
+
+
+log = logging.getLogger(__name__)
+
+
+# stream -> (entity, is_answered)
+BACKFILL_STREAMS: dict[str, tuple[str, bool]] = {
+    "feedbacks_unanswered": ("feedbacks", False),
+    "feedbacks_answered": ("feedbacks", True),
+    "questions_unanswered": ("questions", False),
+    "questions_answered": ("questions", True),
+}
+
+
+async def _mark(shop_id: int, stream: str, **values) -> None:
+    async with AsyncSessionMaker() as s:
+        async with s.begin():
+            bf = await BackfillRepo(s).get(shop_id, stream, for_update=True)
+            if bf:
+                for k, v in values.items():
+                    setattr(bf, k, v)
+
+
+async def run_backfill(shop_id: int, stream: str) -> dict:
+    """Download a shop's history for one stream, resuming from the stored checkpoint.
+
+    Every page is upserted and the checkpoint advanced in its own transaction, so a
+    failed/redeployed job continues from the last stored page instead of skip=0.
+    Runs outside of the caller's session on purpose.
+    """
+
+    if stream not in BACKFILL_STREAMS:
+        raise ValueError(f"Unknown backfill stream: {stream}")
+    entity, is_answered = BACKFILL_STREAMS[stream]
+    take = max(1, int(settings.BACKFILL_TAKE))
+
+    async with AsyncSessionMaker() as s:
+        async with s.begin():
+            shop = await s.get(Shop, shop_id)
+            if not shop:
+                return {"skipped": "shop_not_found"}
+            token = decrypt_secret(shop.wb_token_enc)
+
+            bf = await BackfillRepo(s).get_or_create(
+                shop_id,
+                stream,
+                horizon_days=int(settings.BACKFILL_HORIZON_DAYS),
+                window_days=int(settings.BACKFILL_WINDOW_DAYS),
+            )
+            if bf.status == "done":
+                return {"skipped": "done", "fetched": bf.fetched}
+
+            bf.status = "running"
+            bf.last_error = None
+            if bf.started_at is None:
+                bf.started_at = datetime.now(timezone.utc)
+
+            start = (bf.window_to, int(bf.skip or 0))
+            horizon_at = bf.horizon_at
+            window = timedelta(days=max(1, int(bf.window_days)))
+
+    log.info(
+        "[backfill] start shop_id=%s stream=%s window_to=%s skip=%s",
+        shop_id,
+        stream,
+        start[0],
+        start[1],
+    )
+
+    wb = WBClient(token=token)
+    list_fn = wb.feedbacks_list if entity == "feedbacks" else wb.questions_list
+
+    async def _fetch(cursor: tuple[datetime, int]) -> Page:
+        window_to, skip = cursor
+        window_from = max(horizon_at, window_to - window)
+        payload = await list_fn(
+            is_answered=is_answered,
+            take=take,
+            skip=skip,
+            order="dateDesc",
+            date_from=int(window_from.timestamp()),
+            date_to=int(window_to.timestamp()),
+        )
+        data = payload.get("data") or {}
+        items = data.get(entity) or []
+
+        if len(items) >= take:
+            next_cursor = (window_to, skip + take)
+        elif window_from <= horizon_at:
+            next_cursor = None
+        else:
+            next_cursor = (window_from, 0)
+        return Page(items, meta=data, next_cursor=next_cursor)
+
+    async def _consume(page: Page) -> None:
+        async with AsyncSessionMaker() as s:
+            async with s.begin():
+                repo = FeedbackRepo(s) if entity == "feedbacks" else QuestionRepo(s)
+                newest: datetime | None = None
+                for item in page.items:
+                    obj = await repo.upsert_from_wb(shop_id=shop_id, payload=item)
+                    created = getattr(obj, "created_date", None)
+                    if isinstance(created, datetime) and (newest is None or created > newest):
+                        newest = created
+                if page.items:
+                    # Invalidate cached dashboards together with this page's commit.
+                    await ShopDataVersionRepo(s).bump(shop_id)
+
+                bf = await BackfillRepo(s).get(shop_id, stream, for_update=True)
+                if not bf:
+                    return
+                bf.fetched = int(bf.fetched or 0) + len(page.items)
+                if bf.total_expected is None:
+                    data = page.meta or {}
+                    expected = data.get("countArchive") if is_answered else data.get("countUnanswered")
+                    if isinstance(expected, int):
+                        bf.total_expected = expected
+                if newest is not None and (bf.cursor_at is None or newest > bf.cursor_at):
+                    bf.cursor_at = newest
+
+                if page.next_cursor is None:
+                    bf.status = "done"
+                    bf.windows_done = bf.windows_total
+                    bf.finished_at = datetime.now(timezone.utc)
+                    await _finish_shop_settings(s, bf, entity=entity, is_answered=is_answered)
+                else:
+                    next_window_to, next_skip = page.next_cursor
+                    if next_window_to != bf.window_to:
+                        bf.windows_done = min(int(bf.windows_done or 0) + 1, int(bf.windows_total or 0))
+                    bf.window_to = next_window_to
+                    bf.skip = int(next_skip)
+
+    try:
+        pages = await run_pipelined(_fetch, _consume, start=start)
+    except Exception as e:
+        await _mark(shop_id, stream, status="failed", last_error=f"{type(e).__name__}: {e}"[:4000])
+        raise
+    finally:
+        await wb.aclose()
+
+    log.info("[backfill] done shop_id=%s stream=%s pages=%s", shop_id, stream, pages)
+    return {"pages": pages}
+
+
+async def _finish_shop_settings(session, bf: SyncBackfill, *, entity: str, is_answered: bool) -> None:
+    st = await session.get(ShopSettings, bf.shop_id)
+    if not st:
+        return
+    now = datetime.now(timezone.utc)
+    if entity == "questions":
+        st.last_questions_sync_at = now
+        return
+
+    # Hand over to incremental syncs: move their cursor forward (never back).
+    field = "last_answered_feedback_created_at" if is_answered else "last_feedback_created_at"
+    prev = getattr(st, field, None)
+    if bf.cursor_at is not None and (prev is None or bf.cursor_at > prev):
+        setattr(st, field, bf.cursor_at)
+    if is_answered:
+        st.last_answered_reconcile_at = now
+    st.last_sync_at = now
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import re
+from typing import AsyncIterator
 
 from app.models.settings import ShopSettings
-from app.services.openai_client import OpenAIService
+from app.services.openai_client import OpenAIResult, OpenAIService
 from app.core.config import settings
 from app.services.prompt_prefs import load_prompt_prefs
 from app.services.prompt_store import PromptBundle, render_template, DEFAULT_CHAT_INSTRUCTIONS_TEMPLATE
@@ -65,15 +66,7 @@ def sanitize(text: str) -> str:
     return t
 
 
-async def generate_chat_reply(
-    openai: OpenAIService,
-    shop_settings: ShopSettings,
-    last_buyer_message: str,
-    context: dict | None = None,
-    bundle: PromptBundle | None = None,
-) -> tuple[str, str, str | None, int, int]:
-    instructions = build_chat_instructions(shop_settings, bundle=bundle)
-
+def build_chat_input(last_buyer_message: str, context: dict | None = None) -> str:
     ctx_lines: list[str] = []
     if context:
         # Keep it short — the chat model input must be compact.
@@ -83,7 +76,39 @@ async def generate_chat_reply(
                 f"Product context: nmID={gd.get('nmID')} size={gd.get('size')} price={gd.get('price')} {gd.get('priceCurrency')}"
             )
 
-    input_text = "\n".join(["Buyer message:", last_buyer_message] + ([""] + ctx_lines if ctx_lines else []))
+    return "\n".join(["Buyer message:", last_buyer_message] + ([""] + ctx_lines if ctx_lines else []))
 
-    res = await openai.generate_text(model=settings.OPENAI_MODEL, instructions=instructions, input_text=input_text)
+
+async def generate_chat_reply(
+    openai: OpenAIService,
+    shop_settings: ShopSettings,
+    last_buyer_message: str,
+    context: dict | None = None,
+    bundle: PromptBundle | None = None,
+) -> tuple[str, str, str | None, int, int]:
+    instructions = build_chat_instructions(shop_settings, bundle=bundle)
+    input_text = build_chat_input(last_buyer_message, context)
+
+    res = await openai.generate_text(
+        model=settings.OPENAI_MODEL,
+        instructions=instructions,
+        input_text=input_text,
+        shop_id=getattr(shop_settings, "shop_id", None),
+    )
     return sanitize(res.text), res.model, res.response_id, int(res.prompt_tokens), int(res.completion_tokens)
+
+
+async def stream_chat_reply(
+    openai: OpenAIService,
+    shop_settings: ShopSettings,
+    last_buyer_message: str,
+    context: dict | None = None,
+    bundle: PromptBundle | None = None,
+) -> AsyncIterator[str | OpenAIResult]:
+    async for item in openai.stream_text(
+        model=settings.OPENAI_MODEL,
+        instructions=build_chat_instructions(shop_settings, bundle=bundle),
+        input_text=build_chat_input(last_buyer_message, context),
+        shop_id=getattr(shop_settings, "shop_id", None),
+    ):
+        yield item
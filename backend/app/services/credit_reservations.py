@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.db import AsyncSessionMaker
+from app.models.billing import CreditReservation, ShopCreditLedger
+from app.models.shop import Shop
+from app.repos.credit_reservation_repo import CreditReservationRepo
+from app.repos.shop_billing_repo import ShopBillingRepo
+
+
+log = logging.getLogger(__name__)
+
+
+async def reserve(
+    session: AsyncSession,
+    shop_id: int,
+    *,
+    amount: int,
+    expected_items: int,
+    reason: str,
+    actor_user_id: int | None = None,
+) -> CreditReservation | None:
+    """Hold `amount` credits for a batch with one locked charge. None if the balance is insufficient."""
+    res = CreditReservation(
+        shop_id=int(shop_id),
+        actor_user_id=actor_user_id,
+        reason=str(reason)[:64],
+        status="open",
+        reserved=int(amount),
+        consumed=0,
+        expected_items=int(expected_items),
+        expires_at=datetime.now(timezone.utc) + timedelta(minutes=int(settings.CREDIT_RESERVATION_TTL_MIN)),
+    )
+    session.add(res)
+    await session.flush()
+
+    ok = await ShopBillingRepo(session).try_charge(
+        shop_id,
+        amount=int(amount),
+        reason="reservation_hold",
+        actor_user_id=actor_user_id,
+        meta={"reservation_id": res.id, "reason": reason, "expected_items": int(expected_items)},
+    )
+    if not ok:
+        await session.delete(res)
+        await session.flush()
+        return None
+    return res
+
+
+# Per-item operations below commit in their own short transaction on purpose: the caller's
+# (job) transaction lives for the whole LLM call and must not keep the reservation row locked.
+
+
+async def consume(reservation_id: int, *, item_key: str, amount: int) -> bool:
+    """Take `amount` for one item. Idempotent per item; False if the reservation is closed/exhausted."""
+    async with AsyncSessionMaker() as s:
+        async with s.begin():
+            repo = CreditReservationRepo(s)
+            item = await repo.get_item(reservation_id, item_key, for_update=True)
+            if item is not None and item.status in ("consumed", "done"):
+                return True
+            if not await repo.take(reservation_id, amount):
+                return False
+            await repo.set_item(reservation_id, item_key, status="consumed", amount=amount)
+            return True
+
+
+async def release_item(reservation_id: int, *, item_key: str) -> None:
+    """Generation failed: give the item's credits back to the batch (a retry may consume them again)."""
+    async with AsyncSessionMaker() as s:
+        async with s.begin():
+            repo = CreditReservationRepo(s)
+            item = await repo.get_item(reservation_id, item_key, for_update=True)
+            if item is None or item.status != "consumed":
+                return
+            await repo.give_back(reservation_id, item.amount)
+            item.status = "released"
+
+
+async def finish_item(reservation_id: int, *, item_key: str) -> None:
+    """Mark an item done (items that never consumed count as skipped); settle the batch once all are done.
+
+    Call only after the item's result is committed: settling closes the reservation, after which
+    release_item can no longer give credits back.
+    """
+    async with AsyncSessionMaker() as s:
+        async with s.begin():
+            repo = CreditReservationRepo(s)
+            item = await repo.get_item(reservation_id, item_key, for_update=True)
+            if item is not None and item.status in ("consumed", "done"):
+                item.status = "done"
+                await s.flush()
+            else:
+                await repo.set_item(reservation_id, item_key, status="skipped", amount=0)
+            res = await repo.get(reservation_id)
+            if res is None or res.status != "open":
+                return
+            if await repo.count_finished_items(reservation_id) >= int(res.expected_items):
+                await settle(s, reservation_id)
+
+
+async def settle(session: AsyncSession, reservation_id: int) -> int:
+    """Return unused credits to the shop and close the batch.
+
+    The batch's `reservation_hold` ledger entry is finalized with the summary (per-item
+    detail in meta); a `reservation_settle` refund row is only written when credits are returned.
+    """
+    repo = CreditReservationRepo(session)
+    res = await repo.get(reservation_id, for_update=True)
+    if res is None or res.status != "open":
+        return 0
+
+    items = await repo.list_items(reservation_id)
+    detail: dict[str, list[str]] = {"done": [], "consumed": [], "skipped": [], "released": []}
+    for it in items:
+        detail.setdefault(it.status, []).append(it.item_key)
+
+    unused = max(0, int(res.reserved) - int(res.consumed))
+    summary = {
+        "reserved": int(res.reserved),
+        "consumed": int(res.consumed),
+        "released": unused,
+        "items": detail,
+    }
+    hold = (
+        await session.execute(
+            select(ShopCreditLedger).where(
+                ShopCreditLedger.shop_id == res.shop_id,
+                ShopCreditLedger.reason == "reservation_hold",
+                ShopCreditLedger.meta.contains({"reservation_id": res.id}),
+            )
+        )
+    ).scalars().first()
+    if hold is not None:
+        hold.meta = {**(hold.meta or {}), "settled": summary}
+
+    if unused:
+        # A release, not a charge: must succeed for deactivated shops too.
+        await ShopBillingRepo(session).apply_credits(
+            res.shop_id,
+            delta=unused,
+            reason="reservation_settle",
+            actor_user_id=res.actor_user_id,
+            meta={"reservation_id": res.id, "reason": res.reason, **summary},
+            allow_inactive=True,
+        )
+        # The hold counted as spent; only consumed credits really are.
+        shop = await session.get(Shop, res.shop_id)
+        if shop is not None:
+            shop.credits_spent = max(0, int(shop.credits_spent or 0) - unused)
+
+    res.status = "settled"
+    res.settled_at = datetime.now(timezone.utc)
+    await session.flush()
+    log.info("[credits] reservation %s settled: reserved=%s consumed=%s released=%s", res.id, res.reserved, res.consumed, unused)
+    return unused
+
+
+async def settle_expired(session: AsyncSession) -> int:
+    """Settle batches whose items never all finished (e.g. jobs failed for good).
+
+    Each batch settles in its own transaction, so one failing batch cannot abort the caller's
+    (scheduler tick) transaction.
+    """
+    n = 0
+    for rid in await CreditReservationRepo(session).expired_open_ids():
+        try:
+            async with AsyncSessionMaker() as s:
+                async with s.begin():
+                    await settle(s, rid)
+            n += 1
+        except Exception as e:
+            log.warning("[credits] settling expired reservation %s failed: %s", rid, e)
+    return n
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import time
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.repos.shop_data_version_repo import ShopDataVersionRepo
+
+
+_CACHE_CONTROL = "private, no-cache"
+
+
+@dataclass
+class CachedResponse:
+    versions: tuple
+    expires_at: float
+    body: bytes
+    etag: str
+
+
+class DashboardCache:
+    """In-process LRU of serialized dashboard responses.
+
+    An entry is valid while the data versions of its shops are unchanged and DASHBOARD_CACHE_TTL_SEC
+    has not passed (the TTL covers time-relative fields such as "waiting > 24h" and chats,
+    which do not bump versions).
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max(1, int(max_entries))
+        self._entries: OrderedDict[tuple, CachedResponse] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, versions: tuple) -> CachedResponse | None:
+        e = self._entries.get(key)
+        if e is None or e.versions != versions or e.expires_at <= time.monotonic():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return e
+
+    def put(self, key: tuple, versions: tuple, body: bytes) -> CachedResponse:
+        e = CachedResponse(
+            versions=versions,
+            expires_at=time.monotonic() + float(settings.DASHBOARD_CACHE_TTL_SEC),
+            body=body,
+            etag='"' + hashlib.sha1(body).hexdigest() + '"',
+        )
+        self._entries[key] = e
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return e
+
+
+dashboard_cache = DashboardCache(settings.DASHBOARD_CACHE_MAX_ENTRIES)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return any((t[2:] if t.startswith("W/") else t) == etag for t in tags)
+
+
+async def cached_dashboard_response(
+    request: Request,
+    db: AsyncSession,
+    *,
+    key: tuple,
+    shop_ids: list[int],
+    build: Callable[[], Awaitable[BaseModel]],
+) -> Response | BaseModel:
+    """Serve a dashboard body from the cache (or build it), with ETag / If-None-Match -> 304.
+
+    `key` identifies the endpoint and its resolved parameters; the shop data versions are
+    read first, so a build that races with a bump is stored under the older versions and
+    is rebuilt on the next request.
+    """
+    if not settings.DASHBOARD_CACHE_ENABLED:
+        return await build()
+
+    versions = tuple(sorted((await ShopDataVersionRepo(db).get_many(shop_ids)).items()))
+    key = (*key, tuple(sorted(shop_ids)))
+    entry = dashboard_cache.get(key, versions)
+    if entry is None:
+        out = await build()
+        entry = dashboard_cache.put(key, versions, out.model_dump_json().encode("utf-8"))
+
+    headers = {"ETag": entry.etag, "Cache-Control": _CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -1,16 +1,22 @@
 from __future__ import annotations
 
+import logging
 import re
 import random
+import time
+from typing import AsyncIterator
 
 from app.models.feedback import Feedback
 from app.models.settings import ShopSettings
-from app.services.openai_client import OpenAIService
+from app.services.openai_client import OpenAIResult, OpenAIService
 from app.core.config import settings
 from app.services.prompt_prefs import load_prompt_prefs, tone_instruction, pick_signature
 from app.services.prompt_store import PromptBundle, render_template, DEFAULT_REVIEW_INSTRUCTIONS_TEMPLATE
+from app.services import generation_cache
 
 
+log = logging.getLogger(__name__)
+
 _MAX_LEN_HARD = 5000
 
 PHONE_RE = re.compile(r"(\+?\d[\d\s\-()]{7,}\d)")
@@ -31,12 +37,13 @@ def build_instructions(
     bundle: PromptBundle | None = None,
     *,
     brand: str | None = None,
+    rng: random.Random | None = None,
 ) -> str:
     prefs = load_prompt_prefs(shop_settings)
     lang = shop_settings.language
     base_tone = shop_settings.tone
 
-    sig = pick_signature(shop_settings, kind="review", brand=brand)
+    sig = pick_signature(shop_settings, kind="review", brand=brand, rng=rng)
 
     if prefs.address_format == "vy_caps":
         addr_rule = "Use polite address with capitalized 'Вы/Ваш/Вам'."
@@ -131,12 +138,10 @@ def sanitize_output(text: str) -> str:
 
 
 def contains_blacklist(feedback: Feedback, shop_settings: ShopSettings) -> bool:
-    bl = shop_settings.blacklist_keywords or []
-    hay = " ".join([feedback.text or "", feedback.pros or "", feedback.cons or ""]).lower()
-    for kw in bl:
-        if isinstance(kw, str) and kw.strip() and kw.lower() in hay:
-            return True
-    return False
+    """True if the review must stay in manual review (blacklisted and not whitelisted)."""
+    from app.services.keyword_matcher import get_keyword_matcher
+
+    return get_keyword_matcher(shop_settings).needs_manual_review(feedback.text, feedback.pros, feedback.cons)
 
 
 def effective_mode_for_rating(shop_settings: ShopSettings, rating: int | None) -> str:
@@ -154,17 +159,155 @@ async def generate_draft_text(
     feedback: Feedback,
     shop_settings: ShopSettings,
     bundle: PromptBundle | None = None,
-) -> tuple[str, str, str | None, int, int]:
-    pd = feedback.product_details or {}
-    brand = pd.get("brandName")
-    brand = brand.strip() if isinstance(brand, str) and brand.strip() else None
+    *,
+    use_cache: bool = True,
+) -> tuple[str, str, str | None, int, int, bool]:
+    """(text, model, response_id, prompt_tokens, completion_tokens, cached).
 
-    instructions = build_instructions(shop_settings, bundle=bundle, brand=brand)
-    input_text = build_input(feedback, shop_settings, bundle=bundle)
+    `cached` is True for generation cache hits; like template drafts they made no API call
+    and must not be recorded in gpt_usage. use_cache=False (regenerate) always calls the model.
+    """
+    # Rating-only reviews: answer from templates instantly, no tokens spent.
+    from app.services.template_drafting import TEMPLATE_MODEL, template_fast_path_applies, generate_template_draft
+
+    if template_fast_path_applies(feedback, shop_settings):
+        return generate_template_draft(feedback, shop_settings), TEMPLATE_MODEL, None, 0, 0, False
+
+    instructions, input_text = _review_prompt(feedback, shop_settings, bundle)
+
+    cache_key, hit = await _cache_lookup(feedback, instructions, input_text, use_cache=use_cache)
+    if hit is not None:
+        return hit.text, hit.model, None, 0, 0, True
 
     res = await openai.generate_text(
         model=settings.OPENAI_MODEL,
         instructions=instructions,
         input_text=input_text,
+        shop_id=getattr(shop_settings, "shop_id", None),
     )
-    return sanitize_output(res.text), res.model, res.response_id, int(res.prompt_tokens), int(res.completion_tokens)
+    text = sanitize_output(res.text)
+    await _cache_store(cache_key, res, text)
+    return text, res.model, res.response_id, int(res.prompt_tokens), int(res.completion_tokens), False
+
+
+async def stream_draft_text(
+    openai: OpenAIService,
+    feedback: Feedback,
+    shop_settings: ShopSettings,
+    bundle: PromptBundle | None = None,
+    *,
+    use_cache: bool = True,
+) -> AsyncIterator[str | OpenAIResult]:
+    """Streaming variant of generate_draft_text: text deltas, then the final OpenAIResult (unsanitized)."""
+    from app.services.template_drafting import TEMPLATE_MODEL, template_fast_path_applies, generate_template_draft
+
+    if template_fast_path_applies(feedback, shop_settings):
+        text = generate_template_draft(feedback, shop_settings)
+        yield text
+        yield OpenAIResult(text=text, model=TEMPLATE_MODEL)
+        return
+
+    instructions, input_text = _review_prompt(feedback, shop_settings, bundle)
+    cache_key, hit = await _cache_lookup(feedback, instructions, input_text, use_cache=use_cache)
+    if hit is not None:
+        yield hit.text
+        yield OpenAIResult(text=hit.text, model=hit.model, cached=True)
+        return
+
+    async for item in openai.stream_text(
+        model=settings.OPENAI_MODEL,
+        instructions=instructions,
+        input_text=input_text,
+        shop_id=getattr(shop_settings, "shop_id", None),
+    ):
+        if isinstance(item, OpenAIResult):
+            await _cache_store(cache_key, item, sanitize_output(item.text))
+        yield item
+
+
+# Settings preview: prompt hash -> (expires_at monotonic, reply, model). Short-lived, per process.
+_preview_cache: dict[str, tuple[float, str, str]] = {}
+_PREVIEW_CACHE_MAX = 512
+
+
+async def generate_preview_text(
+    openai: OpenAIService,
+    feedback: Feedback,
+    shop_settings: ShopSettings,
+    bundle: PromptBundle | None = None,
+) -> tuple[str, str]:
+    """(reply, model) for the settings preview, cached by the effective prompt for PREVIEW_CACHE_TTL_SEC.
+
+    Unchanged settings produce the same instructions+input, so reopening the settings page costs no tokens.
+    """
+    # Fixed signature choice: otherwise shops with several signatures would never hit the cache.
+    instructions, input_text = _review_prompt(feedback, shop_settings, bundle, rng=random.Random(0))
+    key = generation_cache.make_cache_key(settings.OPENAI_MODEL, instructions, input_text)
+
+    now = time.monotonic()
+    hit = _preview_cache.get(key)
+    if hit is not None and hit[0] > now:
+        return hit[1], hit[2]
+
+    res = await openai.generate_text(
+        model=settings.OPENAI_MODEL,
+        instructions=instructions,
+        input_text=input_text,
+        shop_id=getattr(shop_settings, "shop_id", None),
+    )
+    text = sanitize_output(res.text)
+
+    if len(_preview_cache) >= _PREVIEW_CACHE_MAX:
+        for k in [k for k, v in _preview_cache.items() if v[0] <= now] or list(_preview_cache)[: _PREVIEW_CACHE_MAX // 4]:
+            _preview_cache.pop(k, None)
+    _preview_cache[key] = (now + float(settings.PREVIEW_CACHE_TTL_SEC), text, res.model)
+    return text, res.model
+
+
+def _review_prompt(
+    feedback: Feedback,
+    shop_settings: ShopSettings,
+    bundle: PromptBundle | None,
+    *,
+    rng: random.Random | None = None,
+) -> tuple[str, str]:
+    pd = feedback.product_details or {}
+    brand = pd.get("brandName")
+    brand = brand.strip() if isinstance(brand, str) and brand.strip() else None
+
+    instructions = build_instructions(shop_settings, bundle=bundle, brand=brand, rng=rng)
+    input_text = build_input(feedback, shop_settings, bundle=bundle)
+    return instructions, input_text
+
+
+async def _cache_lookup(feedback: Feedback, instructions: str, input_text: str, *, use_cache: bool = True):
+    """(cache_key, hit). Short reviews repeat a lot ("Отлично", 5★, same product/settings): reuse earlier replies.
+
+    use_cache=False (regenerate) never returns a hit; the fresh reply is still offered to the cache.
+    """
+    review_len = sum(len(x or "") for x in (feedback.text, feedback.pros, feedback.cons))
+    if not settings.GEN_CACHE_ENABLED or review_len > int(settings.GEN_CACHE_MAX_REVIEW_CHARS):
+        return None, None
+    cache_key = generation_cache.make_cache_key(settings.OPENAI_MODEL, instructions, input_text)
+    if not use_cache:
+        return cache_key, None
+    try:
+        return cache_key, await generation_cache.lookup(cache_key)
+    except Exception as e:
+        log.warning("[gen-cache] lookup failed: %s", e)
+        return cache_key, None
+
+
+async def _cache_store(cache_key: str | None, res: OpenAIResult, text: str) -> None:
+    if cache_key is None:
+        return
+    try:
+        await generation_cache.store(
+            cache_key,
+            model=res.model,
+            text=text,
+            prompt_tokens=int(res.prompt_tokens),
+            completion_tokens=int(res.completion_tokens),
+        )
+    except Exception as e:
+        log.warning("[gen-cache] store failed: %s", e)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import hashlib
+import logging
+import random
+import time
+
+from app.core.config import settings
+from app.core.db import AsyncSessionMaker
+from app.repos.generation_cache_repo import GenerationCacheRepo
+from app.services.gpt_accounting import generation_cache_stats
+
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedReply:
+    text: str
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+
+
+def normalize_text(text: str | None) -> str:
+    return " ".join((text or "").casefold().split())
+
+
+def make_cache_key(model: str, instructions: str, input_text: str) -> str:
+    raw = "\x1f".join([model or "", normalize_text(instructions), normalize_text(input_text)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _LRU:
+    """Small in-process LRU with TTL in front of the generation_cache table.
+
+    Holds only complete candidate sets, so a memory hit never needs the database.
+    """
+
+    def __init__(self, size: int, ttl_sec: float):
+        self.size = max(1, int(size))
+        self.ttl_sec = float(ttl_sec)
+        self._data: OrderedDict[str, tuple[float, list[CachedReply]]] = OrderedDict()
+
+    def get(self, key: str) -> list[CachedReply] | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        ts, replies = item
+        if time.monotonic() - ts > self.ttl_sec:
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return replies
+
+    def put(self, key: str, replies: list[CachedReply]) -> None:
+        self._data[key] = (time.monotonic(), replies)
+        self._data.move_to_end(key)
+        while len(self._data) > self.size:
+            self._data.popitem(last=False)
+
+
+_lru = _LRU(settings.GEN_CACHE_LRU_SIZE, settings.GEN_CACHE_LRU_TTL_SEC)
+_last_purge_at: float = 0.0
+
+
+async def lookup(cache_key: str) -> CachedReply | None:
+    """Return a random cached candidate once the key has GEN_CACHE_CANDIDATES of them, else None (miss)."""
+    need = max(1, int(settings.GEN_CACHE_CANDIDATES))
+
+    replies = _lru.get(cache_key)
+    if replies:
+        reply = random.choice(replies)
+        generation_cache_stats.record_hit(
+            source="memory", model=reply.model, prompt_tokens=reply.prompt_tokens, completion_tokens=reply.completion_tokens
+        )
+        return reply
+
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionMaker() as s:
+        async with s.begin():
+            repo = GenerationCacheRepo(s)
+            rows = await repo.candidates(cache_key, now)
+            if len(rows) < need:
+                generation_cache_stats.misses += 1
+                return None
+            row = random.choice(rows)
+            await repo.touch(row.id, now)
+            replies = [
+                CachedReply(text=r.text, model=r.model, prompt_tokens=r.prompt_tokens, completion_tokens=r.completion_tokens)
+                for r in rows
+            ]
+
+    _lru.put(cache_key, replies)
+    reply = next(r for r in replies if r.text == row.text)
+    generation_cache_stats.record_hit(
+        source="db", model=reply.model, prompt_tokens=reply.prompt_tokens, completion_tokens=reply.completion_tokens
+    )
+    return reply
+
+
+async def store(cache_key: str, *, model: str, text: str, prompt_tokens: int, completion_tokens: int) -> None:
+    """Add a fresh generation as a candidate (ignored once the key already has enough of them)."""
+    if not (text or "").strip():
+        return
+    need = max(1, int(settings.GEN_CACHE_CANDIDATES))
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionMaker() as s:
+        async with s.begin():
+            repo = GenerationCacheRepo(s)
+            rows = await repo.candidates(cache_key, now)
+            if len(rows) >= need or any(r.text == text for r in rows):
+                return
+            await repo.add(
+                cache_key=cache_key,
+                model=model,
+                text=text,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                ttl=timedelta(hours=max(1, int(settings.GEN_CACHE_TTL_HOURS))),
+            )
+    generation_cache_stats.stores += 1
+
+
+async def purge_if_due(session) -> None:
+    """TTL + size eviction; cheap no-op unless GEN_CACHE_PURGE_INTERVAL_SEC elapsed in this process."""
+    global _last_purge_at
+    if not settings.GEN_CACHE_ENABLED:
+        return
+    if time.monotonic() - _last_purge_at < float(settings.GEN_CACHE_PURGE_INTERVAL_SEC):
+        return
+    _last_purge_at = time.monotonic()
+    removed = await GenerationCacheRepo(session).purge(datetime.now(timezone.utc), max_rows=int(settings.GEN_CACHE_MAX_ROWS))
+    if removed:
+        generation_cache_stats.evicted += removed
+        log.info("[gen-cache] evicted %s rows", removed)
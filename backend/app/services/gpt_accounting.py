@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import logging
+import time
 from decimal import Decimal
 from typing import Any
 
@@ -8,6 +11,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.models.gpt_usage import GptUsage
+from app.repos.gpt_usage_rollup_repo import GptUsageRollupRepo
+from app.services.usage_buffer import gpt_usage_buffer
+
+
+log = logging.getLogger(__name__)
+
+_last_rollup_repair_at = 0.0
 
 
 @dataclass
@@ -66,12 +76,16 @@ async def record_gpt_usage(
     prompt_tokens: int,
     completion_tokens: int,
     response_id: str | None,
-) -> GptUsage:
-    """Insert a GPT usage row. Caller should commit."""
+) -> None:
+    """Record a GPT usage row.
+
+    With GPT_USAGE_BUFFER_ENABLED the row goes to the in-process buffer (see services.usage_buffer)
+    and is written independently of `session`; otherwise it is inserted inline and the caller commits.
+    """
     cost_usd = estimate_cost_usd(model=model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
     cost_rub = usd_to_rub(cost_usd)
 
-    row = GptUsage(
+    row = dict(
         shop_id=int(shop_id),
         model=str(model),
         operation_type=str(operation_type),
@@ -80,7 +94,68 @@ async def record_gpt_usage(
         cost_usd=float(cost_usd),
         cost_rub=float(cost_rub),
         response_id=response_id,
+        created_at=datetime.now(timezone.utc),
     )
-    session.add(row)
+    if settings.GPT_USAGE_BUFFER_ENABLED:
+        gpt_usage_buffer.add(row)
+        return
+    session.add(GptUsage(**row))
     await session.flush()
-    return row
+    await GptUsageRollupRepo(session).add_rows([row])
+
+
+async def compact_usage_rollup_if_due(session: AsyncSession) -> None:
+    """Re-derive the last closed days of gpt_usage_daily from raw rows (repairs drift, e.g. after
+    manual edits); cheap no-op unless GPT_USAGE_ROLLUP_REPAIR_INTERVAL_MIN elapsed in this process."""
+    global _last_rollup_repair_at
+    if time.monotonic() - _last_rollup_repair_at < float(settings.GPT_USAGE_ROLLUP_REPAIR_INTERVAL_MIN) * 60:
+        return
+    _last_rollup_repair_at = time.monotonic()
+    days = max(1, int(settings.GPT_USAGE_ROLLUP_REPAIR_DAYS))
+    # Today is still being incremented by writers; only closed days are rebuilt.
+    yesterday = datetime.now(timezone.utc).date() - timedelta(days=1)
+    n = await GptUsageRollupRepo(session).rebuild(yesterday - timedelta(days=days - 1), yesterday)
+    log.info("[gpt-usage] rollup rebuilt for %s day(s): %s rows", days, n)
+
+
+@dataclass
+class GenerationCacheStats:
+    """In-process hit/miss counters of the generation cache (see services.generation_cache)."""
+
+    hits_memory: int = 0
+    hits_db: int = 0
+    misses: int = 0
+    stores: int = 0
+    evicted: int = 0
+    tokens_saved: int = 0
+    cost_saved_usd: Decimal = Decimal("0")
+
+    def record_hit(self, *, source: str, model: str, prompt_tokens: int, completion_tokens: int) -> None:
+        if source == "memory":
+            self.hits_memory += 1
+        else:
+            self.hits_db += 1
+        self.tokens_saved += int(prompt_tokens or 0) + int(completion_tokens or 0)
+        self.cost_saved_usd += estimate_cost_usd(
+            model=model, prompt_tokens=int(prompt_tokens or 0), completion_tokens=int(completion_tokens or 0)
+        )
+
+    def snapshot(self) -> dict[str, Any]:
+        hits = self.hits_memory + self.hits_db
+        lookups = hits + self.misses
+        return {
+            "enabled": bool(settings.GEN_CACHE_ENABLED),
+            "hits": hits,
+            "hits_memory": self.hits_memory,
+            "hits_db": self.hits_db,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evicted": self.evicted,
+            "tokens_saved": self.tokens_saved,
+            "cost_saved_usd": float(self.cost_saved_usd),
+            "cost_saved_rub": float(usd_to_rub(self.cost_saved_usd)),
+        }
+
+
+generation_cache_stats = GenerationCacheStats()
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import re
+
+from app.models.settings import ShopSettings
+from app.services.prompt_prefs import load_prompt_prefs
+
+
+_CACHE_SIZE = 1024
+
+
+def _clean(keywords) -> tuple[str, ...]:
+    out = {kw.strip().lower() for kw in (keywords or []) if isinstance(kw, str) and kw.strip()}
+    return tuple(sorted(out))
+
+
+def _trie_pattern(words: tuple[str, ...]) -> str:
+    """Regex for a set of literals with shared prefixes factored out (a trie),
+    so the engine does not retry every keyword at every text position."""
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def _build(node: dict) -> str:
+        ends = "" in node
+        branches = [re.escape(ch) + _build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends:
+            return "(?:" + body + ")?"
+        return body
+
+    return _build(trie)
+
+
+def _compile(words: tuple[str, ...], *, whole_words: bool) -> re.Pattern | None:
+    if not words:
+        return None
+    pat = _trie_pattern(words)
+    if whole_words:
+        pat = r"(?<!\w)(?:" + pat + r")(?!\w)"
+    return re.compile(pat)
+
+
+@dataclass(frozen=True)
+class KeywordMatcher:
+    """Compiled blacklist / whitelist / stop-word matcher of one shop.
+
+    Matching is case-insensitive substring search (like the former `kw in text` loops)
+    unless config["keyword_whole_words"] is set. A whitelist keyword in the customer text
+    overrides a blacklist hit; stop words are checked in generated replies.
+    """
+
+    source: tuple
+    blacklist: re.Pattern | None
+    whitelist: re.Pattern | None
+    stop_words: re.Pattern | None
+
+    @staticmethod
+    def _hit(pattern: re.Pattern | None, *texts: str | None) -> bool:
+        if pattern is None:
+            return False
+        return any(pattern.search(t.lower()) for t in texts if t)
+
+    @staticmethod
+    def _hits(pattern: re.Pattern | None, *texts: str | None) -> list[str]:
+        if pattern is None:
+            return []
+        found: list[str] = []
+        for t in texts:
+            if t:
+                found.extend(m.group(0) for m in pattern.finditer(t.lower()))
+        return list(dict.fromkeys(found))
+
+    def blacklist_hit(self, *texts: str | None) -> bool:
+        return self._hit(self.blacklist, *texts)
+
+    def whitelist_hit(self, *texts: str | None) -> bool:
+        return self._hit(self.whitelist, *texts)
+
+    def stop_word_hits(self, *texts: str | None) -> list[str]:
+        return self._hits(self.stop_words, *texts)
+
+    def needs_manual_review(self, *texts: str | None) -> bool:
+        """Blacklisted customer text that no whitelist keyword vouches for."""
+        return self.blacklist_hit(*texts) and not self.whitelist_hit(*texts)
+
+
+_cache: OrderedDict[tuple, KeywordMatcher] = OrderedDict()
+
+
+def get_keyword_matcher(shop_settings: ShopSettings) -> KeywordMatcher:
+    """Matcher cached per (shop_id, settings.updated_at).
+
+    The raw keyword lists are compared as well, so unsaved in-memory edits
+    (e.g. settings preview) never reuse a stale pattern.
+    """
+    cfg = shop_settings.config if isinstance(shop_settings.config, dict) else {}
+    whole_words = bool(cfg.get("keyword_whole_words"))
+    source = (
+        tuple(shop_settings.blacklist_keywords or []),
+        tuple(shop_settings.whitelist_keywords or []),
+        tuple(load_prompt_prefs(shop_settings).stop_words),
+        whole_words,
+    )
+    key = (getattr(shop_settings, "shop_id", None), getattr(shop_settings, "updated_at", None))
+
+    m = _cache.get(key)
+    if m is not None and m.source == source:
+        _cache.move_to_end(key)
+        return m
+
+    bl, wl, sw, ww = source
+    m = KeywordMatcher(
+        source=source,
+        blacklist=_compile(_clean(bl), whole_words=ww),
+        whitelist=_compile(_clean(wl), whole_words=ww),
+        stop_words=_compile(_clean(sw), whole_words=ww),
+    )
+    _cache[key] = m
+    _cache.move_to_end(key)
+    while len(_cache) > _CACHE_SIZE:
+        _cache.popitem(last=False)
+    return m
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+import time
+
+from app.core.config import settings
+
+
+log = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Classic token bucket; `level` may go negative when a reservation is reconciled upwards."""
+
+    def __init__(self, capacity: float, per_minute: float):
+        self.capacity = max(1.0, float(capacity))
+        self.rate = max(0.001, float(per_minute)) / 60.0
+        self.level = self.capacity
+        self._ts = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._ts) * self.rate)
+        self._ts = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (0 if available now)."""
+        self._refill()
+        amount = min(float(amount), self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.level -= float(amount)
+
+    def is_full(self) -> bool:
+        self._refill()
+        return self.level >= self.capacity
+
+
+@dataclass
+class Reservation:
+    shop_id: int | None
+    est_tokens: int
+    waited_sec: float
+
+
+def estimate_tokens(*texts: str | None) -> int:
+    chars = sum(len(t) for t in texts if t)
+    per_token = max(0.5, float(settings.LLM_CHARS_PER_TOKEN))
+    return int(chars / per_token) + int(settings.LLM_EST_COMPLETION_TOKENS)
+
+
+class LLMGovernor:
+    """Process-wide RPM/TPM budget for OpenAI calls with per-shop fair shares.
+
+    Global buckets cap the whole process; every shop additionally has its own buckets sized
+    LLM_SHOP_MAX_SHARE of the global ones, so a single bulk run cannot starve other shops.
+    Callers wait (never fail) until all buckets admit the call.
+    Limits are per process: with N workers, configure LLM_RPM_LIMIT/LLM_TPM_LIMIT divided by N.
+    """
+
+    def __init__(self, *, rpm: int, tpm: int, shop_share: float):
+        self.rpm = int(rpm)
+        self.tpm = int(tpm)
+        self.shop_share = max(0.01, min(1.0, float(shop_share)))
+        self._rpm = TokenBucket(self.rpm, self.rpm)
+        self._tpm = TokenBucket(self.tpm, self.tpm)
+        self._shops: dict[int, tuple[TokenBucket, TokenBucket]] = {}
+        self._lock = asyncio.Lock()
+
+        # metrics
+        self.calls = 0
+        self.waited_calls = 0
+        self.wait_total_sec = 0.0
+        self.wait_max_sec = 0.0
+        self.waiting_now = 0
+        self.tokens_estimated = 0
+        self.tokens_actual = 0
+
+    def _shop_buckets(self, shop_id: int) -> tuple[TokenBucket, TokenBucket]:
+        b = self._shops.get(shop_id)
+        if b is None:
+            if len(self._shops) > 1000:
+                # Drop idle shops (full buckets carry no state).
+                self._shops = {k: v for k, v in self._shops.items() if not (v[0].is_full() and v[1].is_full())}
+            rpm = max(1.0, self.rpm * self.shop_share)
+            tpm = max(1.0, self.tpm * self.shop_share)
+            b = (TokenBucket(rpm, rpm), TokenBucket(tpm, tpm))
+            self._shops[shop_id] = b
+        return b
+
+    async def acquire(self, shop_id: int | None, est_tokens: int) -> Reservation:
+        started = time.monotonic()
+        self.waiting_now += 1
+        try:
+            while True:
+                async with self._lock:
+                    buckets = [(self._rpm, 1), (self._tpm, est_tokens)]
+                    if shop_id is not None:
+                        s_rpm, s_tpm = self._shop_buckets(int(shop_id))
+                        buckets += [(s_rpm, 1), (s_tpm, est_tokens)]
+                    wait = max(b.wait_for(n) for b, n in buckets)
+                    if wait <= 0:
+                        for b, n in buckets:
+                            b.take(n)
+                        break
+                await asyncio.sleep(min(max(wait, 0.05), 5.0))
+        finally:
+            self.waiting_now -= 1
+
+        waited = time.monotonic() - started
+        self.calls += 1
+        self.tokens_estimated += int(est_tokens)
+        if waited >= 0.05:
+            self.waited_calls += 1
+            self.wait_total_sec += waited
+            self.wait_max_sec = max(self.wait_max_sec, waited)
+            if waited >= 5.0:
+                log.info("[llm-governor] shop_id=%s waited %.1fs for budget (est_tokens=%s)", shop_id, waited, est_tokens)
+        return Reservation(shop_id=shop_id, est_tokens=int(est_tokens), waited_sec=waited)
+
+    def reconcile(self, res: Reservation, actual_tokens: int) -> None:
+        """Charge (or refund) the difference between the estimate and reported usage."""
+        actual = int(actual_tokens or 0)
+        if actual <= 0:
+            return
+        self.tokens_actual += actual
+        diff = actual - res.est_tokens
+        if diff == 0:
+            return
+        self._tpm.take(diff)
+        if res.shop_id is not None:
+            self._shop_buckets(int(res.shop_id))[1].take(diff)
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": bool(settings.LLM_GOVERNOR_ENABLED),
+            "rpm_limit": self.rpm,
+            "tpm_limit": self.tpm,
+            "calls": self.calls,
+            "waited_calls": self.waited_calls,
+            "waiting_now": self.waiting_now,
+            "wait_total_sec": round(self.wait_total_sec, 3),
+            "wait_avg_sec": round(self.wait_total_sec / self.waited_calls, 3) if self.waited_calls else 0.0,
+            "wait_max_sec": round(self.wait_max_sec, 3),
+            "tokens_estimated": self.tokens_estimated,
+            "tokens_actual": self.tokens_actual,
+            "tpm_available": int(self._tpm.level),
+        }
+
+
+llm_governor = LLMGovernor(
+    rpm=settings.LLM_RPM_LIMIT,
+    tpm=settings.LLM_TPM_LIMIT,
+    shop_share=settings.LLM_SHOP_MAX_SHARE,
+)
@@ -1,11 +1,52 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import AsyncIterator, Optional
 
+import httpx
 from openai import AsyncOpenAI
 
 from app.core.config import settings
+from app.services.llm_governor import estimate_tokens, llm_governor
+
+
+# Process-wide client: one HTTP connection pool (keep-alive, TLS reuse) for all generations.
+_shared_client: AsyncOpenAI | None = None
+
+
+def get_openai_client() -> AsyncOpenAI:
+    global _shared_client
+    if _shared_client is None:
+        if not settings.OPENAI_API_KEY:
+            raise RuntimeError("OPENAI_API_KEY is not set")
+        http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.OPENAI_TIMEOUT_SEC),
+            limits=httpx.Limits(
+                max_connections=int(settings.OPENAI_MAX_CONNECTIONS),
+                max_keepalive_connections=int(settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS),
+                keepalive_expiry=float(settings.OPENAI_KEEPALIVE_EXPIRY_SEC),
+            ),
+        )
+        _shared_client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL or None,
+            timeout=settings.OPENAI_TIMEOUT_SEC,
+            http_client=http_client,
+        )
+    return _shared_client
+
+
+def set_openai_client(client: AsyncOpenAI | None) -> None:
+    """Replace the shared client (e.g. tests pointing at a local stand-in server)."""
+    global _shared_client
+    _shared_client = client
+
+
+async def close_openai_client() -> None:
+    global _shared_client
+    client, _shared_client = _shared_client, None
+    if client is not None:
+        await client.close()
 
 
 @dataclass
@@ -15,35 +56,56 @@ class OpenAIResult:
     response_id: str | None = None
     prompt_tokens: int = 0
     completion_tokens: int = 0
+    # Served from the generation cache: no API call was made, so no gpt_usage row.
+    cached: bool = False
+
+
+def _usage_tokens(resp) -> tuple[int, int]:
+    # The OpenAI Python SDK returns usage differently depending on API/model.
+    # We keep this tolerant and default to 0 when unavailable.
+    prompt_tokens = 0
+    completion_tokens = 0
+    usage = getattr(resp, "usage", None)
+    if usage is not None:
+        # Responses API typically reports input_tokens / output_tokens.
+        prompt_tokens = int(getattr(usage, "input_tokens", 0) or 0)
+        completion_tokens = int(getattr(usage, "output_tokens", 0) or 0)
+        # Fallback names
+        if not prompt_tokens:
+            prompt_tokens = int(getattr(usage, "prompt_tokens", 0) or 0)
+        if not completion_tokens:
+            completion_tokens = int(getattr(usage, "completion_tokens", 0) or 0)
+    return prompt_tokens, completion_tokens
 
 
 class OpenAIService:
-    def __init__(self):
-        if not settings.OPENAI_API_KEY:
-            raise RuntimeError("OPENAI_API_KEY is not set")
-        self._client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, timeout=settings.OPENAI_TIMEOUT_SEC)
+    def __init__(self, client: AsyncOpenAI | None = None):
+        # Cheap to construct: uses the shared pooled client unless one is injected.
+        self._client = client or get_openai_client()
+
+    async def generate_text(
+        self,
+        *,
+        model: str,
+        instructions: str,
+        input_text: str,
+        shop_id: int | None = None,
+    ) -> OpenAIResult:
+        # Wait for RPM/TPM budget (global + shop fair share) instead of tripping the org limit.
+        reservation = None
+        if settings.LLM_GOVERNOR_ENABLED:
+            reservation = await llm_governor.acquire(shop_id, estimate_tokens(instructions, input_text))
 
-    async def generate_text(self, *, model: str, instructions: str, input_text: str) -> OpenAIResult:
         # Using Responses API.
         resp = await self._client.responses.create(
             model=model,
             instructions=instructions,
             input=input_text,
         )
-        # The OpenAI Python SDK returns usage differently depending on API/model.
-        # We keep this tolerant and default to 0 when unavailable.
-        prompt_tokens = 0
-        completion_tokens = 0
-        usage = getattr(resp, "usage", None)
-        if usage is not None:
-            # Responses API typically reports input_tokens / output_tokens.
-            prompt_tokens = int(getattr(usage, "input_tokens", 0) or 0)
-            completion_tokens = int(getattr(usage, "output_tokens", 0) or 0)
-            # Fallback names
-            if not prompt_tokens:
-                prompt_tokens = int(getattr(usage, "prompt_tokens", 0) or 0)
-            if not completion_tokens:
-                completion_tokens = int(getattr(usage, "completion_tokens", 0) or 0)
+        prompt_tokens, completion_tokens = _usage_tokens(resp)
+
+        if reservation is not None:
+            llm_governor.reconcile(reservation, prompt_tokens + completion_tokens)
 
         return OpenAIResult(
             text=(getattr(resp, "output_text", None) or "").strip(),
@@ -52,3 +114,56 @@ class OpenAIService:
             prompt_tokens=prompt_tokens,
             completion_tokens=completion_tokens,
         )
+
+    async def stream_text(
+        self,
+        *,
+        model: str,
+        instructions: str,
+        input_text: str,
+        shop_id: int | None = None,
+    ) -> AsyncIterator[str | OpenAIResult]:
+        """Stream a Responses API generation.
+
+        Yields text deltas (str) as they are produced and, last, one OpenAIResult with the
+        full text and usage.
+        """
+        reservation = None
+        if settings.LLM_GOVERNOR_ENABLED:
+            reservation = await llm_governor.acquire(shop_id, estimate_tokens(instructions, input_text))
+
+        stream = await self._client.responses.create(
+            model=model,
+            instructions=instructions,
+            input=input_text,
+            stream=True,
+        )
+        parts: list[str] = []
+        final = None
+        async for event in stream:
+            etype = getattr(event, "type", "")
+            if etype == "response.output_text.delta":
+                delta = getattr(event, "delta", "") or ""
+                if delta:
+                    parts.append(delta)
+                    yield delta
+            elif etype == "response.completed":
+                final = getattr(event, "response", None)
+            elif etype in ("response.failed", "error"):
+                err = getattr(getattr(event, "response", None), "error", None) or getattr(event, "message", None)
+                raise RuntimeError(f"OpenAI stream failed: {err}")
+
+        prompt_tokens, completion_tokens = _usage_tokens(final)
+        if reservation is not None:
+            llm_governor.reconcile(reservation, prompt_tokens + completion_tokens)
+
+        text = "".join(parts)
+        if not text and final is not None:
+            text = getattr(final, "output_text", None) or ""
+        yield OpenAIResult(
+            text=text.strip(),
+            model=model,
+            response_id=getattr(final, "id", None),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
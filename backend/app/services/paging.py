@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Generic, TypeVar
+
+from app.core.config import settings
+
+
+T = TypeVar("T")
+C = TypeVar("C")
+
+
+class Page(Generic[T, C]):
+    """One fetched page plus the cursor to request the following one.
+
+    `next_cursor=None` tells the producer that this was the last page.
+    """
+
+    __slots__ = ("items", "meta", "next_cursor")
+
+    def __init__(self, items: list[T], *, meta: Any = None, next_cursor: C | None = None):
+        self.items = items
+        self.meta = meta
+        self.next_cursor = next_cursor
+
+
+_DONE = object()
+
+
+class _ProducerError:
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+async def run_pipelined(
+    fetch: Callable[[C], Awaitable[Page[T, C] | None]],
+    consume: Callable[[Page[T, C]], Awaitable[None]],
+    *,
+    start: C,
+    depth: int | None = None,
+) -> int:
+    """Fetch pages ahead while the previous page is being persisted.
+
+    A producer task calls `fetch(cursor)` and pushes pages into a bounded queue
+    (backpressure: at most `depth` pages are buffered). The caller's task runs
+    `consume(page)` for every page in order, so all DB work stays on the caller's
+    session. Checkpoints (cursors, high-water marks) should be advanced inside
+    `consume`, i.e. only for pages that were actually stored.
+
+    `fetch` returns None (or a page with `next_cursor=None`) to stop.
+    Errors from either side cancel the other and are re-raised.
+
+    Returns number of consumed pages.
+    """
+
+    depth_eff = max(1, int(depth or settings.SYNC_PIPELINE_DEPTH or 1))
+    queue: asyncio.Queue = asyncio.Queue(maxsize=depth_eff)
+
+    async def _producer() -> None:
+        cursor = start
+        try:
+            while True:
+                page = await fetch(cursor)
+                if page is None:
+                    break
+                await queue.put(page)
+                if page.next_cursor is None:
+                    break
+                cursor = page.next_cursor
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:  # noqa: BLE001
+            await queue.put(_ProducerError(e))
+            return
+        await queue.put(_DONE)
+
+    producer = asyncio.create_task(_producer())
+    consumed = 0
+    try:
+        while True:
+            item = await queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _ProducerError):
+                raise item.exc
+            await consume(item)
+            consumed += 1
+    finally:
+        if not producer.done():
+            producer.cancel()
+        try:
+            await producer
+        except asyncio.CancelledError:
+            pass
+    return consumed
@@ -10,12 +10,40 @@ from app.core.config import settings
 from app.models.shop import Shop
 from app.models.settings import ShopSettings
 from app.repos.product_card_repo import ProductCardRepo
+from app.services.paging import Page, run_pipelined
 from app.services.wb_content_client import WBContentClient
 
 
 log = logging.getLogger(__name__)
 
 
+def _parse_dt(raw) -> datetime | None:
+    if not raw:
+        return None
+    if isinstance(raw, datetime):
+        return raw
+    try:
+        return datetime.fromisoformat(str(raw).replace("Z", "+00:00"))
+    except Exception:
+        return None
+
+
+def _parse_cursor(cursor: dict) -> tuple[datetime | None, int | None]:
+    next_updated_at = _parse_dt(cursor.get("updatedAt"))
+    next_nm_id = cursor.get("nmID")
+    if next_updated_at is None or next_nm_id is None:
+        return None, None
+    return next_updated_at, int(next_nm_id)
+
+
+def _is_end_of_scan(cursor: dict, limit: int) -> bool:
+    try:
+        total_in_cursor = int(cursor.get("total") or 0)
+    except Exception:
+        total_in_cursor = 0
+    return total_in_cursor < int(limit)
+
+
 async def sync_product_cards(
     session: AsyncSession,
     shop: Shop,
@@ -23,33 +51,61 @@ async def sync_product_cards(
     *,
     pages: int,
     limit: int,
+    mode: str = "full",
 ) -> dict:
     """Sync a portion of product cards into local DB.
 
-    We use cursor pagination and store cursor in shop_settings.
+    mode="full": cursor pagination over the whole catalogue; cursor is stored in shop_settings.
     When we reach the end (cursor.total < limit or empty list), cursor is reset to restart from beginning.
+
+    mode="delta": cards come newest-updated first, so we page from the top until we reach
+    shop_settings.cards_hwm_updated_at (max updatedAt seen so far). Only changed cards are fetched.
+    If the page cap is hit before the high-water mark, the mark is kept and a full pass is requested.
     """
 
+    hwm = getattr(shop_settings, "cards_hwm_updated_at", None)
+    if mode == "delta" and hwm is None:
+        mode = "full"
+
     token = decrypt_secret(shop.wb_token_enc)
     client = WBContentClient(token=token, locale=shop_settings.language or "ru")
     try:
         repo = ProductCardRepo(session)
         total_fetched = 0
         total_upserted = 0
+        max_updated_at: datetime | None = None
+        reached_hwm = False
+        scan_finished = False
 
         log.info(
-            "[cards-sync] start shop_id=%s pages=%s limit=%s cursor_updated_at=%s cursor_nm_id=%s",
+            "[cards-sync] start shop_id=%s mode=%s pages=%s limit=%s cursor_updated_at=%s cursor_nm_id=%s hwm=%s",
             shop.id,
+            mode,
             pages,
             limit,
             shop_settings.cards_cursor_updated_at,
             shop_settings.cards_cursor_nm_id,
+            hwm,
         )
 
-        cur_updated_at = shop_settings.cards_cursor_updated_at
-        cur_nm_id = shop_settings.cards_cursor_nm_id
+        if mode == "delta":
+            pages_eff = max(1, int(settings.CARDS_DELTA_MAX_PAGES))
+            start = (None, None, 0)
+        else:
+            pages_eff = max(1, int(pages))
+            start = (shop_settings.cards_cursor_updated_at, shop_settings.cards_cursor_nm_id, 0)
+
+        def _page_reaches_hwm(cards: list) -> bool:
+            if hwm is None:
+                return False
+            for c in cards:
+                ts = _parse_dt(c.get("updatedAt")) if isinstance(c, dict) else None
+                if ts is not None and ts <= hwm:
+                    return True
+            return False
 
-        for _ in range(max(1, int(pages))):
+        async def _fetch(cur: tuple[datetime | None, int | None, int]) -> Page | None:
+            cur_updated_at, cur_nm_id, page_no = cur
             payload = await client.cards_list(
                 cursor_updated_at=cur_updated_at,
                 cursor_nm_id=cur_nm_id,
@@ -57,10 +113,26 @@ async def sync_product_cards(
                 with_photo=-1,
                 ascending=False,
             )
-
             cards = payload.get("cards") or []
             cursor = payload.get("cursor") or {}
 
+            next_cur = None
+            if (
+                cards
+                and page_no + 1 < pages_eff
+                and not _is_end_of_scan(cursor, limit)
+                and not (mode == "delta" and _page_reaches_hwm(cards))
+            ):
+                next_updated_at, next_nm_id = _parse_cursor(cursor)
+                if next_updated_at is not None:
+                    next_cur = (next_updated_at, next_nm_id, page_no + 1)
+            return Page(cards, meta=cursor, next_cursor=next_cur)
+
+        async def _consume(page: Page) -> None:
+            nonlocal total_fetched, total_upserted, max_updated_at, reached_hwm, scan_finished
+            cards = page.items
+            cursor = page.meta or {}
+
             log.info(
                 "[cards-sync] page cards=%s cursor.total=%s cursor.updatedAt=%s cursor.nmID=%s",
                 len(cards),
@@ -70,18 +142,28 @@ async def sync_product_cards(
             )
 
             if not cards:
-                # nothing returned -> reset cursor and stop
-                log.warning(
-                    "[cards-sync] empty page -> reset cursor shop_id=%s",
-                    shop.id,
-                )
-                shop_settings.cards_cursor_updated_at = None
-                shop_settings.cards_cursor_nm_id = None
-                break
+                scan_finished = True
+                if mode == "full":
+                    # nothing returned -> reset cursor and stop
+                    log.warning(
+                        "[cards-sync] empty page -> reset cursor shop_id=%s",
+                        shop.id,
+                    )
+                    shop_settings.cards_cursor_updated_at = None
+                    shop_settings.cards_cursor_nm_id = None
+                return
 
             now = datetime.now(timezone.utc)
             missing_thumb = 0
             for c in cards:
+                ts = _parse_dt(c.get("updatedAt"))
+                if ts is not None and (max_updated_at is None or ts > max_updated_at):
+                    max_updated_at = ts
+                if mode == "delta" and hwm is not None and ts is not None and ts <= hwm:
+                    reached_hwm = True
+                    if ts < hwm:
+                        # unchanged since the last pass
+                        continue
                 obj = await repo.upsert_from_wb(shop_id=shop.id, card=c, synced_at=now)
                 if obj.thumb_url is None:
                     missing_thumb += 1
@@ -96,23 +178,17 @@ async def sync_product_cards(
                     shop.id,
                 )
 
-            # advance cursor
-            next_updated_at_raw = cursor.get("updatedAt")
-            next_nm_id = cursor.get("nmID")
-            if next_updated_at_raw and next_nm_id is not None:
-                try:
-                    next_updated_at = (
-                        next_updated_at_raw
-                        if isinstance(next_updated_at_raw, datetime)
-                        else datetime.fromisoformat(str(next_updated_at_raw).replace("Z", "+00:00"))
-                    )
-                except Exception:
-                    next_updated_at = None
-                if next_updated_at is not None:
-                    cur_updated_at = next_updated_at
-                    cur_nm_id = int(next_nm_id)
-                    shop_settings.cards_cursor_updated_at = cur_updated_at
-                    shop_settings.cards_cursor_nm_id = cur_nm_id
+            if _is_end_of_scan(cursor, limit):
+                scan_finished = True
+
+            if mode == "delta":
+                return
+
+            # advance cursor (checkpoint only after the page is stored)
+            next_updated_at, next_nm_id = _parse_cursor(cursor)
+            if next_updated_at is not None:
+                shop_settings.cards_cursor_updated_at = next_updated_at
+                shop_settings.cards_cursor_nm_id = next_nm_id
 
             if settings.DEBUG_PRODUCT_CARDS:
                 log.info(
@@ -122,39 +198,64 @@ async def sync_product_cards(
                 )
 
             # end condition per docs: when cursor.total < limit
-            try:
-                total_in_cursor = int(cursor.get("total") or 0)
-            except Exception:
-                total_in_cursor = 0
-            if total_in_cursor < int(limit):
+            if _is_end_of_scan(cursor, limit):
                 # finished full scan; reset cursor to start next cycle
                 log.info(
                     "[cards-sync] end of scan (cursor.total=%s < limit=%s) -> reset cursor shop_id=%s",
-                    total_in_cursor,
+                    cursor.get("total"),
                     limit,
                     shop.id,
                 )
                 shop_settings.cards_cursor_updated_at = None
                 shop_settings.cards_cursor_nm_id = None
-                break
 
-        shop_settings.last_cards_sync_at = datetime.now(timezone.utc)
+        # A full pass starting from the top sees the newest cards first, so it may move the mark too.
+        full_from_top = mode == "full" and shop_settings.cards_cursor_updated_at is None
+
+        await run_pipelined(_fetch, _consume, start=start)
+
+        now = datetime.now(timezone.utc)
+        if mode == "delta":
+            if reached_hwm or scan_finished:
+                if max_updated_at is not None and max_updated_at > hwm:
+                    shop_settings.cards_hwm_updated_at = max_updated_at
+            else:
+                # Too many changes for one delta run: keep the mark and fall back to a full pass.
+                log.warning(
+                    "[cards-sync] delta did not reach hwm within %s pages -> full reconcile requested shop_id=%s",
+                    pages_eff,
+                    shop.id,
+                )
+                shop_settings.last_cards_full_sync_at = None
+        else:
+            if full_from_top and max_updated_at is not None:
+                prev = getattr(shop_settings, "cards_hwm_updated_at", None)
+                if prev is None or max_updated_at > prev:
+                    shop_settings.cards_hwm_updated_at = max_updated_at
+            if scan_finished:
+                shop_settings.last_cards_full_sync_at = now
+
+        shop_settings.last_cards_sync_at = now
         await session.flush()
 
         log.info(
-            "[cards-sync] done shop_id=%s fetched=%s upserted=%s next_cursor_updated_at=%s next_cursor_nm_id=%s",
+            "[cards-sync] done shop_id=%s mode=%s fetched=%s upserted=%s next_cursor_updated_at=%s next_cursor_nm_id=%s hwm=%s",
             shop.id,
+            mode,
             total_fetched,
             total_upserted,
             shop_settings.cards_cursor_updated_at,
             shop_settings.cards_cursor_nm_id,
+            shop_settings.cards_hwm_updated_at,
         )
 
         return {
+            "mode": mode,
             "fetched": total_fetched,
             "upserted": total_upserted,
             "cursor_updated_at": shop_settings.cards_cursor_updated_at.isoformat() if shop_settings.cards_cursor_updated_at else None,
             "cursor_nm_id": shop_settings.cards_cursor_nm_id,
+            "hwm_updated_at": shop_settings.cards_hwm_updated_at.isoformat() if shop_settings.cards_hwm_updated_at else None,
         }
     finally:
         await client.aclose()
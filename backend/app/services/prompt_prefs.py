@@ -197,6 +197,7 @@ def pick_signature(
     *,
     kind: str,
     brand: str | None = None,
+    rng: random.Random | None = None,
 ) -> str | None:
 
     pool = s.signatures or []
@@ -227,5 +228,5 @@ def pick_signature(
                 candidates.append(text.strip())
 
     if candidates:
-        return random.choice(candidates)
+        return (rng or random).choice(candidates)
     return s.signature
@@ -6,6 +6,7 @@ from typing import Any
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repos.prompt_repo import PromptRepo
+from app.repos.system_flags_repo import SystemFlagsRepo
 from app.repos.tone_repo import ToneRepo
 
 
@@ -152,7 +153,36 @@ class PromptBundle:
         }
 
 
+# Process-wide cache: (version, bundle). Rebuilt only when system_flags.prompt_bundle_version changes.
+_bundle_cache: tuple[int, PromptBundle] | None = None
+
+# session.info flag: this transaction bumped the version; do not cache what it reads (it may roll back).
+_DIRTY_KEY = "prompt_bundle_dirty"
+
+
+async def bump_bundle_version(session: AsyncSession) -> int:
+    """Call after any change to global prompt records or tones (committed together with the change)."""
+    global _bundle_cache
+    version = await SystemFlagsRepo(session).bump_prompt_bundle_version()
+    session.info[_DIRTY_KEY] = True
+    _bundle_cache = None
+    return version
+
+
 async def get_global_bundle(session: AsyncSession) -> PromptBundle:
+    global _bundle_cache
+    version = await SystemFlagsRepo(session).prompt_bundle_version()
+    cached = _bundle_cache
+    if cached is not None and cached[0] == version and not session.info.get(_DIRTY_KEY):
+        return cached[1]
+
+    bundle = await _load_global_bundle(session)
+    if not session.info.get(_DIRTY_KEY):
+        _bundle_cache = (version, bundle)
+    return bundle
+
+
+async def _load_global_bundle(session: AsyncSession) -> PromptBundle:
     repo = PromptRepo(session)
 
     def _text(key: str, default: str) -> str:
@@ -245,6 +275,7 @@ async def set_global_bundle(session: AsyncSession, payload: dict) -> PromptBundl
         await repo.set_json(scope="global", key="emoji_rule_map", value_json=payload.get("emoji_rule_map"))
 
     await session.flush()
+    await bump_bundle_version(session)
     return await get_global_bundle(session)
 
 
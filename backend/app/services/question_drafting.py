@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import re
+from typing import AsyncIterator
 
 from app.models.question import Question
 from app.models.settings import ShopSettings
-from app.services.openai_client import OpenAIService
+from app.services.openai_client import OpenAIResult, OpenAIService
 from app.core.config import settings
 from app.services.prompt_prefs import load_prompt_prefs, tone_instruction, pick_signature
 from app.services.prompt_store import PromptBundle, render_template, DEFAULT_QUESTION_INSTRUCTIONS_TEMPLATE
@@ -115,21 +116,43 @@ async def generate_question_draft_text(
     shop_settings: ShopSettings,
     bundle: PromptBundle | None = None,
 ) -> tuple[str, str, str | None, int, int]:
-    pd = question.product_details or {}
-    brand = pd.get("brandName")
-    brand = brand.strip() if isinstance(brand, str) and brand.strip() else None
-
-    instructions = build_instructions(shop_settings, bundle=bundle, brand=brand)
-    input_text = build_input(question, shop_settings, bundle=bundle)
+    instructions, input_text = _question_prompt(question, shop_settings, bundle)
 
     res = await openai.generate_text(
         model=settings.OPENAI_MODEL,
         instructions=instructions,
         input_text=input_text,
+        shop_id=getattr(shop_settings, "shop_id", None),
     )
     return sanitize_output(res.text), res.model, res.response_id, int(res.prompt_tokens), int(res.completion_tokens)
 
 
+async def stream_question_draft_text(
+    openai: OpenAIService,
+    question: Question,
+    shop_settings: ShopSettings,
+    bundle: PromptBundle | None = None,
+) -> AsyncIterator[str | OpenAIResult]:
+    instructions, input_text = _question_prompt(question, shop_settings, bundle)
+    async for item in openai.stream_text(
+        model=settings.OPENAI_MODEL,
+        instructions=instructions,
+        input_text=input_text,
+        shop_id=getattr(shop_settings, "shop_id", None),
+    ):
+        yield item
+
+
+def _question_prompt(question: Question, shop_settings: ShopSettings, bundle: PromptBundle | None) -> tuple[str, str]:
+    pd = question.product_details or {}
+    brand = pd.get("brandName")
+    brand = brand.strip() if isinstance(brand, str) and brand.strip() else None
+
+    instructions = build_instructions(shop_settings, bundle=bundle, brand=brand)
+    input_text = build_input(question, shop_settings, bundle=bundle)
+    return instructions, input_text
+
+
 # Backward-compatible alias (older routes/services used this name)
 async def generate_question_draft(
     openai: OpenAIService,
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import re
+from typing import AsyncIterator, Awaitable, Callable
+
+import anyio
+
+from app.core.db import AsyncSessionMaker
+from app.repos.shop_billing_repo import ShopBillingRepo
+from app.services.openai_client import OpenAIResult
+
+
+log = logging.getLogger(__name__)
+
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+_PHONE_TAIL_RE = re.compile(r"[\d\s\-()+]*$")
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+class IncrementalSanitizer:
+    """Apply a whole-text sanitizer (URL/phone stripping, length cap) to a growing stream.
+
+    Only the part of the buffer that ends at a whitespace at least HOLD_CHARS before the tail
+    is sanitized and emitted, so a phone number or URL split across deltas is normally seen
+    whole. If a later pass changes already emitted text, a "replace" event carries the full text.
+    """
+
+    HOLD_CHARS = 32
+
+    def __init__(self, sanitize: Callable[[str], str]):
+        self.sanitize = sanitize
+        self.raw = ""
+        self.sent = ""
+
+    def feed(self, delta: str) -> tuple[str, str] | None:
+        self.raw += delta
+        cut = len(self.raw) - self.HOLD_CHARS
+        if cut <= 0:
+            return None
+        ws = max(self.raw.rfind(" ", 0, cut), self.raw.rfind("\n", 0, cut))
+        # Never cut inside something that may still grow into a phone number.
+        ws = _PHONE_TAIL_RE.search(self.raw, 0, ws).start() if ws > 0 else ws
+        if ws <= 0:
+            return None
+        stable = self.sanitize(self.raw[:ws])
+        if stable.startswith(self.sent):
+            tail = stable[len(self.sent):]
+            self.sent = stable
+            return ("delta", tail) if tail else None
+        self.sent = stable
+        return ("replace", stable)
+
+
+async def sse_generation(
+    chunks: AsyncIterator[str | OpenAIResult],
+    *,
+    sanitize: Callable[[str], str],
+    on_complete: Callable[[str, OpenAIResult], Awaitable[dict]],
+    on_error: Callable[[BaseException], Awaitable[None]],
+) -> AsyncIterator[str]:
+    """Turn a generation stream into SSE: `delta`/`replace` while generating, then `done` or `error`.
+
+    on_complete persists the sanitized final text (its dict is merged into the `done` payload);
+    on_error runs on failures and client disconnects (e.g. to refund credits) until on_complete
+    has succeeded - a disconnect while sending `done` leaves the saved result charged.
+    On disconnect the response task is being cancelled, so on_error runs in a shielded scope.
+    """
+    san = IncrementalSanitizer(sanitize)
+    completed = False
+    try:
+        async for item in chunks:
+            if isinstance(item, OpenAIResult):
+                text = sanitize(item.text)
+                extra = await on_complete(text, item)
+                completed = True
+                yield sse_event("done", {"text": text, "model": item.model, **(extra or {})})
+                return
+            ev = san.feed(item)
+            if ev is not None:
+                yield sse_event(ev[0], {"text": ev[1]})
+        raise RuntimeError("Generation stream ended without a result")
+    except (asyncio.CancelledError, GeneratorExit) as e:
+        log.info("[sse] client disconnected %s", "after completion" if completed else "during generation")
+        if not completed:
+            with anyio.CancelScope(shield=True):
+                await on_error(e)
+        raise
+    except Exception as e:
+        log.warning("[sse] generation failed: %s", e)
+        if not completed:
+            await on_error(e)
+        yield sse_event("error", {"detail": f"{type(e).__name__}: {e}"})
+
+
+async def refund_credits(shop_id: int, *, amount: int, reason: str, meta: dict) -> None:
+    """Refund a streaming request's charge; the request session is already committed/closed by then."""
+    if amount <= 0:
+        return
+    async with AsyncSessionMaker() as s:
+        async with s.begin():
+            await ShopBillingRepo(s).apply_credits(shop_id, delta=amount, reason=reason, meta=meta)
@@ -10,9 +10,42 @@ from app.models.shop import Shop
 from app.models.settings import ShopSettings
 from app.repos.feedback_repo import FeedbackRepo
 from app.repos.question_repo import QuestionRepo
+from app.repos.shop_data_version_repo import ShopDataVersionRepo
+from app.services.paging import Page, run_pipelined
 from app.services.wb_client import WBClient
 
 
+def _skip_pager(
+    list_page,
+    items_key: str,
+    *,
+    take: int,
+    max_total: int,
+):
+    """Build a fetch callback for WB skip/take lists (feedbacks, questions).
+
+    Cursor is (skip, fetched_so_far). Stops on an empty/short page or when max_total is reached.
+    """
+
+    async def _fetch(cursor: tuple[int, int]) -> Page | None:
+        skip_cur, fetched = cursor
+        remaining = max_total - fetched
+        if remaining <= 0:
+            return None
+        page_take = min(int(take or 1), remaining)
+
+        payload = await list_page(take=page_take, skip=skip_cur)
+        data = payload.get("data") or {}
+        items = data.get(items_key) or []
+
+        next_cursor = None
+        if items and len(items) >= page_take:
+            next_cursor = (skip_cur + page_take, fetched + len(items))
+        return Page(items, meta=data, next_cursor=next_cursor)
+
+    return _fetch
+
+
 async def sync_feedbacks(
     session: AsyncSession,
     shop: Shop,
@@ -35,49 +68,51 @@ async def sync_feedbacks(
 
     total_fetched = 0
     total_upserted = 0
-    skip_cur = int(skip or 0)
 
     # Track newest createdDate we actually saw.
+    # Answered and unanswered lists keep separate cursors: an answered review
+    # must not push the unanswered cursor past reviews still waiting for a reply.
+    cursor_field = "last_answered_feedback_created_at" if is_answered else "last_feedback_created_at"
     max_created_at: datetime | None = None
-    existing_cursor = getattr(shop_settings, "last_feedback_created_at", None)
+    existing_cursor = getattr(shop_settings, cursor_field, None)
     if isinstance(existing_cursor, datetime):
         max_created_at = existing_cursor
+    prev_cursor = max_created_at
+    total_new = 0
 
     last_data: dict = {}
+
+    async def _list_page(*, take: int, skip: int) -> dict:
+        return await wb.feedbacks_list(
+            is_answered=is_answered,
+            take=take,
+            skip=skip,
+            order=order,
+            date_from=date_from_unix,
+            date_to=date_to_unix,
+        )
+
+    async def _consume(page: Page) -> None:
+        nonlocal last_data, total_fetched, total_upserted, max_created_at, total_new
+        last_data = page.meta or {}
+        for fb_payload in page.items:
+            fb = await repo.upsert_from_wb(shop_id=shop.id, payload=fb_payload)
+            total_upserted += 1
+            try:
+                if prev_cursor is None or fb.created_date > prev_cursor:
+                    total_new += 1
+                if max_created_at is None or fb.created_date > max_created_at:
+                    max_created_at = fb.created_date
+            except Exception:
+                pass
+        total_fetched += len(page.items)
+
     try:
-        while total_fetched < max_total_eff:
-            page_take = int(take or 1)
-            remaining = max_total_eff - total_fetched
-            if page_take > remaining:
-                page_take = remaining
-
-            payload = await wb.feedbacks_list(
-                is_answered=is_answered,
-                take=page_take,
-                skip=skip_cur,
-                order=order,
-                date_from=date_from_unix,
-                date_to=date_to_unix,
-            )
-            data = payload.get("data") or {}
-            last_data = data
-            feedbacks = data.get("feedbacks") or []
-            if not feedbacks:
-                break
-
-            for fb_payload in feedbacks:
-                fb = await repo.upsert_from_wb(shop_id=shop.id, payload=fb_payload)
-                total_upserted += 1
-                try:
-                    if max_created_at is None or fb.created_date > max_created_at:
-                        max_created_at = fb.created_date
-                except Exception:
-                    pass
-
-            total_fetched += len(feedbacks)
-            if len(feedbacks) < page_take:
-                break
-            skip_cur += page_take
+        await run_pipelined(
+            _skip_pager(_list_page, "feedbacks", take=take, max_total=max_total_eff),
+            _consume,
+            start=(int(skip or 0), 0),
+        )
     finally:
         await wb.aclose()
 
@@ -87,12 +122,14 @@ async def sync_feedbacks(
     # Only move cursor forward.
     try:
         if max_created_at is not None:
-            prev = getattr(shop_settings, "last_feedback_created_at", None)
+            prev = getattr(shop_settings, cursor_field, None)
             if prev is None or (isinstance(prev, datetime) and max_created_at > prev):
-                shop_settings.last_feedback_created_at = max_created_at
+                setattr(shop_settings, cursor_field, max_created_at)
     except Exception:
         pass
 
+    if total_upserted:
+        await ShopDataVersionRepo(session).bump(shop.id)
     await session.flush()
 
     return {
@@ -100,6 +137,7 @@ async def sync_feedbacks(
         "count_archive": last_data.get("countArchive"),
         "fetched": total_fetched,
         "upserted": total_upserted,
+        "new": total_new,
         "cursor_at": max_created_at.isoformat() if isinstance(max_created_at, datetime) else None,
     }
 
@@ -125,40 +163,43 @@ async def sync_questions(
     repo = QuestionRepo(session)
     total_fetched = 0
     total_upserted = 0
-    skip_cur = int(skip or 0)
+    total_new = 0
+    # Questions have no createdDate cursor; "new" = created since the previous questions sync.
+    prev_sync_at = getattr(shop_settings, "last_questions_sync_at", None)
     last_data: dict = {}
+
+    async def _list_page(*, take: int, skip: int) -> dict:
+        return await wb.questions_list(
+            is_answered=is_answered,
+            take=take,
+            skip=skip,
+            order=order,
+            date_from=date_from_unix,
+            date_to=date_to_unix,
+        )
+
+    async def _consume(page: Page) -> None:
+        nonlocal last_data, total_fetched, total_upserted, total_new
+        last_data = page.meta or {}
+        for q_payload in page.items:
+            q = await repo.upsert_from_wb(shop_id=shop.id, payload=q_payload)
+            total_upserted += 1
+            if prev_sync_at is None or q.created_date > prev_sync_at:
+                total_new += 1
+        total_fetched += len(page.items)
+
     try:
-        while total_fetched < max_total_eff:
-            page_take = int(take or 1)
-            remaining = max_total_eff - total_fetched
-            if page_take > remaining:
-                page_take = remaining
-
-            payload = await wb.questions_list(
-                is_answered=is_answered,
-                take=page_take,
-                skip=skip_cur,
-                order=order,
-                date_from=date_from_unix,
-                date_to=date_to_unix,
-            )
-            data = payload.get("data") or {}
-            last_data = data
-            questions = data.get("questions") or []
-            if not questions:
-                break
-
-            for q_payload in questions:
-                await repo.upsert_from_wb(shop_id=shop.id, payload=q_payload)
-                total_upserted += 1
-            total_fetched += len(questions)
-            if len(questions) < page_take:
-                break
-            skip_cur += page_take
+        await run_pipelined(
+            _skip_pager(_list_page, "questions", take=take, max_total=max_total_eff),
+            _consume,
+            start=(int(skip or 0), 0),
+        )
     finally:
         await wb.aclose()
 
     shop_settings.last_questions_sync_at = datetime.now(timezone.utc)
+    if total_upserted:
+        await ShopDataVersionRepo(session).bump(shop.id)
     await session.flush()
 
     return {
@@ -166,4 +207,5 @@ async def sync_questions(
         "count_archive": last_data.get("countArchive"),
         "fetched": total_fetched,
         "upserted": total_upserted,
+        "new": total_new,
     }
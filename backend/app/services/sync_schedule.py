@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone, timedelta
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.sync_schedule import SyncSchedule
+from app.repos.sync_schedule_repo import SyncScheduleRepo
+
+
+log = logging.getLogger(__name__)
+
+
+def compute_interval_min(rate_per_hour: float) -> int:
+    """Interval that yields ~ADAPTIVE_SYNC_TARGET_ITEMS new items per sync, within bounds."""
+    lo = max(1, int(settings.ADAPTIVE_SYNC_MIN_INTERVAL_MIN))
+    hi = max(lo, int(settings.ADAPTIVE_SYNC_MAX_INTERVAL_MIN))
+    if rate_per_hour <= 0:
+        return hi
+    minutes = float(settings.ADAPTIVE_SYNC_TARGET_ITEMS) / rate_per_hour * 60.0
+    return int(max(lo, min(hi, minutes)))
+
+
+async def observe_sync(session: AsyncSession, shop_id: int, stream: str, *, new_items: int) -> None:
+    """Fold a sync result into the shop's arrival-rate estimate and move next_due_at."""
+    if not settings.ADAPTIVE_SYNC_ENABLED:
+        return
+
+    repo = SyncScheduleRepo(session)
+    row = await repo.get(shop_id, stream, for_update=True)
+    now = datetime.now(timezone.utc)
+    if row is None:
+        row = SyncSchedule(shop_id=shop_id, stream=stream, next_due_at=now, rate_per_hour=0.0)
+        session.add(row)
+
+    new_items = max(0, int(new_items or 0))
+    if row.last_observed_at is not None:
+        hours = max((now - row.last_observed_at).total_seconds() / 3600.0, 1.0 / 60.0)
+        observed = new_items / hours
+        alpha = float(settings.ADAPTIVE_SYNC_EWMA_ALPHA)
+        row.rate_per_hour = alpha * observed + (1.0 - alpha) * float(row.rate_per_hour or 0.0)
+    # First observation only sets the baseline: its window (e.g. the whole history) says nothing about rate.
+
+    row.interval_min = compute_interval_min(float(row.rate_per_hour or 0.0))
+    row.last_observed_at = now
+    row.last_new_items = new_items
+    row.next_due_at = now + timedelta(minutes=row.interval_min)
+    await session.flush()
+
+    log.info(
+        "[sync-schedule] shop_id=%s stream=%s new=%s rate=%.2f/h -> every %smin",
+        shop_id,
+        stream,
+        new_items,
+        row.rate_per_hour,
+        row.interval_min,
+    )
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import random
+import re
+
+from app.core.config import settings
+from app.models.feedback import Feedback
+from app.models.settings import ShopSettings
+from app.services.drafting import _bucket_by_rating, sanitize_output
+from app.services.prompt_prefs import load_prompt_prefs, pick_signature
+from app.services.prompt_store import render_template
+
+
+# Stored as Draft.openai_model for drafts produced without the LLM.
+TEMPLATE_MODEL = "template"
+
+
+# bucket -> style -> [(polite "вы" form, informal "ты" form)]
+_VARIATIONS: dict[str, dict[str, list[tuple[str, str]]]] = {
+    "positive": {
+        "warm": [
+            ("Спасибо за высокую оценку! Очень рады, что вам понравилось.", "Спасибо за высокую оценку! Очень рады, что тебе понравилось."),
+            ("Благодарим за отзыв! Приятно, что покупка вас порадовала.", "Благодарим за отзыв! Приятно, что покупка тебя порадовала."),
+            ("Спасибо, что выбрали нас! Ждём вас снова.", "Спасибо, что выбрал(а) нас! Ждём тебя снова."),
+            ("Огромное спасибо за оценку! Будем рады видеть вас среди наших покупателей и дальше.", "Огромное спасибо за оценку! Будем рады видеть тебя среди наших покупателей и дальше."),
+            ("Спасибо за отличную оценку! Приятных вам покупок.", "Спасибо за отличную оценку! Приятных тебе покупок."),
+        ],
+        "formal": [
+            ("Благодарим за высокую оценку нашего товара.", "Благодарим за высокую оценку нашего товара."),
+            ("Спасибо за выбор нашего магазина. Ценим ваше доверие.", "Спасибо за выбор нашего магазина. Ценим твоё доверие."),
+            ("Благодарим за обратную связь. Рады, что товар соответствует вашим ожиданиям.", "Благодарим за обратную связь. Рады, что товар соответствует твоим ожиданиям."),
+        ],
+    },
+    "neutral": {
+        "warm": [
+            ("Спасибо за оценку! Будем рады, если вы расскажете, что нам стоит улучшить.", "Спасибо за оценку! Будем рады, если ты расскажешь, что нам стоит улучшить."),
+            ("Благодарим за отзыв! Постараемся, чтобы следующая покупка порадовала вас ещё больше.", "Благодарим за отзыв! Постараемся, чтобы следующая покупка порадовала тебя ещё больше."),
+        ],
+        "formal": [
+            ("Благодарим за оценку. Мы учтём её в работе над качеством.", "Благодарим за оценку. Мы учтём её в работе над качеством."),
+            ("Спасибо за обратную связь. Если у вас есть замечания, мы будем признательны за подробности.", "Спасибо за обратную связь. Если у тебя есть замечания, мы будем признательны за подробности."),
+        ],
+    },
+    "negative": {
+        "warm": [
+            ("Нам очень жаль, что покупка вас не порадовала. Напишите нам, пожалуйста, что пошло не так, — мы постараемся помочь.", "Нам очень жаль, что покупка тебя не порадовала. Напиши нам, пожалуйста, что пошло не так, — мы постараемся помочь."),
+            ("Спасибо за оценку. Жаль, что товар не оправдал ваших ожиданий, — расскажите подробнее, и мы разберёмся.", "Спасибо за оценку. Жаль, что товар не оправдал твоих ожиданий, — расскажи подробнее, и мы разберёмся."),
+        ],
+        "formal": [
+            ("Приносим извинения за доставленные неудобства. Просим описать проблему подробнее, чтобы мы могли её решить.", "Приносим извинения за доставленные неудобства. Просим описать проблему подробнее, чтобы мы могли её решить."),
+            ("Благодарим за оценку. Сожалеем, что товар не оправдал ожиданий; мы проверим качество партии.", "Благодарим за оценку. Сожалеем, что товар не оправдал ожиданий; мы проверим качество партии."),
+        ],
+    },
+}
+
+_MEDIA_THANKS = [
+    ("Отдельное спасибо за фото!", "Отдельное спасибо за фото!"),
+    ("Спасибо, что поделились фотографиями.", "Спасибо, что поделился(ась) фотографиями."),
+]
+
+_EMOJI = {"positive": ["😊", "🙏", "❤️", "✨"], "neutral": ["🙏"], "negative": []}
+
+_FORMAL_TONES = {"business", "деловая", "serious", "серьёзная", "серьезная", "respectful", "уважительная", "scientific", "научная"}
+
+_VY_CAPS_RE = re.compile(r"\b(вы|вас|вам|вами|ваш|ваша|ваше|ваши|вашего|вашей|вашим|вашими|ваших|вашему|вашу)\b")
+
+
+def _fast_path_cfg(shop_settings: ShopSettings) -> tuple[bool, int]:
+    """Global defaults, overridable per shop via config["template_fast_path"] = {"enabled", "min_rating"}."""
+    enabled = bool(settings.TEMPLATE_FASTPATH_ENABLED)
+    min_rating = int(settings.TEMPLATE_FASTPATH_MIN_RATING)
+
+    cfg = shop_settings.config if isinstance(shop_settings.config, dict) else {}
+    tp = cfg.get("template_fast_path")
+    if isinstance(tp, dict):
+        if isinstance(tp.get("enabled"), bool):
+            enabled = tp["enabled"]
+        if isinstance(tp.get("min_rating"), int):
+            min_rating = tp["min_rating"]
+    return enabled, min_rating
+
+
+def template_fast_path_applies(feedback: Feedback, shop_settings: ShopSettings) -> bool:
+    """True for rating-only reviews (no text/pros/cons) at or above the configured rating."""
+    enabled, min_rating = _fast_path_cfg(shop_settings)
+    if not enabled:
+        return False
+    if feedback.product_valuation is None or int(feedback.product_valuation) < min_rating:
+        return False
+    for part in (feedback.text, feedback.pros, feedback.cons):
+        if isinstance(part, str) and part.strip():
+            return False
+    return True
+
+
+def _shop_template(shop_settings: ShopSettings, bucket: str) -> str | None:
+    raw = (shop_settings.templates or {}).get(bucket)
+    if isinstance(raw, list):
+        raw = [x for x in raw if isinstance(x, str) and x.strip()]
+        raw = random.choice(raw) if raw else None
+    return raw.strip() if isinstance(raw, str) and raw.strip() else None
+
+
+def generate_template_draft(feedback: Feedback, shop_settings: ShopSettings) -> str:
+    """Build a reply without the LLM from shop templates, tone, address format and signatures."""
+    prefs = load_prompt_prefs(shop_settings)
+    bucket = _bucket_by_rating(feedback.product_valuation)
+    informal = prefs.address_format == "ty"
+    idx = 1 if informal else 0
+
+    pd = feedback.product_details or {}
+    brand = pd.get("brandName")
+    brand = brand.strip() if isinstance(brand, str) and brand.strip() else None
+    product = pd.get("productName") if prefs.mention_product_name else None
+    buyer_name = (feedback.user_name or "").strip() if prefs.use_buyer_name else ""
+
+    body = _shop_template(shop_settings, bucket)
+    if body:
+        body = render_template(body, {"name": buyer_name, "product": product or "", "brand": brand or ""})
+    else:
+        tone_key = {
+            "positive": prefs.tone_positive,
+            "neutral": prefs.tone_neutral,
+            "negative": prefs.tone_negative,
+        }.get(bucket, "none")
+        styles = _VARIATIONS[bucket]
+        if (tone_key or "").strip().lower() in _FORMAL_TONES:
+            pool = styles["formal"]
+        elif (tone_key or "").strip().lower() in ("", "none"):
+            pool = styles["warm"] + styles["formal"]
+        else:
+            pool = styles["warm"]
+        body = random.choice(pool)[idx]
+
+    parts: list[str] = []
+    if buyer_name:
+        parts.append(f"{'Привет' if informal else 'Здравствуйте'}, {buyer_name}!")
+    parts.append(body)
+    if prefs.photo_reaction_enabled and (feedback.photo_links or feedback.video):
+        parts.append(random.choice(_MEDIA_THANKS)[idx])
+    if prefs.emoji_enabled and _EMOJI[bucket]:
+        parts[-1] = f"{parts[-1]} {random.choice(_EMOJI[bucket])}"
+
+    text = " ".join(parts)
+    if prefs.address_format == "vy_caps":
+        text = _VY_CAPS_RE.sub(lambda m: m.group(1).capitalize(), text)
+
+    sig = pick_signature(shop_settings, kind="review", brand=brand)
+    if sig:
+        text = f"{text}\n\n{sig}"
+    return sanitize_output(text)
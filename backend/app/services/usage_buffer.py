@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.core.config import settings
+from app.core.db import AsyncSessionMaker
+from app.models.gpt_usage import GptUsage
+from app.repos.gpt_usage_rollup_repo import GptUsageRollupRepo
+
+
+log = logging.getLogger(__name__)
+
+_ROLLUP_COLUMNS = (
+    GptUsage.shop_id,
+    GptUsage.model,
+    GptUsage.operation_type,
+    GptUsage.prompt_tokens,
+    GptUsage.completion_tokens,
+    GptUsage.cost_usd,
+    GptUsage.cost_rub,
+    GptUsage.created_at,
+)
+
+
+class GptUsageBuffer:
+    """In-process buffer of gpt_usage rows, bulk-inserted every few seconds or every N rows.
+
+    Rows are written in their own transaction together with the gpt_usage_daily increments
+    (the tokens are spent even if the caller's transaction rolls back). A failed flush keeps the rows for the next attempt; the partial
+    unique index on response_id makes re-inserts no-ops, so delivery is at-least-once
+    without double counting.
+    """
+
+    def __init__(self, *, interval_sec: float, max_rows: int, max_pending: int):
+        self.interval_sec = max(0.1, float(interval_sec))
+        self.max_rows = max(1, int(max_rows))
+        self.max_pending = max(self.max_rows, int(max_pending))
+        self._rows: list[dict] = []
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._flush_task: asyncio.Task | None = None
+        self._last_flush = time.monotonic()
+
+        # metrics
+        self.flushed_rows = 0
+        self.flush_errors = 0
+        self.dropped_rows = 0
+
+    def add(self, row: dict) -> None:
+        self._rows.append(row)
+        if len(self._rows) > self.max_pending:
+            # DB has been unreachable for long; keep memory bounded.
+            drop = len(self._rows) - self.max_pending
+            del self._rows[:drop]
+            self.dropped_rows += drop
+            log.error("[gpt-usage] buffer overflow, dropped %s rows", drop)
+        self._ensure_task()
+        if len(self._rows) >= self.max_rows and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    def _ensure_task(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_sec)
+            await self.flush()
+
+    async def flush(self) -> int:
+        async with self._lock:
+            if not self._rows:
+                return 0
+            rows, self._rows = self._rows, []
+            written = False
+            try:
+                async with AsyncSessionMaker() as s:
+                    async with s.begin():
+                        inserted: list[dict] = []
+                        for i in range(0, len(rows), self.max_rows):
+                            res = await s.execute(
+                                pg_insert(GptUsage)
+                                .values(rows[i : i + self.max_rows])
+                                .on_conflict_do_nothing(
+                                    index_elements=[GptUsage.response_id],
+                                    index_where=GptUsage.response_id.isnot(None),
+                                )
+                                .returning(*_ROLLUP_COLUMNS)
+                            )
+                            inserted.extend(dict(r._mapping) for r in res)
+                        # Only rows that were really inserted count, so retries never double the rollup.
+                        await GptUsageRollupRepo(s).add_rows(inserted)
+                written = True
+            except Exception as e:
+                self.flush_errors += 1
+                log.warning("[gpt-usage] flush of %s rows failed, will retry: %s", len(rows), e)
+                return 0
+            finally:
+                # Also on cancellation: the rows go back to the buffer instead of being lost.
+                if not written:
+                    self._rows[:0] = rows
+            self.flushed_rows += len(rows)
+            self._last_flush = time.monotonic()
+            return len(rows)
+
+    async def close(self) -> None:
+        """Stop the periodic flusher and write out everything still buffered (shutdown hook).
+
+        The loop is cancelled while holding the lock, so an in-flight flush finishes first.
+        """
+        if self._task is not None:
+            async with self._lock:
+                self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flush_task is not None:
+            try:
+                await self._flush_task
+            except Exception as e:
+                log.warning("[gpt-usage] pending flush failed on shutdown: %s", e)
+            self._flush_task = None
+        await self.flush()
+        if self._rows:
+            log.error("[gpt-usage] %s rows could not be written on shutdown", len(self._rows))
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": bool(settings.GPT_USAGE_BUFFER_ENABLED),
+            "pending": len(self._rows),
+            "flushed_rows": self.flushed_rows,
+            "flush_errors": self.flush_errors,
+            "dropped_rows": self.dropped_rows,
+            "last_flush_age_sec": round(time.monotonic() - self._last_flush, 1),
+        }
+
+
+gpt_usage_buffer = GptUsageBuffer(
+    interval_sec=settings.GPT_USAGE_FLUSH_INTERVAL_SEC,
+    max_rows=settings.GPT_USAGE_FLUSH_MAX_ROWS,
+    max_pending=settings.GPT_USAGE_BUFFER_MAX_PENDING,
+)
+
+
+async def close_usage_buffer() -> None:
+    await gpt_usage_buffer.close()
@@ -17,7 +17,9 @@ from sqlalchemy import text
 from app.core.config import settings
 from app.core.db import AsyncSessionMaker, engine
 from app.repos.job_repo import JobRepo
-from app.worker.tasks import handle_job
+from app.services.openai_client import close_openai_client
+from app.services.usage_buffer import close_usage_buffer
+from app.worker.tasks import handle_job, run_deferred
 from app.worker.scheduler import scheduler_tick
 
 
@@ -42,8 +44,9 @@ async def _worker_tick() -> None:
             try:
                 async with AsyncSessionMaker() as s2:
                     async with s2.begin():
-                        await handle_job(s2, job.type, job.payload)
+                        await handle_job(s2, job.type, job.payload, last_attempt=job.attempts + 1 >= job.max_attempts)
                         await JobRepo(s2).mark_done(job.id)
+                    await run_deferred(s2)
             except Exception as e:
                 err = f"{type(e).__name__}: {e}"
                 tb = traceback.format_exc()
@@ -131,6 +134,8 @@ async def lifespan_with_scheduler(app) -> AsyncGenerator[None, None]:
     
     # Shutdown
     await stop_background_scheduler()
+    await close_usage_buffer()
+    await close_openai_client()
 
 
 async def _startup_db_patch() -> None:
@@ -7,7 +7,9 @@ from app.core.config import settings
 from app.core.db import AsyncSessionMaker
 from app.repos.job_repo import JobRepo
 from app.models.enums import JobStatus
-from app.worker.tasks import handle_job
+from app.services.openai_client import close_openai_client
+from app.services.usage_buffer import close_usage_buffer
+from app.worker.tasks import handle_job, run_deferred
 from app.worker.scheduler import scheduler_tick
 
 
@@ -24,8 +26,9 @@ async def worker_tick() -> None:
             try:
                 async with AsyncSessionMaker() as s2:
                     async with s2.begin():
-                        await handle_job(s2, job.type, job.payload)
+                        await handle_job(s2, job.type, job.payload, last_attempt=job.attempts + 1 >= job.max_attempts)
                         await JobRepo(s2).mark_done(job.id)
+                    await run_deferred(s2)
             except Exception as e:
                 err = f"{type(e).__name__}: {e}"
                 tb = traceback.format_exc()
@@ -37,17 +40,21 @@ async def worker_tick() -> None:
 
 async def main() -> None:
     print("[worker] started")
-    while True:
-        # periodic scheduling (autosync)
-        try:
-            async with AsyncSessionMaker() as s:
-                async with s.begin():
-                    await scheduler_tick(s)
-        except Exception as e:
-            print(f"[worker] scheduler error: {e}")
-
-        await worker_tick()
-        await asyncio.sleep(settings.WORKER_POLL_INTERVAL_SEC)
+    try:
+        while True:
+            # periodic scheduling (autosync)
+            try:
+                async with AsyncSessionMaker() as s:
+                    async with s.begin():
+                        await scheduler_tick(s)
+            except Exception as e:
+                print(f"[worker] scheduler error: {e}")
+
+            await worker_tick()
+            await asyncio.sleep(settings.WORKER_POLL_INTERVAL_SEC)
+    finally:
+        await close_usage_buffer()
+        await close_openai_client()
 
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime, timezone, timedelta
 import logging
+import time
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -11,10 +12,61 @@ from app.models.shop import Shop
 from app.models.settings import ShopSettings
 from app.models.enums import JobType
 from app.repos.job_repo import JobRepo
+from app.repos.sync_schedule_repo import SyncScheduleRepo
+from app.services.generation_cache import purge_if_due as purge_generation_cache
+from app.services.credit_reservations import settle_expired as settle_expired_reservations
+from app.services.gpt_accounting import compact_usage_rollup_if_due
 
 
 log = logging.getLogger(__name__)
 
+_last_stats_repair_at = float("-inf")
+
+
+def unanswered_sync_payload(shop_id: int, st: ShopSettings) -> dict:
+    """sync_shop payload for an incremental unanswered-feedbacks sync."""
+    # Incremental: ask WB from last seen feedback createdDate (minus overlap).
+    # This is more reliable than last_sync_at when jobs get delayed.
+    date_from_unix = None
+    cursor = getattr(st, "last_feedback_created_at", None)
+    if cursor is not None:
+        try:
+            date_from_unix = int((cursor - timedelta(minutes=5)).timestamp())
+        except Exception:
+            date_from_unix = None
+
+    return {
+        "shop_id": shop_id,
+        "is_answered": False,
+        "take": int(settings.AUTO_SYNC_TAKE),
+        "skip": 0,
+        "order": "dateDesc",
+        "date_from_unix": date_from_unix,
+        "date_to_unix": None,
+        "max_total": int(settings.AUTO_SYNC_MAX_TOTAL),
+    }
+
+
+async def enqueue_stats_repair_if_due(session: AsyncSession) -> None:
+    """Enqueue a repair_stats job per active shop every STATS_ROLLUP_REPAIR_INTERVAL_HOURS (per process)."""
+    global _last_stats_repair_at
+    if time.monotonic() - _last_stats_repair_at < float(settings.STATS_ROLLUP_REPAIR_INTERVAL_HOURS) * 3600:
+        return
+    _last_stats_repair_at = time.monotonic()
+
+    job_repo = JobRepo(session)
+    shop_ids = (await session.execute(select(Shop.id).where(Shop.is_active.is_(True)))).scalars().all()
+    queued = 0
+    for shop_id in shop_ids:
+        if await job_repo.exists_pending_for_shop(JobType.repair_stats.value, shop_id):
+            continue
+        await job_repo.enqueue(
+            JobType.repair_stats.value,
+            {"shop_id": shop_id, "days": int(settings.STATS_ROLLUP_REPAIR_DAYS)},
+        )
+        queued += 1
+    log.info("[scheduler] enqueued %s %s job(s)", queued, JobType.repair_stats.value)
+
 
 async def scheduler_tick(session: AsyncSession) -> None:
     """Enqueue periodic jobs (autosync) respecting rate limits.
@@ -22,10 +74,17 @@ async def scheduler_tick(session: AsyncSession) -> None:
     This function is designed to be called frequently (e.g. every 10-30 seconds) from the worker loop.
     It schedules:
       * feedbacks sync every AUTO_SYNC_INTERVAL_MIN (unanswered only)
+      * hot poll every HOT_POLL_INTERVAL_SEC (take=1 probe; triggers the unanswered sync on change)
       * questions sync every QUESTIONS_SYNC_INTERVAL_MIN
       * chats sync every CHATS_SYNC_INTERVAL_MIN
-      * product cards sync every CARDS_SYNC_INTERVAL_MIN (paged)
-      * full sync every FULL_SYNC_INTERVAL_MIN (all data)
+      * product cards sync every CARDS_SYNC_INTERVAL_MIN (delta by updatedAt; paged full pass
+        every CARDS_FULL_RECONCILE_INTERVAL_HOURS)
+      * daily stats repair every STATS_ROLLUP_REPAIR_INTERVAL_HOURS
+      * answered feedbacks every FULL_SYNC_INTERVAL_MIN, incrementally from the answered cursor
+        (minus ANSWERED_SYNC_REVERIFY_HOURS), plus a deep reconcile every ANSWERED_RECONCILE_INTERVAL_HOURS
+
+    With ADAPTIVE_SYNC_ENABLED the feedbacks/questions/chats intervals above are only fallbacks:
+    each shop is synced when its sync_schedules.next_due_at is reached.
 
     Duplicate jobs are avoided via JobRepo.exists_pending_for_shop.
     """
@@ -33,6 +92,15 @@ async def scheduler_tick(session: AsyncSession) -> None:
     now = datetime.now(timezone.utc)
     job_repo = JobRepo(session)
 
+    # Housekeeping: generation cache TTL/size eviction (throttled inside).
+    await purge_generation_cache(session)
+    # Return unused credits of batch reservations whose jobs never all finished.
+    await settle_expired_reservations(session)
+    # Re-derive recent closed days of the gpt_usage_daily rollup (throttled inside).
+    await compact_usage_rollup_if_due(session)
+    # Re-derive recent days of the feedback/question daily stats (throttled inside).
+    await enqueue_stats_repair_if_due(session)
+
     if not settings.AUTO_SYNC_ENABLED and not settings.CARDS_SYNC_ENABLED:
         return
 
@@ -46,51 +114,68 @@ async def scheduler_tick(session: AsyncSession) -> None:
     )
     rows = (await session.execute(q)).all()
 
+    # Adaptive mode: feedbacks/questions/chats are due per shop by sync_schedules.next_due_at,
+    # derived from observed arrival rates (see services.sync_schedule).
+    adaptive = bool(settings.ADAPTIVE_SYNC_ENABLED)
+    schedule_repo = SyncScheduleRepo(session)
+    due_keys = await schedule_repo.due_keys(now) if adaptive else set()
+
     feedback_interval = timedelta(minutes=int(settings.AUTO_SYNC_INTERVAL_MIN))
     cards_interval = timedelta(minutes=int(settings.CARDS_SYNC_INTERVAL_MIN))
     questions_interval = timedelta(minutes=int(getattr(settings, "QUESTIONS_SYNC_INTERVAL_MIN", 120)))
     chats_interval = timedelta(minutes=int(getattr(settings, "CHATS_SYNC_INTERVAL_MIN", 60)))
     full_sync_interval = timedelta(minutes=int(getattr(settings, "FULL_SYNC_INTERVAL_MIN", 120)))
+    reverify_window = timedelta(hours=int(settings.ANSWERED_SYNC_REVERIFY_HOURS))
+    reconcile_interval = timedelta(hours=int(settings.ANSWERED_RECONCILE_INTERVAL_HOURS))
+    reconcile_delay = timedelta(minutes=int(settings.ANSWERED_RECONCILE_DELAY_MIN))
+    hot_poll_interval = timedelta(seconds=int(settings.HOT_POLL_INTERVAL_SEC))
+    cards_full_interval = timedelta(hours=int(settings.CARDS_FULL_RECONCILE_INTERVAL_HOURS))
 
     for shop, st in rows:
-        # --- Feedbacks autosync (unanswered only) ---
-        if settings.AUTO_SYNC_ENABLED and bool(getattr(st, "auto_sync", True)):
-            due = st.last_sync_at is None or (now - st.last_sync_at) >= feedback_interval
-            if due and not await job_repo.exists_pending_for_shop(JobType.sync_shop.value, shop.id):
-                # Incremental: ask WB from last seen feedback createdDate (minus overlap).
-                # This is more reliable than last_sync_at when jobs get delayed.
-                date_from_unix = None
-                cursor = getattr(st, "last_feedback_created_at", None)
-                if cursor is not None:
-                    try:
-                        date_from_unix = int((cursor - timedelta(minutes=5)).timestamp())
-                    except Exception:
-                        date_from_unix = None
+        # New shops download their history via backfill_shop jobs; periodic feedback/question
+        # syncs would only duplicate that work until the backfill is finished.
+        backfilling = await job_repo.exists_pending_for_shop(
+            JobType.backfill_shop.value, shop.id, max_age_minutes=24 * 60
+        )
 
-                await job_repo.enqueue(
-                    JobType.sync_shop.value,
-                    {
-                        "shop_id": shop.id,
-                        "is_answered": False,
-                        "take": int(settings.AUTO_SYNC_TAKE),
-                        "skip": 0,
-                        "order": "dateDesc",
-                        "date_from_unix": date_from_unix,
-                        "date_to_unix": None,
-                        "max_total": int(settings.AUTO_SYNC_MAX_TOTAL),
-                    },
-                )
+        # --- Feedbacks autosync (unanswered only) ---
+        if settings.AUTO_SYNC_ENABLED and bool(getattr(st, "auto_sync", True)) and not backfilling:
+            if adaptive:
+                due = (shop.id, "feedbacks") in due_keys
+            else:
+                due = st.last_sync_at is None or (now - st.last_sync_at) >= feedback_interval
+            if due and not await job_repo.exists_pending_for_shop(
+                JobType.sync_shop.value, shop.id, payload_match={"is_answered": False}
+            ):
+                sync_payload = unanswered_sync_payload(shop.id, st)
+                await job_repo.enqueue(JobType.sync_shop.value, sync_payload)
+                if adaptive:
+                    # Guard against re-enqueue if the job never reports back; success reschedules it.
+                    await schedule_repo.postpone(shop.id, "feedbacks", now + feedback_interval)
                 log.info(
                     "[scheduler] enqueued %s shop_id=%s date_from_unix=%s",
                     JobType.sync_shop.value,
                     shop.id,
-                    date_from_unix,
+                    sync_payload.get("date_from_unix"),
                 )
 
+        # --- Hot poll: cheap take=1 probe, real sync only on change ---
+        if settings.AUTO_SYNC_ENABLED and settings.HOT_POLL_ENABLED and bool(getattr(st, "auto_sync", True)) and not backfilling:
+            last_poll = getattr(st, "last_hot_poll_at", None)
+            due_poll = last_poll is None or (now - last_poll) >= hot_poll_interval
+            if due_poll and not await job_repo.exists_pending_for_shop(
+                JobType.poll_feedbacks.value, shop.id, max_age_minutes=30
+            ):
+                await job_repo.enqueue(JobType.poll_feedbacks.value, {"shop_id": shop.id}, max_attempts=1)
+                st.last_hot_poll_at = now
+
         # --- Questions autosync ---
-        if settings.AUTO_SYNC_ENABLED:
-            last_questions_sync = getattr(st, "last_questions_sync_at", None)
-            due_questions = last_questions_sync is None or (now - last_questions_sync) >= questions_interval
+        if settings.AUTO_SYNC_ENABLED and not backfilling:
+            if adaptive:
+                due_questions = (shop.id, "questions") in due_keys
+            else:
+                last_questions_sync = getattr(st, "last_questions_sync_at", None)
+                due_questions = last_questions_sync is None or (now - last_questions_sync) >= questions_interval
             if due_questions and not await job_repo.exists_pending_for_shop(JobType.sync_questions.value, shop.id):
                 for is_answered in (False, True):
                     await job_repo.enqueue(
@@ -103,23 +188,44 @@ async def scheduler_tick(session: AsyncSession) -> None:
                             "order": "dateDesc",
                         },
                     )
+                if adaptive:
+                    await schedule_repo.postpone(shop.id, "questions", now + questions_interval)
                 log.info("[scheduler] enqueued %s shop_id=%s", JobType.sync_questions.value, shop.id)
 
         # --- Chats autosync ---
         if settings.AUTO_SYNC_ENABLED and bool(getattr(st, "chat_enabled", False)):
-            last_chat_sync = getattr(st, "last_chat_sync_at", None)
-            due_chats = last_chat_sync is None or (now - last_chat_sync) >= chats_interval
+            if adaptive:
+                due_chats = (shop.id, "chats") in due_keys
+            else:
+                last_chat_sync = getattr(st, "last_chat_sync_at", None)
+                due_chats = last_chat_sync is None or (now - last_chat_sync) >= chats_interval
             if due_chats and not await job_repo.exists_pending_for_shop(JobType.sync_chats.value, shop.id):
                 await job_repo.enqueue(JobType.sync_chats.value, {"shop_id": shop.id})
                 await job_repo.enqueue(JobType.sync_chat_events.value, {"shop_id": shop.id})
+                if adaptive:
+                    await schedule_repo.postpone(shop.id, "chats", now + chats_interval)
                 log.info("[scheduler] enqueued %s shop_id=%s", JobType.sync_chats.value, shop.id)
 
-        # --- Full sync every 2 hours (all feedbacks both answered and unanswered) ---
-        last_full_sync = getattr(st, "last_full_sync_at", None)
-        due_full = last_full_sync is None or (now - last_full_sync) >= full_sync_interval
-        if due_full and settings.AUTO_SYNC_ENABLED:
-            # Schedule full sync for answered feedbacks too
-            if not await job_repo.exists_pending_for_shop(JobType.sync_shop.value, shop.id):
+        # --- Answered feedbacks: incremental from the answered cursor ---
+        # Re-downloading the whole answered archive every cycle is wasteful; fetch only
+        # reviews created after (cursor - reverify window). Late answers to older reviews
+        # are picked up by the periodic deep reconcile below.
+        if settings.AUTO_SYNC_ENABLED and bool(getattr(st, "auto_sync", True)) and not backfilling:
+            answered_match = {"is_answered": True}
+            answered_pending = await job_repo.exists_pending_for_shop(
+                JobType.sync_shop.value, shop.id, payload_match=answered_match
+            )
+
+            last_reconcile = getattr(st, "last_answered_reconcile_at", None)
+            answered_cursor = getattr(st, "last_answered_feedback_created_at", None)
+            # Gated on the reconcile stamp only: a shop without answered reviews keeps a None cursor,
+            # which must not make the deep pass due on every tick.
+            due_reconcile = last_reconcile is None or (now - last_reconcile) >= reconcile_interval
+
+            last_full_sync = getattr(st, "last_full_sync_at", None)
+            due_full = last_full_sync is None or (now - last_full_sync) >= full_sync_interval
+
+            if due_reconcile and not answered_pending:
                 await job_repo.enqueue(
                     JobType.sync_shop.value,
                     {
@@ -128,30 +234,72 @@ async def scheduler_tick(session: AsyncSession) -> None:
                         "take": 5000,
                         "skip": 0,
                         "order": "dateDesc",
-                        "max_total": 10000,
+                        "max_total": int(settings.ANSWERED_RECONCILE_MAX_TOTAL),
+                        "mode": "reconcile",
                     },
+                    # Low priority: let fresher work scheduled in this tick run first.
+                    run_at=now + reconcile_delay if answered_cursor is not None else None,
                 )
-                log.info("[scheduler] enqueued full sync (answered) shop_id=%s", shop.id)
+                st.last_answered_reconcile_at = now
+                st.last_full_sync_at = now
+                log.info("[scheduler] enqueued answered reconcile shop_id=%s", shop.id)
+            elif due_full and not answered_pending:
+                date_from_unix = None
+                try:
+                    date_from_unix = int((answered_cursor - reverify_window).timestamp())
+                except Exception:
+                    date_from_unix = None
 
-            # Update last full sync timestamp
-            st.last_full_sync_at = now
+                await job_repo.enqueue(
+                    JobType.sync_shop.value,
+                    {
+                        "shop_id": shop.id,
+                        "is_answered": True,
+                        "take": int(settings.AUTO_SYNC_TAKE),
+                        "skip": 0,
+                        "order": "dateDesc",
+                        "date_from_unix": date_from_unix,
+                        "date_to_unix": None,
+                        "max_total": int(settings.AUTO_SYNC_MAX_TOTAL),
+                        "mode": "incremental",
+                    },
+                )
+                st.last_full_sync_at = now
+                log.info(
+                    "[scheduler] enqueued answered incremental sync shop_id=%s date_from_unix=%s",
+                    shop.id,
+                    date_from_unix,
+                )
 
         # --- Product cards sync (Content API) ---
         if settings.CARDS_SYNC_ENABLED:
             due_cards = st.last_cards_sync_at is None or (now - st.last_cards_sync_at) >= cards_interval
             if due_cards and not await job_repo.exists_pending_for_shop(JobType.sync_product_cards.value, shop.id):
+                # Delta (only cards updated since the high-water mark) unless a full pass is due
+                # or still in progress (stored cursor).
+                last_full_cards = getattr(st, "last_cards_full_sync_at", None)
+                cards_mode = "delta"
+                if (
+                    getattr(st, "cards_hwm_updated_at", None) is None
+                    or st.cards_cursor_updated_at is not None
+                    or last_full_cards is None
+                    or (now - last_full_cards) >= cards_full_interval
+                ):
+                    cards_mode = "full"
                 await job_repo.enqueue(
                     JobType.sync_product_cards.value,
                     {
                         "shop_id": shop.id,
                         "pages": int(settings.CARDS_SYNC_PAGES_PER_RUN),
                         "limit": int(settings.CARDS_SYNC_LIMIT),
+                        "mode": cards_mode,
                     },
                 )
                 log.info(
-                    "[scheduler] enqueued %s shop_id=%s pages=%s limit=%s",
+                    "[scheduler] enqueued %s shop_id=%s mode=%s pages=%s limit=%s",
                     JobType.sync_product_cards.value,
                     shop.id,
+                    cards_mode,
                     int(settings.CARDS_SYNC_PAGES_PER_RUN),
                     int(settings.CARDS_SYNC_LIMIT),
                 )
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+import logging
+import time
+from typing import Awaitable, Callable
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.db import AsyncSessionMaker
 from app.models.shop import Shop
+from app.models.settings import ShopSettings
 from app.models.feedback import Feedback
 from app.models.question import Question
 from app.models.enums import JobType, DraftStatus
@@ -18,20 +23,45 @@ from app.repos.job_repo import JobRepo
 from app.repos.chat_repo import ChatRepo
 from app.repos.shop_billing_repo import ShopBillingRepo
 from app.repos.system_flags_repo import SystemFlagsRepo
+from app.repos.shop_data_version_repo import ShopDataVersionRepo
+from app.repos.stats_rollup_repo import StatsRollupRepo
 from app.services.sync import sync_feedbacks, sync_questions
 from app.services.product_cards_sync import sync_product_cards
+from app.services.backfill import run_backfill
+from app.services.paging import Page, run_pipelined
+from app.services.sync_schedule import observe_sync
 from app.services.openai_client import OpenAIService
 from app.services.prompt_store import get_global_bundle
 from app.services.drafting import generate_draft_text, effective_mode_for_rating, contains_blacklist
+from app.services.template_drafting import TEMPLATE_MODEL, template_fast_path_applies
+from app.services.keyword_matcher import get_keyword_matcher
 from app.services.question_drafting import generate_question_draft_text
 from app.services.gpt_accounting import record_gpt_usage
+from app.services import credit_reservations
 from app.services.wb_client import WBClient
 from app.core.crypto import decrypt_secret
 from app.services.wb_chat_client import WBChatClient
 from app.services.chat_drafting import generate_chat_reply
+from app.worker.scheduler import unanswered_sync_payload
 
 
-async def handle_job(session: AsyncSession, job_type: str, payload: dict) -> None:
+log = logging.getLogger(__name__)
+
+
+def run_after_commit(session: AsyncSession, fn: Callable[[], Awaitable[None]]) -> None:
+    """Defer `fn` until the job transaction has committed (the worker loops call run_deferred)."""
+    session.info.setdefault("after_commit", []).append(fn)
+
+
+async def run_deferred(session: AsyncSession) -> None:
+    for fn in session.info.pop("after_commit", []):
+        try:
+            await fn()
+        except Exception as e:
+            log.warning("[worker] after-commit callback failed: %s", e)
+
+
+async def handle_job(session: AsyncSession, job_type: str, payload: dict, *, last_attempt: bool = False) -> None:
     if job_type == JobType.sync_shop.value:
         await _job_sync_shop(session, payload)
         return
@@ -39,7 +69,7 @@ async def handle_job(session: AsyncSession, job_type: str, payload: dict) -> Non
         await _job_sync_questions(session, payload)
         return
     if job_type == JobType.generate_draft.value:
-        await _job_generate_draft(session, payload)
+        await _job_generate_draft(session, payload, last_attempt=last_attempt)
         return
     if job_type == JobType.publish_answer.value:
         await _job_publish_answer(session, payload)
@@ -65,6 +95,15 @@ async def handle_job(session: AsyncSession, job_type: str, payload: dict) -> Non
     if job_type == JobType.sync_product_cards.value:
         await _job_sync_product_cards(session, payload)
         return
+    if job_type == JobType.backfill_shop.value:
+        await _job_backfill_shop(session, payload)
+        return
+    if job_type == JobType.poll_feedbacks.value:
+        await _job_poll_feedbacks(session, payload)
+        return
+    if job_type == JobType.repair_stats.value:
+        await _job_repair_stats(session, payload)
+        return
     raise ValueError(f"Unknown job type: {job_type}")
 
 
@@ -81,16 +120,6 @@ async def _ensure_ops_allowed(session: AsyncSession, settings_obj, kind: str) ->
         raise RuntimeError("Publishing disabled")
 
 
-def _text_hits_blacklist(text: str | None, keywords: list) -> bool:
-    if not text:
-        return False
-    t = text.lower()
-    for kw in keywords or []:
-        if isinstance(kw, str) and kw.strip() and kw.strip().lower() in t:
-            return True
-    return False
-
-
 async def _job_sync_shop(session: AsyncSession, payload: dict) -> None:
     shop_id = int(payload["shop_id"])
     raw_is_answered = payload.get("is_answered", None)
@@ -130,7 +159,7 @@ async def _job_sync_shop(session: AsyncSession, payload: dict) -> None:
 
     statuses = (False, True) if is_answered is None else (is_answered,)
     for status in statuses:
-        await sync_feedbacks(
+        res = await sync_feedbacks(
             session,
             shop,
             settings_obj,
@@ -142,6 +171,8 @@ async def _job_sync_shop(session: AsyncSession, payload: dict) -> None:
             date_to_unix=date_to_unix,
             max_total=int(max_total) if max_total is not None else None,
         )
+        if status is False:
+            await observe_sync(session, shop_id, "feedbacks", new_items=int(res.get("new") or 0))
 
     if settings_obj.automation_enabled and settings_obj.auto_draft and (is_answered is None or is_answered is False) and (settings_obj.reply_mode in ("semi", "auto")):
         # Auto-generate drafts for newest unanswered feedbacks, but respect
@@ -178,6 +209,65 @@ async def _job_sync_shop(session: AsyncSession, payload: dict) -> None:
     await session.flush()
 
 
+async def _job_poll_feedbacks(session: AsyncSession, payload: dict) -> None:
+    """Hot poll: one take=1 request; enqueue the real unanswered sync only if something changed."""
+    shop_id = int(payload["shop_id"])
+    shop = await session.get(Shop, shop_id)
+    if not shop:
+        return
+    settings_obj = await ShopRepo(session).get_settings(shop_id)
+    if not settings_obj:
+        return
+
+    token = decrypt_secret(shop.wb_token_enc)
+    wb = WBClient(token=token)
+    try:
+        resp = await wb.feedbacks_list(is_answered=False, take=1, skip=0, order="dateDesc")
+    finally:
+        await wb.aclose()
+
+    data = resp.get("data") or {}
+    count = data.get("countUnanswered")
+    newest_at = None
+    items = data.get("feedbacks") or []
+    if items:
+        raw = items[0].get("createdDate")
+        try:
+            newest_at = raw if isinstance(raw, datetime) else datetime.fromisoformat(str(raw).replace("Z", "+00:00"))
+        except Exception:
+            newest_at = None
+
+    prev_count = settings_obj.hot_unanswered_count
+    prev_newest = settings_obj.hot_newest_feedback_at
+
+    # New review: unanswered count grew, or the newest one is newer than anything seen/stored.
+    seen = [d for d in (prev_newest, settings_obj.last_feedback_created_at) if d is not None]
+    changed = (isinstance(count, int) and prev_count is not None and count > prev_count) or (
+        newest_at is not None and seen and newest_at > max(seen)
+    )
+
+    if isinstance(count, int):
+        settings_obj.hot_unanswered_count = count
+    if newest_at is not None:
+        settings_obj.hot_newest_feedback_at = newest_at
+
+    if changed:
+        job_repo = JobRepo(session)
+        if not await job_repo.exists_pending_for_shop(
+            JobType.sync_shop.value, shop_id, payload_match={"is_answered": False}
+        ):
+            await job_repo.enqueue(JobType.sync_shop.value, unanswered_sync_payload(shop_id, settings_obj))
+            log.info(
+                "[hot-poll] change detected shop_id=%s count=%s->%s newest=%s -> sync enqueued",
+                shop_id,
+                prev_count,
+                count,
+                newest_at,
+            )
+
+    await session.flush()
+
+
 async def _job_sync_questions(session: AsyncSession, payload: dict) -> None:
     shop_id = int(payload["shop_id"])
     raw_is_answered = payload.get("is_answered", None)
@@ -201,7 +291,7 @@ async def _job_sync_questions(session: AsyncSession, payload: dict) -> None:
 
     statuses = (False, True) if is_answered is None else (is_answered,)
     for status in statuses:
-        await sync_questions(
+        res = await sync_questions(
             session,
             shop,
             settings_obj,
@@ -212,6 +302,8 @@ async def _job_sync_questions(session: AsyncSession, payload: dict) -> None:
             date_from_unix=date_from_unix,
             date_to_unix=date_to_unix,
         )
+        if status is False:
+            await observe_sync(session, shop_id, "questions", new_items=int(res.get("new") or 0))
 
     # Update last questions sync timestamp
     settings_obj.last_questions_sync_at = datetime.now(timezone.utc)
@@ -223,6 +315,7 @@ async def _job_sync_product_cards(session: AsyncSession, payload: dict) -> None:
     shop_id = int(payload["shop_id"])
     pages = int(payload.get("pages", 5))
     limit = int(payload.get("limit", 100))
+    mode = str(payload.get("mode") or "full")
 
     shop = await session.get(Shop, shop_id)
     if not shop:
@@ -231,12 +324,75 @@ async def _job_sync_product_cards(session: AsyncSession, payload: dict) -> None:
     if not settings_obj:
         return
 
-    await sync_product_cards(session, shop, settings_obj, pages=pages, limit=limit)
+    if mode == "full" and getattr(settings_obj, "cards_hwm_updated_at", None) is not None:
+        # A full pass over a large catalogue spans many runs; pick up fresh changes first
+        # (usually a single page) so they do not wait for the pass to finish.
+        await sync_product_cards(session, shop, settings_obj, pages=pages, limit=limit, mode="delta")
+    await sync_product_cards(session, shop, settings_obj, pages=pages, limit=limit, mode=mode)
+
+    await session.flush()
+
+
+async def _job_backfill_shop(session: AsyncSession, payload: dict) -> None:
+    """Initial history download for one stream; resumes from sync_backfills on retry."""
+    shop_id = int(payload["shop_id"])
+    stream = str(payload["stream"])
+
+    shop = await session.get(Shop, shop_id)
+    if not shop:
+        return
+
+    await run_backfill(shop_id, stream)
 
+
+async def _job_repair_stats(session: AsyncSession, payload: dict) -> None:
+    """Re-derive the daily feedback/question stats of a shop from raw rows.
+
+    payload["days"] = N rebuilds the last N closed days; without it the whole history is rebuilt.
+    """
+    shop_id = int(payload["shop_id"])
+    days = payload.get("days")
+
+    day_from = day_to = None
+    if days is not None:
+        day_to = datetime.now(timezone.utc).date() - timedelta(days=1)
+        day_from = day_to - timedelta(days=max(1, int(days)) - 1)
+    await StatsRollupRepo(session).rebuild(shop_id, day_from, day_to)
+    await ShopDataVersionRepo(session).bump(shop_id)
     await session.flush()
 
 
-async def _job_generate_draft(session: AsyncSession, payload: dict) -> None:
+async def _job_generate_draft(session: AsyncSession, payload: dict, *, last_attempt: bool = False) -> None:
+    reservation_id = payload.get("reservation_id")
+    if reservation_id is None:
+        await _generate_draft(session, payload, reservation_id=None)
+        return
+
+    # Bulk run: credits come from the batch reservation (see credit_reservations).
+    reservation_id = int(reservation_id)
+    item_key = f"feedback:{int(payload['feedback_id'])}"
+    try:
+        await _generate_draft(session, payload, reservation_id=reservation_id)
+    except Exception:
+        await credit_reservations.release_item(reservation_id, item_key=item_key)
+        if last_attempt:
+            # No retry will come: count the item as skipped so the batch can settle now.
+            await _finish_reservation_item(reservation_id, item_key)
+        raise
+    # Only once the draft is committed: if the commit fails the job retries with the item still consumed.
+    run_after_commit(session, lambda: _finish_reservation_item(reservation_id, item_key))
+
+
+async def _finish_reservation_item(reservation_id: int, item_key: str) -> None:
+    # Bookkeeping only: a failure here must not fail (and re-run) an already generated draft;
+    # the batch is then settled by settle_expired at its TTL.
+    try:
+        await credit_reservations.finish_item(reservation_id, item_key=item_key)
+    except Exception as e:
+        log.warning("[credits] finish_item reservation=%s item=%s failed: %s", reservation_id, item_key, e)
+
+
+async def _generate_draft(session: AsyncSession, payload: dict, *, reservation_id: int | None) -> None:
     shop_id = int(payload["shop_id"])
     feedback_id = int(payload["feedback_id"])
     source = (payload.get("source") or "auto").lower()
@@ -262,9 +418,15 @@ async def _job_generate_draft(session: AsyncSession, payload: dict) -> None:
     if source == "auto" and eff_mode == "manual":
         return
 
-    # Billing: charge credits before spending OpenAI tokens.
+    # Billing: charge credits before spending OpenAI tokens (template drafts are free).
     credits_per_draft = int(getattr(settings, "CREDITS_PER_DRAFT", 1) or 1)
+    if template_fast_path_applies(feedback, settings_obj):
+        credits_per_draft = 0
     charged = False
+    if credits_per_draft > 0 and reservation_id is not None:
+        # Refunds on failure are handled by releasing the reservation item.
+        if await credit_reservations.consume(reservation_id, item_key=f"feedback:{feedback_id}", amount=credits_per_draft):
+            credits_per_draft = 0
     if credits_per_draft > 0:
         charged = await ShopBillingRepo(session).try_charge(
             shop_id,
@@ -281,7 +443,7 @@ async def _job_generate_draft(session: AsyncSession, payload: dict) -> None:
     openai = OpenAIService()
     bundle = await get_global_bundle(session)
     try:
-        text, model, response_id, prompt_tokens, completion_tokens = await generate_draft_text(
+        text, model, response_id, prompt_tokens, completion_tokens, cached = await generate_draft_text(
             openai, feedback, settings_obj, bundle=bundle
         )
     except Exception:
@@ -294,22 +456,30 @@ async def _job_generate_draft(session: AsyncSession, payload: dict) -> None:
                 meta={"shop_id": shop_id, "feedback_id": feedback_id, "wb_id": feedback.wb_id},
             )
         raise
-    draft = await DraftRepo(session).create(feedback_id=feedback.id, text=text, openai_model=model, openai_response_id=response_id)
-    await record_gpt_usage(
-        session,
-        shop_id=shop_id,
-        model=model,
-        operation_type="review_draft",
-        prompt_tokens=prompt_tokens,
-        completion_tokens=completion_tokens,
-        response_id=response_id,
-    )
+    draft = await DraftRepo(session).create(feedback_id=feedback.id, text=text, openai_model=model, openai_response_id=response_id, shop_id=shop_id)
+    await ShopDataVersionRepo(session).bump(shop_id)
+    if model != TEMPLATE_MODEL and not cached:
+        await record_gpt_usage(
+            session,
+            shop_id=shop_id,
+            model=model,
+            operation_type="review_draft",
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            response_id=response_id,
+        )
     # rating-based workflow (already computed above)
 
-    # UI parity: auto-publish is decided by per-rating mode (auto) plus blacklist guard.
+    # The prompt asks the model to avoid the shop's stop words; a reply that still uses them
+    # is kept as a draft for manual review instead of being auto-published.
+    sw_hits = get_keyword_matcher(settings_obj).stop_word_hits(text)
+    if sw_hits:
+        log.info("[drafts] feedback %s draft %s uses stop words %s; not auto-publishing", feedback.id, draft.id, sw_hits)
+
+    # UI parity: auto-publish is decided by per-rating mode (auto) plus blacklist/stop-word guards.
     # Older versions also used `auto_publish` and `min_rating_to_autopublish`, but those
     # settings do not exist in the UI shown in screenshots and would block per-rating auto.
-    if source == "auto" and bool(getattr(settings_obj, "automation_enabled", False)) and (not bl_hit) and eff_mode == "auto":
+    if source == "auto" and bool(getattr(settings_obj, "automation_enabled", False)) and (not bl_hit) and (not sw_hits) and eff_mode == "auto":
         await JobRepo(session).enqueue(
             JobType.publish_answer.value,
             {"shop_id": shop_id, "feedback_id": feedback.id, "draft_id": draft.id, "source": "auto"},
@@ -376,7 +546,7 @@ async def _job_publish_answer(session: AsyncSession, payload: dict) -> None:
     finally:
         await wb.aclose()
 
-    feedback.answer_text = draft.text
+    await FeedbackRepo(session).set_answer(feedback, draft.text)
     draft.status = DraftStatus.published.value
     await session.flush()
 
@@ -393,7 +563,7 @@ async def _job_generate_question_draft(session: AsyncSession, payload: dict) ->
     if not question or question.answer_text:
         return
 
-    bl_hit = _text_hits_blacklist(question.text, settings_obj.blacklist_keywords)
+    bl_hit = get_keyword_matcher(settings_obj).needs_manual_review(question.text)
 
     # Billing: charge credits before spending OpenAI tokens.
     credits_per_draft = int(getattr(settings, "CREDITS_PER_DRAFT", 1) or 1)
@@ -424,6 +594,7 @@ async def _job_generate_question_draft(session: AsyncSession, payload: dict) ->
             )
         raise
     draft = await QuestionDraftRepo(session).create(question_id=question.id, text=text, openai_model=model, openai_response_id=response_id)
+    await ShopDataVersionRepo(session).bump(shop_id)
     await record_gpt_usage(
         session,
         shop_id=shop_id,
@@ -434,9 +605,13 @@ async def _job_generate_question_draft(session: AsyncSession, payload: dict) ->
         response_id=response_id,
     )
 
-    # UI parity: auto-publish for questions is defined by mode = "auto" (plus blacklist guard).
+    sw_hits = get_keyword_matcher(settings_obj).stop_word_hits(text)
+    if sw_hits:
+        log.info("[drafts] question %s draft %s uses stop words %s; not auto-publishing", question.id, draft.id, sw_hits)
+
+    # UI parity: auto-publish for questions is defined by mode = "auto" (plus blacklist/stop-word guards).
     # Older versions also had `questions_auto_publish`, but it would block UI mode.
-    if (not bl_hit) and settings_obj.questions_reply_mode == "auto":
+    if (not bl_hit) and (not sw_hits) and settings_obj.questions_reply_mode == "auto":
         await JobRepo(session).enqueue(
             JobType.publish_question_answer.value,
             {"shop_id": shop_id, "question_id": question.id, "draft_id": draft.id},
@@ -471,7 +646,7 @@ async def _job_publish_question_answer(session: AsyncSession, payload: dict) ->
     finally:
         await wb.aclose()
 
-    question.answer_text = draft.text
+    await QuestionRepo(session).set_answer(question, draft.text)
     draft.status = DraftStatus.published.value
     draft.published_at = datetime.now(timezone.utc)
     await session.flush()
@@ -515,30 +690,57 @@ async def _job_sync_chat_events(session: AsyncSession, payload: dict) -> None:
     if not settings_obj or not settings_obj.chat_enabled:
         return
 
+    # Drain pages in one job until WB reports no more events or the time budget is spent.
+    # Each page (events + chat_next_ms) is committed in its own transaction, so progress
+    # survives a failure later in the loop; the next page is fetched while the current one is stored.
+    budget = float(getattr(settings, "CHAT_EVENTS_TIME_BUDGET_SEC", 25) or 25)
+    deadline = time.monotonic() + budget
+    budget_exhausted = False
+    events_total = 0
+
+    async def _fetch(next_ms: int | None) -> Page:
+        nonlocal budget_exhausted
+        resp = await client.events(next_ms=next_ms)
+        result = resp.get("result") or {}
+        nxt = result.get("next")
+        total = int(result.get("totalEvents") or 0)
+        events = result.get("events") or []
+
+        next_cursor = None
+        if total > 0 and nxt is not None:
+            if time.monotonic() < deadline:
+                next_cursor = int(nxt)
+            else:
+                budget_exhausted = True
+        return Page(events, meta=nxt, next_cursor=next_cursor)
+
+    async def _consume(page: Page) -> None:
+        nonlocal events_total
+        events_total += len(page.items)
+        async with AsyncSessionMaker() as s:
+            async with s.begin():
+                repo = ChatRepo(s)
+                for ev in page.items:
+                    await repo.add_event(shop_id=shop_id, ev=ev)
+                st = await s.get(ShopSettings, shop_id)
+                if st is not None:
+                    if page.meta is not None:
+                        st.chat_next_ms = int(page.meta)
+                    st.last_chat_sync_at = datetime.now(timezone.utc)
+
     token = decrypt_secret(shop.wb_token_enc)
     client = WBChatClient(token=token)
     try:
-        resp = await client.events(next_ms=settings_obj.chat_next_ms)
+        pages = await run_pipelined(_fetch, _consume, start=settings_obj.chat_next_ms)
     finally:
         await client.aclose()
 
-    result = resp.get("result") or {}
-    nxt = result.get("next")
-    total = result.get("totalEvents") or 0
-    events = result.get("events") or []
-
-    repo = ChatRepo(session)
-    for ev in events:
-        await repo.add_event(shop_id=shop_id, ev=ev)
-
-    if nxt is not None:
-        settings_obj.chat_next_ms = int(nxt)
-
-    settings_obj.last_chat_sync_at = datetime.now(timezone.utc)
-
-    # If there are still events to consume, re-enqueue one more pull (keeps each job short).
-    if int(total) > 0:
+    # Yield back to the queue only when the budget ran out with events still pending.
+    if budget_exhausted:
         await JobRepo(session).enqueue(JobType.sync_chat_events.value, {"shop_id": shop_id})
+        log.info("[chat-events] budget exhausted shop_id=%s pages=%s -> continuation enqueued", shop_id, pages)
+    else:
+        await observe_sync(session, shop_id, "chats", new_items=events_total)
 
     await session.flush()
 
@@ -604,15 +806,6 @@ async def _job_generate_chat_draft(session: AsyncSession, payload: dict) -> None
         completion_tokens=completion_tokens,
         response_id=rid,
     )
-    await record_gpt_usage(
-        session,
-        shop_id=shop_id,
-        model=model,
-        operation_type="chat_reply",
-        prompt_tokens=prompt_tokens,
-        completion_tokens=completion_tokens,
-        response_id=rid,
-    )
 
 
 async def _job_send_chat_message(session: AsyncSession, payload: dict) -> None:
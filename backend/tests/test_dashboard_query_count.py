@@ -0,0 +1,111 @@
+"""Query-count regression test for the /dashboard/main KPI blocks.
+
+The KPI helpers used to issue ~35 count(*) statements per view; they now run one
+FILTER-aggregate statement per table. A stub session counts every execute() call,
+so no database is needed.
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.dialects import postgresql
+
+from app.api.routes import dashboard
+from app.core import db as db_module
+from app.services import dashboard_cache
+
+
+class _Row:
+    def __getattr__(self, name):
+        return 0
+
+
+class _Result:
+    def one(self):
+        return _Row()
+
+    def scalar_one_or_none(self):
+        return None
+
+
+class CountingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt, *args, **kwargs):
+        # Every statement must still compile for Postgres.
+        stmt.compile(dialect=postgresql.dialect())
+        self.statements.append(stmt)
+        return _Result()
+
+
+def _windows():
+    dt_to = datetime(2026, 2, 20, 23, 59, 59, tzinfo=timezone.utc)
+    dt_from = dt_to - timedelta(days=6, hours=23, minutes=59, seconds=59)
+    prev_to = dt_from - timedelta(seconds=1)
+    prev_from = prev_to - timedelta(days=6, hours=23, minutes=59, seconds=59)
+    return dt_from, dt_to, prev_from, prev_to
+
+
+def _count(block) -> int:
+    session = CountingSession()
+    asyncio.run(block(session))
+    return len(session.statements)
+
+
+def test_feedbacks_kpis_extended_is_one_statement():
+    assert _count(lambda s: dashboard._feedbacks_kpis_extended(s, [1, 2], *_windows())) == 1
+
+
+def test_questions_kpis_extended_is_one_statement():
+    assert _count(lambda s: dashboard._questions_kpis_extended(s, [1, 2], *_windows())) == 1
+
+
+def test_chats_kpis_extended_is_one_statement():
+    assert _count(lambda s: dashboard._chats_kpis_extended(s, [1, 2], *_windows())) == 1
+
+
+class _RequestSession:
+    """The request-scoped session: dashboard_main must not query through it once fanned out."""
+
+    def in_transaction(self):
+        return False
+
+    async def execute(self, stmt, *args, **kwargs):
+        raise AssertionError("KPI blocks must run on the fan-out sessions")
+
+
+def test_dashboard_main_kpi_blocks_total(monkeypatch):
+    session = CountingSession()
+
+    class _SessionMaker:
+        async def __aenter__(self):
+            return session
+
+        async def __aexit__(self, *exc):
+            return False
+
+    async def _accessible_shop_ids(db, request, user, shop_id):
+        return [int(shop_id)]
+
+    monkeypatch.setattr(db_module, "AsyncSessionMaker", _SessionMaker)
+    monkeypatch.setattr(dashboard, "_accessible_shop_ids", _accessible_shop_ids)
+    monkeypatch.setattr(dashboard_cache.settings, "DASHBOARD_CACHE_ENABLED", False)
+
+    out = asyncio.run(
+        dashboard.dashboard_main(
+            request=None,
+            shop_id=1,
+            period="7d",
+            range_days=14,
+            date_from_unix=None,
+            date_to_unix=None,
+            db=_RequestSession(),
+            user=None,
+        )
+    )
+
+    assert out.automationMode == "control"
+    # feedbacks, questions, chats KPIs + shop settings, whatever the fan-out order.
+    assert len(session.statements) == 4
@@ -0,0 +1,78 @@
+"""Client disconnect mid-generation must still refund the charge (services.streaming)."""
+from __future__ import annotations
+
+import asyncio
+
+from starlette.responses import StreamingResponse
+
+from app.services import streaming
+
+
+class _FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def begin(self):
+        return self
+
+
+class _FakeBillingRepo:
+    ledger: list[dict] = []
+
+    def __init__(self, session):
+        self.session = session
+
+    async def apply_credits(self, shop_id, *, delta, reason, meta):
+        # A real insert awaits the database several times; cancellation would hit here.
+        await asyncio.sleep(0.01)
+        self.ledger.append({"shop_id": shop_id, "delta": delta, "reason": reason})
+
+
+async def _chunks():
+    yield "Спасибо за отзыв, мы очень рады что вам понравился товар и доставка. "
+    yield "Будем ждать вас снова в нашем магазине, всего доброго и хорошего дня! "
+    await asyncio.sleep(10)  # still generating when the client goes away
+    yield "never"
+
+
+async def _run_disconnect() -> list[str]:
+    sent: list[str] = []
+    first_body = asyncio.Event()
+
+    async def on_complete(text, res):
+        raise AssertionError("generation must not complete")
+
+    async def on_error(exc):
+        await streaming.refund_credits(7, amount=1, reason="refund_test", meta={})
+
+    response = StreamingResponse(
+        streaming.sse_generation(_chunks(), sanitize=lambda t: t, on_complete=on_complete, on_error=on_error),
+        media_type="text/event-stream",
+    )
+
+    async def receive():
+        await first_body.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            sent.append(message["body"].decode())
+            first_body.set()
+
+    scope = {"type": "http", "asgi": {"version": "3.0", "spec_version": "2.0"}, "method": "GET", "headers": []}
+    await response(scope, receive, send)
+    return sent
+
+
+def test_disconnect_mid_stream_refunds(monkeypatch):
+    monkeypatch.setattr(streaming, "AsyncSessionMaker", _FakeSession)
+    monkeypatch.setattr(streaming, "ShopBillingRepo", _FakeBillingRepo)
+    _FakeBillingRepo.ledger = []
+
+    sent = asyncio.run(_run_disconnect())
+
+    assert sent, "at least one delta is streamed before the disconnect"
+    assert _FakeBillingRepo.ledger == [{"shop_id": 7, "delta": 1, "reason": "refund_test"}]